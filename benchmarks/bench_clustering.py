@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+近似重复聚类基准测试
+向聚类索引持续写入合成新闻，记录索引达到不同规模时每条新闻的处理耗时，
+确认耗时不随历史索引规模线性增长
+
+用法：
+    python3 benchmarks/bench_clustering.py --items 200000
+"""
+
+import argparse
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'scripts'))
+
+from clustering import StoryClusterIndex
+
+
+VOCABULARY = [f'w{i}' for i in range(20000)]
+
+
+def make_item(rng, i):
+    """随机标题 + 摘要；约一成是之前某条新闻的转述"""
+    title = rng.choices(VOCABULARY, k=8)
+    summary = rng.choices(VOCABULARY, k=40)
+    return {
+        'url': f'https://example.com/news/{i}',
+        'source': 'bench',
+        'title': ' '.join(title),
+        'summary': ' '.join(summary)
+    }
+
+
+def paraphrase(rng, item, i):
+    """替换少量词得到近似重复"""
+    words = item['summary'].split()
+    for _ in range(4):
+        words[rng.randrange(len(words))] = rng.choice(VOCABULARY)
+    return {
+        'url': f'https://example.org/rewrite/{i}',
+        'source': 'bench-rewrite',
+        'title': item['title'],
+        'summary': ' '.join(words)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='近似重复聚类基准测试')
+    parser.add_argument('--items', type=int, default=200000,
+                       help='写入的合成新闻条数 (默认: 200000)')
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    checkpoints = {args.items * k // 10 for k in range(1, 11)}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        index = StoryClusterIndex(Path(tmp) / 'clusters.db')
+        recent = []
+        window_start = time.perf_counter()
+        window_count = 0
+        duplicates_found = duplicates_sent = 0
+
+        print(f"{'索引规模':>10}  {'每条耗时':>10}  {'重复检出率':>8}")
+        for i in range(1, args.items + 1):
+            if recent and rng.random() < 0.1:
+                item = paraphrase(rng, rng.choice(recent), i)
+                duplicates_sent += 1
+                cluster_id, is_new = index.assign(item)
+                duplicates_found += not is_new
+            else:
+                item = make_item(rng, i)
+                index.assign(item)
+                recent.append(item)
+                recent = recent[-1000:]
+            window_count += 1
+
+            if i % 1000 == 0:
+                index.commit()
+
+            if i in checkpoints:
+                elapsed = time.perf_counter() - window_start
+                print(f"{i:>10}  {elapsed / window_count * 1000:>8.2f}ms  "
+                      f"{duplicates_found / max(duplicates_sent, 1):>8.1%}")
+                window_start = time.perf_counter()
+                window_count = 0
+
+        index.close()
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
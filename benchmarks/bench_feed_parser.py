@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+订阅源解析基准测试
+在提交的样本订阅源（tests/data/feeds/：arXiv Atom、WordPress 全文 RSS、Atom 博客等）
+上比较 feedparser 与 iterparse 快速解析的耗时和峰值内存，并检查两者提取的字段一致
+
+用法：
+    python3 benchmarks/bench_feed_parser.py
+    python3 benchmarks/bench_feed_parser.py --synthetic
+    python3 benchmarks/bench_feed_parser.py --fixture recorded/mit.xml --fixture recorded/arxiv.xml
+"""
+
+import argparse
+import statistics
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / 'scripts'))
+sys.path.insert(0, str(ROOT / 'tests'))
+
+import feedparser
+
+from feed_parser import parse_fast
+from samples import RECORDED, arxiv_atom, blog_rss
+
+
+def measure(func, repeat):
+    """返回 (中位数耗时 ms, 峰值内存 MB)"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+
+    tracemalloc.start()
+    func()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return statistics.median(timings), peak / 1024 / 1024
+
+
+def fields(entry):
+    """参与一致性比较的字段；没有发布时间时快速解析用更新时间代替"""
+    published = entry.get('published_parsed') or entry.get('updated_parsed')
+    return (entry.get('title', '').strip(), entry.get('link'),
+            tuple(published or ())[:6],
+            entry.get('summary', '').strip(),
+            [author.get('name') for author in entry.get('authors', [])])
+
+
+def main():
+    parser = argparse.ArgumentParser(description='订阅源解析基准测试')
+    parser.add_argument('--fixture', action='append', default=[],
+                       help='订阅源文件（可多次指定），默认使用 tests/data/feeds/ 中的样本')
+    parser.add_argument('--synthetic', action='store_true',
+                       help='使用合成样本（arXiv 50 篇、博客 RSS 40 篇全文）')
+    parser.add_argument('--limit', type=int, default=20,
+                       help='快速解析的条目上限 (默认: 20)')
+    parser.add_argument('--repeat', type=int, default=10,
+                       help='每项重复次数 (默认: 10)')
+    args = parser.parse_args()
+
+    if args.fixture:
+        paths = [Path(path) for path in args.fixture]
+    else:
+        paths = [RECORDED / 'arxiv.xml', *sorted((RECORDED / 'blogs').glob('*.xml'))]
+    fixtures = [(path.name, path.read_bytes()) for path in paths]
+    if args.synthetic:
+        fixtures = [
+            ('arXiv 50 篇', arxiv_atom(50)),
+            ('博客 RSS 40 篇全文', blog_rss(40))
+        ]
+
+    print(f"{'样本':<20} {'大小':>8}  {'后端':<18} {'耗时':>10} {'峰值内存':>10}")
+    for name, content in fixtures:
+        # 一致性：快速解析的前 limit 条与 feedparser 相同
+        reference = feedparser.parse(content).entries
+        fast = parse_fast(content).entries
+        mismatches = sum(1 for a, b in zip(reference, fast) if fields(a) != fields(b))
+        mismatches += abs(len(reference) - len(fast))
+
+        runs = [
+            ('feedparser', lambda: feedparser.parse(content)),
+            ('fast', lambda: parse_fast(content)),
+            (f'fast (前 {args.limit} 条)', lambda: parse_fast(content, args.limit))
+        ]
+        size = f"{len(content) / 1024:.0f}KB"
+        for backend, func in runs:
+            elapsed, peak = measure(func, args.repeat)
+            print(f"{name:<20} {size:>8}  {backend:<18} {elapsed:>8.1f}ms {peak:>8.1f}MB")
+        print(f"{'':<20} {'':>8}  字段不一致: {mismatches} / {len(reference)} 条")
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+全文检索基准测试
+向新闻库写入一年量级的合成新闻，测量不同选择性的查询延迟
+
+用法：
+    python3 benchmarks/bench_search.py --items 500000 --db /tmp/bench_news.db
+"""
+
+import argparse
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'scripts'))
+
+from news_store import NewsStore
+
+
+SOURCES = ['arXiv', 'Hacker News', 'OpenAI Blog', 'Google DeepMind', 'MIT Technology Review AI']
+CATEGORIES = ['🔴 极重要', '🟡 重要', '🟢 一般']
+COMMON_WORDS = ('model training data learning language neural network agent '
+                'reasoning benchmark vision transformer').split()
+
+
+def populate(store, n, seed=42):
+    """写入 n 条合成新闻，发布时间均匀分布在过去一年"""
+    rng = random.Random(seed)
+    vocabulary = [f'term{i}' for i in range(50000)]
+    now = datetime.now()
+
+    start = time.perf_counter()
+    for i in range(n):
+        words = rng.choices(COMMON_WORDS, k=6) + rng.choices(vocabulary, k=30)
+        score = round(rng.uniform(0, 25), 1)
+        store.upsert({
+            'title': ' '.join(words[:8]),
+            'summary': ' '.join(words[8:]),
+            'authors': [f'author{rng.randrange(20000)}' for _ in range(3)],
+            'url': f'https://example.com/news/{i}',
+            'source': rng.choice(SOURCES),
+            'published': (now - timedelta(seconds=rng.randrange(365 * 86400))).isoformat(),
+            'importance_score': score,
+            'category': CATEGORIES[0 if score >= 15 else 1 if score >= 10 else 2],
+            'score_details': {}
+        })
+        if i % 10000 == 0:
+            store.commit()
+    store.commit()
+    return time.perf_counter() - start
+
+
+def measure(store, repeat=20, **kwargs):
+    """多次查询，返回 (中位数, 最大值) 毫秒"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        store.search(**kwargs)
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings), max(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='全文检索基准测试')
+    parser.add_argument('--items', type=int, default=500000,
+                       help='合成新闻条数 (默认: 500000)')
+    parser.add_argument('--db', default='/tmp/bench_news.db',
+                       help='基准测试用新闻库（已存在时直接复用）')
+    args = parser.parse_args()
+
+    reuse = Path(args.db).exists()
+    store = NewsStore(args.db)
+    if not reuse:
+        elapsed = populate(store, args.items)
+        print(f"✓ 写入 {args.items} 条新闻，耗时 {elapsed:.1f}s")
+
+    month_ago = time.time() - 30 * 86400
+    queries = [
+        ('稀有词', {'query': 'term123'}),
+        ('两个稀有词', {'query': 'term123 term456'}),
+        ('常见词', {'query': 'transformer'}),
+        ('常见词 + 来源', {'query': 'transformer', 'source': 'arXiv'}),
+        ('常见词 + 分类 + 近 30 天', {'query': 'reasoning agent',
+                                  'category': '🔴 极重要', 'since': month_ago}),
+        ('作者', {'query': 'author777'})
+    ]
+
+    print(f"新闻库: {store.size()} 条")
+    for name, kwargs in queries:
+        median, worst = measure(store, **kwargs)
+        print(f"  {name:<20} 中位数 {median:>8.1f}ms  最大 {worst:>8.1f}ms")
+
+    store.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+生成或录制订阅源样本目录
+样本生成函数和提交在仓库中的样本（tests/data/feeds/）见 tests/samples.py；
+--record 录制线上的实际响应（默认覆盖 tests/data/feeds/），否则写出一份合成样本，
+在各基准脚本中用 --fixture 回放
+
+用法：
+    python3 benchmarks/fixtures.py --output /tmp/ai-news-fixtures
+    python3 benchmarks/fixtures.py --record
+"""
+
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'tests'))
+
+from samples import RECORDED, write_synthetic
+
+
+def record(output, config_path, stories=100):
+    """按配置中的 arXiv 分类、博客和 HN 录制一份线上的实际响应"""
+    import requests
+
+    config = json.loads(Path(config_path).read_text(encoding='utf-8'))
+    session = requests.Session()
+    session.headers['User-Agent'] = 'ai-news-tracker-benchmark'
+    (output / 'blogs').mkdir(parents=True, exist_ok=True)
+    (output / 'hn' / 'items').mkdir(parents=True, exist_ok=True)
+    # 清掉上次的样本，目录中只保留本次录制的响应
+    for old in [*(output / 'blogs').glob('*.xml'), *(output / 'hn' / 'items').glob('*.json')]:
+        old.unlink()
+
+    cats = ' OR '.join(f"cat:{cat}" for cat in config.get('arxiv_categories', ['cs.AI']))
+    response = session.get('http://export.arxiv.org/api/query', params={
+        'search_query': f'({cats})', 'start': 0, 'max_results': 200,
+        'sortBy': 'submittedDate', 'sortOrder': 'descending'}, timeout=60)
+    response.raise_for_status()
+    (output / 'arxiv.xml').write_bytes(response.content)
+    print(f"  ✓ arXiv: {len(response.content) / 1024:.0f}KB")
+
+    for blog in config.get('blogs', []):
+        name = ''.join(c if c.isalnum() else '_' for c in blog['name'])
+        try:
+            response = session.get(blog['url'], timeout=30)
+            response.raise_for_status()
+        except requests.RequestException as e:
+            print(f"  ✗ {blog['name']}: {e}")
+            continue
+        (output / 'blogs' / f'{name}.xml').write_bytes(response.content)
+        print(f"  ✓ {blog['name']}: {len(response.content) / 1024:.0f}KB")
+
+    hn_api = 'https://hacker-news.firebaseio.com/v0'
+    ids = session.get(f'{hn_api}/newstories.json', timeout=10).json()[:stories]
+    (output / 'hn' / 'newstories.json').write_text(json.dumps(ids))
+    for item_id in ids:
+        item = session.get(f'{hn_api}/item/{item_id}.json', timeout=10)
+        (output / 'hn' / 'items' / f'{item_id}.json').write_bytes(item.content)
+    print(f"  ✓ Hacker News: {len(ids)} 条")
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description='生成或录制基准测试用订阅源样本')
+    parser.add_argument('--output',
+                       help='样本输出目录（默认: 录制时为 tests/data/feeds，否则为 /tmp/ai-news-fixtures）')
+    parser.add_argument('--record', action='store_true',
+                       help='录制线上的实际响应（需要网络），默认写出合成样本')
+    parser.add_argument('--config', default='config/sources.json',
+                       help='录制时读取的配置文件')
+    parser.add_argument('--stories', type=int, default=100,
+                       help='录制的 HN story 条数 (默认: 100)')
+    args = parser.parse_args()
+
+    output = Path(args.output or (RECORDED if args.record else '/tmp/ai-news-fixtures'))
+    if args.record:
+        record(output, args.config, args.stories)
+    else:
+        write_synthetic(output)
+    print(f"✓ 样本已写入: {output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
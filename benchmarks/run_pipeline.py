@@ -0,0 +1,399 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+端到端流水线基准测试
+本地桩服务器提供 arXiv、博客 RSS 和 HN API 响应：默认按 1k / 10k / 100k 等语料规模
+合成（见 tests/samples.py），--fixture 时回放录制的样本目录（如 tests/data/feeds）；运行
+采集 → 评分聚类 → 入库 → 摘要 → 通知，记录总耗时、各阶段耗时、请求数、
+峰值 RSS 和吞吐量，结果保存为 JSON，可用 --compare 与之前提交的结果对比
+
+通知阶段走实际的通知分发器：重要新闻经 Webhook 渠道 POST 到桩服务器，
+计时到全部送达并写入通知台账为止。
+
+每个规模在独立的子进程中运行，峰值 RSS 互不影响；桩服务器运行在父进程中，
+其开销不计入结果。
+
+用法：
+    python3 benchmarks/run_pipeline.py --sizes 1000 10000 100000
+    python3 benchmarks/run_pipeline.py --sizes 1000 --compare benchmarks/results/pipeline-abc1234.json
+    python3 benchmarks/run_pipeline.py --fixture tests/data/feeds
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+BENCH_DIR = Path(__file__).resolve().parent
+ROOT = BENCH_DIR.parent
+sys.path.insert(0, str(ROOT / 'scripts'))
+sys.path.insert(0, str(ROOT / 'tests'))
+
+from samples import arxiv_atom, blog_rss, hn_item, load_recording, slice_atom
+
+
+# 语料构成：arXiv 论文、博客文章、HN story 各占的比例
+ARXIV_SHARE = 0.4
+BLOG_SHARE = 0.2
+NUM_BLOGS = 10
+
+# 所有样本的发布时间分布在最近 WINDOW 秒内，落在采集器首次运行的 1 小时窗口中
+WINDOW = 3000
+
+# 回放录制样本时的规模标记
+REPLAY = 'replay'
+
+STAGES = ('collect', 'score', 'store', 'summarize', 'notify')
+
+
+def corpus(size):
+    """各来源的条数 (arXiv, 每个博客, HN story)"""
+    arxiv = int(size * ARXIV_SHARE)
+    per_blog = max(1, int(size * BLOG_SHARE) // NUM_BLOGS)
+    hn = max(1, size - arxiv - per_blog * NUM_BLOGS)
+    return arxiv, per_blog, hn
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """按 /<规模>/<来源>/... 路径返回样本响应，/<规模>/webhook 接收通知"""
+
+    protocol_version = 'HTTP/1.1'
+    # 响应头和响应体分两次写出，关闭 Nagle 避免与延迟 ACK 叠加出 40ms 的等待
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        parts = url.path.strip('/').split('/')
+        self.server.count(parts[0], parts[1])
+
+        if parts[0] == REPLAY:
+            response = self.replay(parts, url)
+        else:
+            response = self.synthetic(int(parts[0]), parts, url)
+        if response is None:
+            self.send_error(404)
+            return
+        self.respond(*response)
+
+    def do_POST(self):
+        parts = urlparse(self.path).path.strip('/').split('/')
+        self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        self.server.count(parts[0], parts[1])
+        self.respond(b'{}', 'application/json')
+
+    def respond(self, body, content_type):
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def synthetic(self, size, parts, url):
+        """合成语料的响应 (body, content_type)"""
+        route = parts[1]
+        arxiv, per_blog, hn = corpus(size)
+        now = self.server.now
+
+        if route == 'arxiv':
+            params = {k: v[0] for k, v in parse_qs(url.query).items()}
+            start = int(params.get('start', 0))
+            n = max(0, min(int(params.get('max_results', 100)), arxiv - start))
+            body = arxiv_atom(n, now=now, total=arxiv, start=start, spacing=WINDOW / arxiv)
+            return body, 'application/atom+xml'
+        if route == 'blog':
+            k = int(parts[2].split('.')[0])
+            body = blog_rss(per_blog, seed=10 + k, now=now, body_words=300,
+                            base_url=f'https://blog{k}.example.com', spacing=WINDOW / per_blog)
+            return body, 'application/rss+xml'
+        if route == 'hn':
+            # HN 的 id 每 5 个一个 story，最新 id 为 max_id
+            max_id = 10 ** 7
+            spacing = WINDOW / (hn * 5)
+            if parts[-1] == 'newstories.json':
+                data = list(range(max_id, max_id - hn * 5, -5))
+            elif parts[-1] == 'maxitem.json':
+                data = max_id
+            else:
+                item_id = int(parts[-1].split('.')[0])
+                data = hn_item(item_id, now=now, spacing=spacing, max_id=max_id)
+            return json.dumps(data).encode('utf-8'), 'application/json'
+        return None
+
+    def replay(self, parts, url):
+        """录制样本的响应 (body, content_type)；arXiv 按请求的 start / max_results 分页"""
+        route = parts[1]
+        recording = self.server.recording
+
+        if route == 'arxiv':
+            params = {k: v[0] for k, v in parse_qs(url.query).items()}
+            body = slice_atom(recording['arxiv'], int(params.get('start', 0)),
+                              int(params.get('max_results', 100)))
+            return body, 'application/atom+xml'
+        if route == 'blog':
+            k = int(parts[2].split('.')[0])
+            return recording['blogs'][k][1], 'application/rss+xml'
+        if route == 'hn':
+            if parts[-1] == 'newstories.json':
+                body = json.dumps(recording['newstories']).encode('utf-8')
+            elif parts[-1] == 'maxitem.json':
+                body = json.dumps(max(recording['newstories'])).encode('utf-8')
+            else:
+                body = recording['items'].get(int(parts[-1].split('.')[0]), b'null')
+            return body, 'application/json'
+        return None
+
+
+class StubServer(ThreadingHTTPServer):
+    """本地桩服务器，按规模和来源统计收到的请求"""
+
+    daemon_threads = True
+    # 通知渠道和采集并发建连，默认 backlog 只有 5
+    request_queue_size = 128
+
+    def __init__(self, fixture=None):
+        super().__init__(('127.0.0.1', 0), StubHandler)
+        self.now = time.time()
+        self.recording = load_recording(fixture) if fixture else None
+        self.requests = Counter()
+        self._lock = threading.Lock()
+
+    def count(self, size, route):
+        with self._lock:
+            self.requests[(size, route)] += 1
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+
+def write_config(tmp, base_url, size, recording=None):
+    """基准测试配置：所有源指向桩服务器，状态文件写在临时目录"""
+    if recording:
+        arxiv = recording['arxiv_total']
+        blogs = len(recording['blogs'])
+        hn = len(recording['newstories'])
+    else:
+        arxiv, per_blog, hn = corpus(size)
+        blogs = NUM_BLOGS
+    config = json.loads((ROOT / 'config' / 'sources.json').read_text(encoding='utf-8'))
+    config['arxiv'].update(max_results=max(arxiv, 1), page_size=100)
+    config['blogs'] = [{'name': f'Bench Blog {k}', 'url': f'{base_url}/{size}/blog/{k}.xml'}
+                       for k in range(blogs)]
+    config['hackernews'].update(max_stories=hn, mode='newstories')
+    # 所有源都在桩服务器一个主机上：按线上 HN 的并发上限放开单主机并发，
+    # 时间预算放开到足够取完整个语料
+    config['scheduler'].update(per_host=32, time_budget=3600)
+    # 每次运行都要取完整个语料，不按自适应排期跳过
+    config['scheduler']['adaptive'] = {'enabled': False}
+    config['seen_store']['path'] = str(tmp / 'seen_urls.db')
+    config['news_store'] = {'enabled': True, 'path': str(tmp / 'news.db')}
+    config['clustering']['path'] = str(tmp / 'clusters.db')
+    # 录制的样本可能早于首次运行的 1 小时窗口，回放时放开追赶上限（水位在 run_worker 中预置）
+    config['watermarks'] = {'path': str(tmp / 'watermarks.json'),
+                            'max_catchup_hours': 24 * 365 * 10 if recording else 24}
+    config['feed_cache'] = {'path': str(tmp / 'feed_cache.json')}
+    config['metrics'] = {'enabled': True, 'path': str(tmp / 'metrics.jsonl')}
+    # 通知经 Webhook 渠道发到桩服务器；不限速，队列足够放下全部重要新闻
+    config['enable_notification'] = True
+    config['notification_channels'] = [{'type': 'webhook', 'name': 'bench',
+                                        'url': f'{base_url}/{size}/webhook', 'min_interval': 0}]
+    config['dispatcher'] = {**config.get('dispatcher', {}), 'queue_size': 10 ** 7}
+    path = tmp / 'sources.json'
+    path.write_text(json.dumps(config, ensure_ascii=False), encoding='utf-8')
+    return path
+
+
+def run_worker(size, base_url, fixture=None):
+    """子进程：按阶段运行一轮流水线，返回结果字典"""
+    from pipeline import AINewsPipeline
+
+    recording = load_recording(fixture) if fixture else None
+    with tempfile.TemporaryDirectory() as tmp:
+        config_path = write_config(Path(tmp), base_url, size, recording)
+        timings = {}
+        log = io.StringIO()
+
+        with contextlib.redirect_stdout(log):
+            pipeline = AINewsPipeline(str(config_path))
+            pipeline.collector.ARXIV_API_URL = f"{base_url}/{size}/arxiv?"
+            pipeline.collector.HN_API_BASE = f"{base_url}/{size}/hn/v0"
+            if recording:
+                # 把水位预置到最早，录制时间较早的博客文章和 HN story 也在采集窗口内
+                for blog in pipeline.collector.config['blogs']:
+                    pipeline.collector.watermarks.set(f"blog:{blog['url']}",
+                                                      '1970-01-01T00:00:00+00:00')
+                pipeline.collector.watermarks.set('hackernews', 1)
+            threshold = pipeline.threshold
+
+            wall_start = time.perf_counter()
+
+            start = time.perf_counter()
+            raw_news = pipeline.collector.collect_all()
+            timings['collect'] = time.perf_counter() - start
+
+            start = time.perf_counter()
+            scored_news = list(pipeline.stream(iter(raw_news), threshold))
+            scored_news = [n for n in scored_news if not n.get('superseded')]
+            scored_news.sort(key=lambda x: x['importance_score'], reverse=True)
+            timings['score'] = time.perf_counter() - start
+
+            start = time.perf_counter()
+            pipeline.collector.news_store.upsert_many(raw_news)
+            pipeline.collector.news_store.commit()
+            pipeline.clusters.commit()
+            timings['store'] = time.perf_counter() - start
+
+            start = time.perf_counter()
+            pipeline.summarizer.generate_digest(scored_news)
+            timings['summarize'] = time.perf_counter() - start
+
+            # 通知：分发器经 Webhook 送出全部重要新闻，计时到送达并写入通知台账
+            start = time.perf_counter()
+            dispatcher = pipeline.enable_dispatcher()
+            for news_item in scored_news:
+                dispatcher.submit(news_item)
+            dispatcher.flush(timeout=600)
+            timings['notify'] = time.perf_counter() - start
+            delivery = dispatcher.stats()['bench']
+            dispatcher.close()
+            pipeline.dispatcher = None
+
+            wall = time.perf_counter() - wall_start
+            requests_sent = pipeline.collector.http.stats()['requests']
+            pipeline.close()
+
+    return {
+        'size': size,
+        'raw': len(raw_news),
+        'scored': len(scored_news),
+        'notified': delivery['sent'],
+        'notify_errors': delivery['errors'] + delivery['dropped'],
+        'wall_s': round(wall, 3),
+        'stages_s': {stage: round(timings[stage], 3) for stage in STAGES},
+        'requests': {'client': requests_sent},
+        'peak_rss_mb': round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        'items_per_s': round(len(raw_news) / wall, 1) if wall else None
+    }
+
+
+def git_commit():
+    """当前提交的短哈希，工作区有改动时加 -dirty"""
+    try:
+        sha = subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'],
+                                      cwd=ROOT, text=True).strip()
+        dirty = subprocess.run(['git', 'diff', '--quiet', 'HEAD', '--', 'scripts'],
+                               cwd=ROOT).returncode
+        return sha + ('-dirty' if dirty else '')
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def print_result(result):
+    stages = '  '.join(f"{stage} {result['stages_s'][stage]:.2f}s" for stage in STAGES)
+    server = result['requests'].get('server', {})
+    print(f"✓ {result['size']:>7}: 总耗时 {result['wall_s']:.2f}s，"
+          f"{result['items_per_s']:.0f} 条/s，峰值 RSS {result['peak_rss_mb']:.0f}MB")
+    print(f"    {stages}")
+    print(f"    采集 {result['raw']} 条 → 重要 {result['scored']} 条 → 送达 "
+          f"{result.get('notified', 0)} 条；请求 "
+          f"{result['requests']['client']} 个（" +
+          '，'.join(f"{route} {count}" for route, count in sorted(server.items())) + "）")
+
+
+def compare(results, baseline_path):
+    """与之前的结果逐项对比，打印变化百分比"""
+    baseline = json.loads(Path(baseline_path).read_text(encoding='utf-8'))
+    previous = {r['size']: r for r in baseline['results']}
+    print(f"\n与 {baseline.get('commit')} 对比（正数表示变慢/变大）:")
+    for result in results:
+        old = previous.get(result['size'])
+        if not old:
+            continue
+        pairs = [('wall', result['wall_s'], old['wall_s']),
+                 ('rss', result['peak_rss_mb'], old['peak_rss_mb'])]
+        pairs += [(stage, result['stages_s'][stage], old['stages_s'][stage]) for stage in STAGES]
+        changes = '  '.join(f"{name} {(new - prev) / prev:+.0%}" if prev else f"{name} n/a"
+                            for name, new, prev in pairs)
+        print(f"  {result['size']:>7}: {changes}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='端到端流水线基准测试')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000],
+                       help='语料规模 (默认: 1000 10000 100000)')
+    parser.add_argument('--output',
+                       help='结果 JSON 文件 (默认: benchmarks/results/pipeline-<提交>.json)')
+    parser.add_argument('--compare',
+                       help='与之前保存的结果 JSON 对比')
+    parser.add_argument('--fixture',
+                       help='回放录制的样本目录（结构见 tests/samples.py），忽略 --sizes')
+    parser.add_argument('--worker', help=argparse.SUPPRESS)
+    parser.add_argument('--base-url', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        size = args.worker if args.worker == REPLAY else int(args.worker)
+        print(json.dumps(run_worker(size, args.base_url, args.fixture)))
+        return 0
+
+    server = StubServer(args.fixture)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    results = []
+    try:
+        for size in [REPLAY] if args.fixture else args.sizes:
+            command = [sys.executable, __file__, '--worker', str(size),
+                       '--base-url', server.base_url]
+            if args.fixture:
+                command += ['--fixture', args.fixture]
+            output = subprocess.run(command, check=True, capture_output=True, text=True).stdout
+            result = json.loads(output.strip().splitlines()[-1])
+            result['requests']['server'] = {route: count for (s, route), count
+                                            in server.requests.items() if s == str(size)}
+            results.append(result)
+            print_result(result)
+    except subprocess.CalledProcessError as e:
+        print(f"✗ 基准测试失败:\n{e.stderr}")
+        return 1
+    finally:
+        server.shutdown()
+
+    commit = git_commit()
+    record = {
+        'commit': commit,
+        'created_at': datetime.now().isoformat(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'results': results
+    }
+    output_path = Path(args.output or BENCH_DIR / 'results' / f'pipeline-{commit}.json')
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    output_path.write_text(json.dumps(record, ensure_ascii=False, indent=2), encoding='utf-8')
+    print(f"✓ 结果已保存到: {output_path}")
+
+    if args.compare:
+        compare(results, args.compare)
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
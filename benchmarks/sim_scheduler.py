@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+自适应轮询模拟
+按配置中各源的 update_interval，用合成的发布过程（HN 白天活跃、arXiv 工作日 00:00 UTC
+集中公告、活跃与冷门博客）模拟若干周的轮询，比较固定间隔与自适应调度的
+请求数和发现延迟（发布到被轮询到的时间）。只统计最后一周，前面的周用于学习活跃时段。
+
+用法：
+    python3 benchmarks/sim_scheduler.py
+    python3 benchmarks/sim_scheduler.py --weeks 4 --seed 7
+"""
+
+import argparse
+import heapq
+import json
+import random
+import sys
+from bisect import bisect_right
+from datetime import datetime, timezone
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / 'scripts'))
+
+from metrics import percentile
+from scheduler import AdaptiveScheduler
+
+WEEK = 7 * 86400
+# 从周一 00:00 UTC 开始模拟
+START = datetime(2026, 1, 5, tzinfo=timezone.utc).timestamp()
+
+# 冷门博客：平均每周发文篇数；其余博客按活跃博客处理
+IDLE_BLOGS = {'OpenAI Blog': 2, 'Google DeepMind': 2, 'Anthropic': 1.5,
+              'Meta AI': 1.5, 'The Gradient': 0.5}
+
+
+def poisson(rng, start, end, rate_per_hour, hours=None, weekdays=None):
+    """[start, end) 内的泊松发布时间；hours/weekdays 限定发布的 UTC 小时和星期"""
+    times = []
+    t = start
+    while True:
+        t += rng.expovariate(rate_per_hour / 3600)
+        if t >= end:
+            return times
+        moment = datetime.fromtimestamp(t, timezone.utc)
+        if hours is not None and moment.hour not in hours:
+            continue
+        if weekdays is not None and moment.weekday() not in weekdays:
+            continue
+        times.append(t)
+
+
+def arxiv_announcements(rng, start, end, papers=150):
+    """arXiv 每个公告日（周日到周四晚）00:00 UTC 起 20 分钟内陆续出现一批论文"""
+    times = []
+    day = start
+    while day < end:
+        # 周一到周五 00:00 UTC 对应前一晚（周日到周四）的公告
+        if datetime.fromtimestamp(day, timezone.utc).weekday() < 5:
+            times.extend(day + rng.uniform(0, 1200) for _ in range(papers))
+        day += 86400
+    return sorted(times)
+
+
+def build_sources(config, rng, end):
+    """[(名称, update_interval, 发布时间列表, 类别)]"""
+    default = config.get('update_interval_minutes', 5) * 60
+    us_day = set(range(13, 24)) | {0, 1, 2, 3}
+    sources = [
+        ('arXiv', config.get('arxiv', {}).get('update_interval', default),
+         arxiv_announcements(rng, START, end), 'bursty'),
+        ('Hacker News', config.get('hackernews', {}).get('update_interval', default),
+         sorted(poisson(rng, START, end, 6, hours=us_day)
+                + poisson(rng, START, end, 1)), 'bursty'),
+        ('新闻网站', default, poisson(rng, START, end, 2, hours=us_day, weekdays=range(5)),
+         'active'),
+    ]
+    for blog in config.get('blogs', []):
+        interval = blog.get('update_interval', default)
+        if blog['name'] in IDLE_BLOGS:
+            times = poisson(rng, START, end, IDLE_BLOGS[blog['name']] / 168,
+                            hours=range(14, 22), weekdays=range(5))
+            sources.append((blog['name'], interval, times, 'idle'))
+        else:
+            times = poisson(rng, START, end, 3 / 24 * 4, hours=range(13, 19),
+                            weekdays=range(5))
+            sources.append((blog['name'], interval, times, 'active'))
+    return sources
+
+
+def simulate(sources, end, scheduler=None):
+    """按固定间隔（scheduler 为 None）或自适应调度轮询，返回 {名称: (请求数, 延迟列表)}"""
+    measure_from = end - WEEK
+    queue = [(START, name) for name, interval, times, kind in sources]
+    heapq.heapify(queue)
+    specs = {name: (interval, times) for name, interval, times, kind in sources}
+    last_poll = {name: START for name in specs}
+    results = {name: [0, []] for name in specs}
+
+    while queue:
+        now, name = heapq.heappop(queue)
+        if now >= end:
+            continue
+        interval, times = specs[name]
+        lo = bisect_right(times, last_poll[name])
+        hi = bisect_right(times, now)
+        last_poll[name] = now
+
+        if now >= measure_from:
+            results[name][0] += 1
+            results[name][1].extend(now - t for t in times[lo:hi] if t >= measure_from)
+
+        if scheduler:
+            next_due = scheduler.observe(name, interval, hi - lo, now=now)
+        else:
+            next_due = now + interval
+        heapq.heappush(queue, (next_due, name))
+    return results
+
+
+def summarize(sources, results):
+    """按类别汇总 (请求数, 条数, 延迟 p50/p90/均值 分钟)"""
+    rows = {}
+    for name, interval, times, kind in sources:
+        row = rows.setdefault(kind, [0, []])
+        row[0] += results[name][0]
+        row[1].extend(results[name][1])
+    rows['total'] = [sum(r[0] for r in rows.values()),
+                     [d for r in rows.values() for d in r[1]]]
+    return {kind: (requests, len(delays),
+                   (percentile(delays, 50) or 0) / 60,
+                   (percentile(delays, 90) or 0) / 60,
+                   sum(delays) / len(delays) / 60 if delays else 0)
+            for kind, (requests, delays) in rows.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='固定间隔与自适应轮询的模拟比较')
+    parser.add_argument('--config', default=str(ROOT / 'config' / 'sources.json'),
+                        help='配置文件，读取各源的 update_interval 和 scheduler.adaptive')
+    parser.add_argument('--weeks', type=int, default=3, help='模拟周数（只统计最后一周）')
+    parser.add_argument('--seed', type=int, default=1, help='随机种子')
+    args = parser.parse_args()
+
+    config = json.loads(Path(args.config).read_text(encoding='utf-8'))
+    end = START + args.weeks * WEEK
+    sources = build_sources(config, random.Random(args.seed), end)
+
+    options = config.get('scheduler', {}).get('adaptive', {})
+    fixed = summarize(sources, simulate(sources, end))
+    adaptive = summarize(sources, simulate(sources, end, AdaptiveScheduler(None, options)))
+
+    print(f"模拟 {args.weeks} 周，统计最后一周（延迟单位：分钟）\n")
+    print(f"{'类别':<8}{'':>4}{'请求数':>8}{'条数':>8}{'p50':>8}{'p90':>8}{'均值':>8}")
+    for kind in ('bursty', 'active', 'idle', 'total'):
+        for label, table in (('固定', fixed), ('自适应', adaptive)):
+            requests, count, p50, p90, mean = table[kind]
+            print(f"{kind:<8}{label:>4}{requests:>8}{count:>8}{p50:>8.1f}{p90:>8.1f}{mean:>8.1f}")
+    saved = 1 - adaptive['total'][0] / fixed['total'][0]
+    print(f"\n✓ 自适应调度请求数减少 {saved:.1%}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -6,28 +6,36 @@ AI 新闻自动推送脚本
 定期检查并推送重要新闻到用户会话
 """
 
-import json
 import sys
 import os
+import time
 from pathlib import Path
 from datetime import datetime
 
-def get_latest_news():
-    """获取最新重要新闻"""
+from metrics import append_record
+from notify import notification_settings, open_ledger, take_pending
 
-    data_file = Path("/root/.openclaw/workspace/skills/ai-news-tracker/data/news_scored.json")
+# 运行记录文件
+METRICS_FILE = Path("/root/.openclaw/workspace/skills/ai-news-tracker/data/metrics.jsonl")
 
-    if not data_file.exists():
-        return None
+# 新闻库（含通知台账）和配置文件
+DB_FILE = Path("/root/.openclaw/workspace/skills/ai-news-tracker/data/news.db")
+CONFIG_FILE = Path("/root/.openclaw/workspace/skills/ai-news-tracker/config/sources.json")
 
-    try:
-        with open(data_file, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+# 通知台账中的渠道名
+CHANNEL = 'auto_push'
+
+def get_latest_news(store):
+    """获取本渠道尚未推送的重要新闻，返回 (消息, 消息中展示的新闻)
+
+    从新闻库的通知台账只取新增的新闻。
+    """
 
-        news_list = data.get('news', [])
+    try:
+        news_list = take_pending(store, CHANNEL, notification_settings(CONFIG_FILE))
 
         if not news_list:
-            return None
+            return None, []
 
         # 按重要性排序
         news_list.sort(key=lambda x: x.get('importance_score', 0), reverse=True)
@@ -36,7 +44,7 @@ def get_latest_news():
         important = [n for n in news_list if n.get('category') == '🟡 重要']
 
         if not critical and not important:
-            return None
+            return None, []
 
         lines = []
         lines.append("🤖 **AI 新闻监控报告**")
@@ -60,18 +68,31 @@ def get_latest_news():
                     lines.append(f"📝 {summary}...")
                 lines.append(f"🔗 {news.get('url')}\n")
 
-        return "\n".join(lines)
+        # 只展示的新闻记为已送达，其余留到下次推送
+        return "\n".join(lines), critical[:3] + important[:3]
 
     except Exception as e:
         print(f"Error: {e}", file=sys.stderr)
-        return None
+        return None, []
 
 if __name__ == '__main__':
-    message = get_latest_news()
-
-    if message:
-        print(message)
-        sys.exit(0)
-    else:
-        print("✅ AI 新闻监控正常运行，暂无重要新闻")
-        sys.exit(0)
+    start = time.monotonic()
+    store = open_ledger(DB_FILE)
+    if store is None:
+        sys.exit(1)
+
+    try:
+        message, news_list = get_latest_news(store)
+        if METRICS_FILE.parent.exists():
+            append_record(METRICS_FILE, 'notify', notifier='auto_push',
+                          elapsed_seconds=round(time.monotonic() - start, 4), sent=bool(message),
+                          items=len(news_list))
+
+        if message:
+            print(message)
+            store.mark_delivered(CHANNEL, news_list)
+        else:
+            print("✅ AI 新闻监控正常运行，暂无重要新闻")
+    finally:
+        store.close()
+    sys.exit(0)
@@ -0,0 +1,298 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+跨来源近似重复新闻聚类
+对规范化后的标题、摘要计算 MinHash 签名，用 LSH 分桶索引（SQLite 持久化）
+查找候选，同一事件的官方博客、HN 讨论和新闻报道归为一个簇；
+每条新新闻只查询自己所在的桶，耗时与历史索引规模基本无关
+"""
+
+import hashlib
+import random
+import re
+import sqlite3
+import threading
+import time
+from array import array
+from pathlib import Path
+
+from seen_store import url_hash
+
+
+# 分词：英文单词/数字，或单个汉字
+TOKEN_RE = re.compile(r'[a-z0-9]+|[\u4e00-\u9fff]')
+TAG_RE = re.compile(r'<[^>]+>')
+
+# 不参与相似度计算的常见词
+STOPWORDS = frozenset(
+    'a an the and or of to in on for with by from at as is are was were be been '
+    'this that these those it its we our you your they their new how why what '
+    'via into over about after than more can will has have'.split()
+)
+
+# MinHash：NUM_BANDS 个带 × ROWS_PER_BAND 行
+NUM_BANDS = 16
+ROWS_PER_BAND = 4
+NUM_PERM = NUM_BANDS * ROWS_PER_BAND
+MERSENNE_PRIME = (1 << 61) - 1
+
+_rng = random.Random(20240101)
+PERMUTATIONS = [(_rng.randrange(1, MERSENNE_PRIME), _rng.randrange(0, MERSENNE_PRIME))
+                for _ in range(NUM_PERM)]
+
+# 签名类型：标题（HN 通常沿用原标题）、标题 + 摘要（新闻网站转述）
+KIND_TITLE = 0
+KIND_TEXT = 1
+
+# 参与签名的最少词数，过短的文本相似度没有意义
+MIN_TOKENS = 3
+
+
+def tokens(text):
+    """规范化文本为去掉停用词的词集合"""
+    text = TAG_RE.sub(' ', text or '').lower()
+    return {t for t in TOKEN_RE.findall(text) if t not in STOPWORDS}
+
+
+def minhash(token_set):
+    """64 个置换下的最小哈希值"""
+    hashes = [int.from_bytes(hashlib.blake2b(t.encode('utf-8'), digest_size=8).digest(), 'big')
+              for t in token_set]
+    return array('q', [min((a * h + b) % MERSENNE_PRIME for h in hashes)
+                       for a, b in PERMUTATIONS])
+
+
+def similarity(sig_a, sig_b):
+    """两个签名估计的 Jaccard 相似度"""
+    return sum(1 for x, y in zip(sig_a, sig_b) if x == y) / NUM_PERM
+
+
+def band_buckets(signature):
+    """每个带的桶号：带内各行的 blake2b 摘要，不随 Python 版本和进程变化"""
+    return [int.from_bytes(hashlib.blake2b(
+                signature[i * ROWS_PER_BAND:(i + 1) * ROWS_PER_BAND].tobytes(),
+                digest_size=8).digest(), 'big', signed=True)
+            for i in range(NUM_BANDS)]
+
+
+def signatures(news_item):
+    """新闻的 {签名类型: MinHash 签名}"""
+    title = tokens(news_item.get('title', ''))
+    text = title | tokens((news_item.get('summary') or '')[:500])
+
+    result = {}
+    if len(title) >= MIN_TOKENS:
+        result[KIND_TITLE] = minhash(title)
+    if len(text) > len(title) and len(text) >= MIN_TOKENS:
+        result[KIND_TEXT] = minhash(text)
+    return result
+
+
+def open_cluster_index(config):
+    """按配置打开聚类索引，未启用时返回 None"""
+    cluster_config = config.get('clustering', {})
+    if not cluster_config.get('enabled', True):
+        return None
+    return StoryClusterIndex(
+        cluster_config.get('path', 'data/clusters.db'),
+        cluster_config.get('threshold', 0.5),
+        cluster_config.get('ttl_days', 7)
+    )
+
+
+class StoryClusterIndex:
+    """持久化的近似重复聚类索引
+
+    簇编号为首条新闻的 URL 哈希；LSH 桶表按 (类型, 带, 桶号) 建索引，
+    查找只涉及命中的桶，再用签名估计相似度确认。成员同时记录评分，
+    用于判断后来的成员是否比已通知的代表更重要；alerts 表记录已发出 🔴 告警的簇，
+    每个簇只告警一次。
+    """
+
+    def __init__(self, path, threshold=0.5, ttl_days=7):
+        self.path = Path(path)
+        self.threshold = threshold
+        self.ttl = ttl_days * 86400
+        self.lookups = 0
+        self.duplicates = 0
+        self._lock = threading.Lock()
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS members ("
+            " url_hash INTEGER PRIMARY KEY,"
+            " cluster_id INTEGER NOT NULL,"
+            " url TEXT NOT NULL,"
+            " source TEXT,"
+            " title TEXT,"
+            " title_sig BLOB,"
+            " text_sig BLOB,"
+            " added_at REAL NOT NULL,"
+            " score REAL)"
+        )
+        self.conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_members_cluster ON members(cluster_id)"
+        )
+        self.conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_members_added ON members(added_at)"
+        )
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS buckets ("
+            " kind INTEGER NOT NULL,"
+            " band INTEGER NOT NULL,"
+            " bucket INTEGER NOT NULL,"
+            " url_hash INTEGER NOT NULL)"
+        )
+        self.conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_buckets ON buckets(kind, band, bucket)"
+        )
+        self.conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_buckets_url ON buckets(url_hash)"
+        )
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS alerts ("
+            " cluster_id INTEGER PRIMARY KEY,"
+            " url TEXT NOT NULL,"
+            " alerted_at REAL NOT NULL)"
+        )
+        self.conn.commit()
+
+    def _find_cluster(self, sigs):
+        """返回与签名最相似的已有成员所在的簇，没有则返回 None"""
+        best_cluster, best_similarity = None, self.threshold
+
+        for kind, signature in sigs.items():
+            candidates = set()
+            for band, bucket in enumerate(band_buckets(signature)):
+                candidates.update(row[0] for row in self.conn.execute(
+                    "SELECT url_hash FROM buckets WHERE kind = ? AND band = ? AND bucket = ?",
+                    (kind, band, bucket)
+                ))
+
+            column = 'title_sig' if kind == KIND_TITLE else 'text_sig'
+            for candidate in candidates:
+                row = self.conn.execute(
+                    f"SELECT cluster_id, {column} FROM members WHERE url_hash = ?",
+                    (candidate,)
+                ).fetchone()
+                if not row or row[1] is None:
+                    continue
+                score = similarity(signature, array('q', row[1]))
+                if score >= best_similarity:
+                    best_cluster, best_similarity = row[0], score
+
+        return best_cluster
+
+    def assign(self, news_item):
+        """把（已评分的）新闻加入索引，返回 (簇编号, 是否为新簇)"""
+        url = news_item.get('url')
+        if not url:
+            return None, True
+
+        key = url_hash(url)
+        sigs = signatures(news_item)
+
+        with self._lock:
+            self.lookups += 1
+
+            row = self.conn.execute(
+                "SELECT cluster_id FROM members WHERE url_hash = ?", (key,)
+            ).fetchone()
+            if row:
+                return row[0], row[0] == key
+
+            cluster_id = self._find_cluster(sigs)
+            is_new = cluster_id is None
+            if is_new:
+                cluster_id = key
+            else:
+                self.duplicates += 1
+
+            self.conn.execute(
+                "INSERT INTO members (url_hash, cluster_id, url, source, title,"
+                " title_sig, text_sig, added_at, score) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, cluster_id, url, news_item.get('source'), news_item.get('title'),
+                 sigs[KIND_TITLE].tobytes() if KIND_TITLE in sigs else None,
+                 sigs[KIND_TEXT].tobytes() if KIND_TEXT in sigs else None,
+                 time.time(), news_item.get('importance_score'))
+            )
+            self.conn.executemany(
+                "INSERT INTO buckets (kind, band, bucket, url_hash) VALUES (?, ?, ?, ?)",
+                [(kind, band, bucket, key)
+                 for kind, signature in sigs.items()
+                 for band, bucket in enumerate(band_buckets(signature))]
+            )
+
+        return cluster_id, is_new
+
+    def members(self, cluster_id):
+        """簇内所有成员 [{url, source, title}]，按加入时间排序"""
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT url, source, title FROM members WHERE cluster_id = ?"
+                " ORDER BY added_at", (cluster_id,)
+            ).fetchall()
+        return [{'url': url, 'source': source, 'title': title}
+                for url, source, title in rows]
+
+    def best_score(self, cluster_id, url):
+        """簇内除 url 以外成员的最高分，没有评分记录时返回 None"""
+        with self._lock:
+            return self.conn.execute(
+                "SELECT MAX(score) FROM members WHERE cluster_id = ? AND url_hash != ?",
+                (cluster_id, url_hash(url))
+            ).fetchone()[0]
+
+    def mark_alerted(self, cluster_id, url):
+        """记录簇已发出 🔴 告警，返回是否为该簇的首次告警"""
+        with self._lock:
+            cursor = self.conn.execute(
+                "INSERT OR IGNORE INTO alerts (cluster_id, url, alerted_at) VALUES (?, ?, ?)",
+                (cluster_id, url, time.time())
+            )
+        return cursor.rowcount == 1
+
+    def commit(self):
+        """提交待写入的记录"""
+        with self._lock:
+            self.conn.commit()
+
+    def compact(self):
+        """删除超过 TTL 的成员及其桶记录，返回删除条数"""
+        cutoff = time.time() - self.ttl
+        with self._lock:
+            self.conn.execute(
+                "DELETE FROM buckets WHERE url_hash IN"
+                " (SELECT url_hash FROM members WHERE added_at < ?)", (cutoff,)
+            )
+            cursor = self.conn.execute(
+                "DELETE FROM members WHERE added_at < ?", (cutoff,)
+            )
+            self.conn.execute(
+                "DELETE FROM alerts WHERE cluster_id NOT IN (SELECT cluster_id FROM members)"
+            )
+            self.conn.commit()
+        return cursor.rowcount
+
+    def size(self):
+        """当前成员数"""
+        with self._lock:
+            return self.conn.execute("SELECT COUNT(*) FROM members").fetchone()[0]
+
+    def stats(self):
+        """本进程内的聚类统计"""
+        return {
+            'lookups': self.lookups,
+            'duplicates': self.duplicates,
+            'size': self.size()
+        }
+
+    def close(self):
+        """提交并关闭"""
+        with self._lock:
+            self.conn.commit()
+            self.conn.close()
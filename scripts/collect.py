@@ -10,134 +10,598 @@ import os
 import sys
 import json
 import time
-import feedparser
-import requests
-from datetime import datetime, timedelta
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
+from urllib.parse import urlparse
+
+from feed_cache import FeedCache
+from feed_parser import parse_feed
+from http_client import HTTPClient
+from metrics import Metrics, append_record, percentile, records_path
+from news_io import NDJSONWriter
+from news_store import open_news_store
+from scheduler import open_scheduler
+from seen_store import SeenURLStore
+from watermarks import WatermarkStore
+
+
+class HostLimiter:
+    """按主机限制并发请求数"""
+    
+    def __init__(self, per_host=4, host_limits=None):
+        self.per_host = per_host
+        self.host_limits = host_limits or {}
+        self._lock = threading.Lock()
+        self._semaphores = {}
+    
+    def _semaphore(self, host):
+        with self._lock:
+            if host not in self._semaphores:
+                limit = self.host_limits.get(host, self.per_host)
+                self._semaphores[host] = threading.BoundedSemaphore(max(1, limit))
+            return self._semaphores[host]
+    
+    @contextmanager
+    def limit(self, url):
+        """在该 URL 所属主机的并发配额内执行"""
+        semaphore = self._semaphore(urlparse(url).netloc)
+        with semaphore:
+            yield
+
 
 class AINewsCollector:
     """AI 新闻实时采集器"""
     
+    ARXIV_API_URL = "http://export.arxiv.org/api/query?"
+    # arXiv API 使用建议：连续请求间隔不少于 3 秒
+    ARXIV_RATE_LIMIT = 3
+    HN_API_BASE = "https://hacker-news.firebaseio.com/v0"
+    
     def __init__(self, config_path):
+        self.config_path = config_path
         self.config = self.load_config(config_path)
         self.collected_news = []
         self.seen_urls = set()
+        self._lock = threading.Lock()
+        self._accepting = True
+        self._stream = None
+        # 流式模式下不在 collected_news 中累积
+        self.retain_news = True
+        
+        # 运行指标：进程内累计（Prometheus 导出）+ 本轮各源统计（写入运行记录）
+        self.metrics = Metrics()
+        self.metrics.describe('source_duration_seconds', '单个采集任务的耗时')
+        self.metrics.describe('fetch_seconds', '单个 HTTP 请求的耗时（含响应体）')
+        self.metrics.describe('fetch_bytes_total', '响应体字节数')
+        self.metrics.describe('fetch_requests_total', 'HTTP 请求数')
+        self.metrics.describe('fetch_errors_total', '失败的 HTTP 请求数（连接错误或 4xx/5xx）')
+        self.metrics.describe('source_errors_total', '采集任务失败次数')
+        self.metrics.describe('items_total', '去重后加入的新闻条数')
+        self.source_stats = {}
+        self._source = threading.local()
+        
+        # 跨运行的已见 URL 索引（可在配置中关闭）
+        seen_config = self.config.get('seen_store', {})
+        if seen_config.get('enabled', True):
+            self.seen_store = SeenURLStore(
+                seen_config.get('path', 'data/seen_urls.db'),
+                seen_config.get('ttl_days', 7)
+            )
+        else:
+            self.seen_store = None
+        
+        # 新闻库：采集到的新闻逐条 upsert（可在配置中关闭）
+        self.news_store = open_news_store(self.config)
+        
+        # 所有源共用的 HTTP 连接池
+        self.http = HTTPClient(
+            pool_size=self.config.get('http', {}).get('pool_size', 32)
+        )
+        self.http.on_response = self.record_response
+        
+        # RSS/Atom 条件请求缓存
+        self.feed_cache = FeedCache(
+            self.config.get('feed_cache', {}).get('path', 'data/feed_cache.json'),
+            session=self.http
+        )
+        
+        # 各源的采集高水位
+        self.watermarks = WatermarkStore(
+            self.config.get('watermarks', {}).get('path', 'data/watermarks.json')
+        )
+        
+        # 各源的自适应轮询排期（可在配置中关闭，关闭时按固定间隔轮询）
+        self.scheduler = open_scheduler(self.config)
+        
+        self.apply_config()
         
     def load_config(self, config_path):
         """加载配置文件"""
         with open(config_path, 'r', encoding='utf-8') as f:
             return json.load(f)
     
+    def apply_config(self):
+        """应用可热更新的配置项（重试、限速、主机并发）"""
+        http_config = self.config.get('http', {})
+        self.http.max_retries = http_config.get('max_retries', 3)
+        self.http.backoff = http_config.get('backoff', 0.5)
+        self.http.max_backoff = http_config.get('max_backoff', 30)
+        self.http.rate_limits = {
+            urlparse(self.ARXIV_API_URL).netloc: self.ARXIV_RATE_LIMIT,
+            **http_config.get('rate_limits', {})
+        }
+        
+        scheduler_config = self.config.get('scheduler', {})
+        self.host_limiter = HostLimiter(
+            scheduler_config.get('per_host', 4),
+            scheduler_config.get('host_limits', {})
+        )
+        
+        # 订阅源解析后端：fast（iterparse）或 feedparser
+        self.feed_backend = self.config.get('feed_parser', {}).get('backend', 'fast')
+        
+        # 停机后最多追赶的时长
+        self.max_catchup = timedelta(
+            hours=self.config.get('watermarks', {}).get('max_catchup_hours', 24)
+        )
+    
+    def reload_config(self):
+        """重新加载配置文件，保留连接池、缓存和已见索引"""
+        self.config = self.load_config(self.config_path)
+        if self.scheduler:
+            self.scheduler.save()
+        self.scheduler = open_scheduler(self.config)
+        self.apply_config()
+    
+    def reset(self):
+        """清空本轮采集结果，准备下一轮"""
+        with self._lock:
+            self.collected_news = []
+            self.seen_urls = set()
+    
     def collect_all(self):
-        """采集所有信息源"""
+        """采集所有到了轮询时间的信息源"""
+        return self.run_tasks(self.due_tasks())
+    
+    def due_tasks(self, now=None):
+        """到了轮询时间的采集任务；未启用自适应调度时返回全部任务"""
+        tasks = self.build_tasks()
+        if not self.scheduler:
+            return tasks
+        return [task for task in tasks if self.scheduler.is_due(task[0], now)]
+    
+    def run_tasks(self, tasks):
+        """并发执行采集任务，返回本轮收集到的新闻列表"""
+        for _ in self.iter_collect(tasks):
+            pass
+        
+        return self.collected_news
+    
+    def iter_collect(self, tasks=None):
+        """流式采集：每条新闻在其源响应后立即产出
+        
+        所有源的抓取任务并发提交到同一个线程池，受全局并发数、单主机并发数
+        和整轮时间预算约束。超出预算或消费方提前结束时停止接收结果：尚未开始的任务取消，
+        进行中的任务在下一个检查点（加入新闻、翻页、下一批请求）退出，HTTP 请求不再重试；
+        等全部任务退出后才保存水位和订阅源缓存，不会与下一轮重叠。
+        tasks 为 None 时采集到了轮询时间的源。
+        """
+        if tasks is None:
+            tasks = self.due_tasks()
+        
         print(f"[{datetime.now()}] 开始采集 AI 新闻...")
         
-        # 采集 arXiv 论文
-        print("→ 采集 arXiv...")
-        self.collect_arxiv()
+        scheduler_config = self.config.get('scheduler', {})
+        max_workers = max(1, int(scheduler_config.get('max_workers', 16)))
+        time_budget = scheduler_config.get('time_budget', 120)
+        
+        print(f"→ 并发调度 {len(tasks)} 个采集任务"
+              f"（并发 {max_workers}，预算 {time_budget}s）...")
+        
+        self._accepting = True
+        self.http.stopped.clear()
+        self._stream = queue.Queue()
+        with self._lock:
+            self.source_stats = {}
+        started_at = time.time()
+        start = time.monotonic()
+        deadline = start + time_budget
+        total = 0
+        pool = ThreadPoolExecutor(max_workers=max_workers)
+        futures = {pool.submit(self.run_source, name, func): name
+                   for name, interval, func in tasks}
+        
+        try:
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    news_item = self._stream.get(timeout=min(0.1, remaining))
+                except queue.Empty:
+                    if all(future.done() for future in futures) and self._stream.empty():
+                        break
+                    continue
+                
+                total += 1
+                yield news_item
+        finally:
+            # 停止接收结果，取消尚未开始的任务，等进行中的任务退出
+            self._accepting = False
+            self.http.stopped.set()
+            unfinished = {future for future in futures if not future.done()}
+            pool.shutdown(wait=True, cancel_futures=True)
+            self._stream = None
+            
+            for future, name in futures.items():
+                if future in unfinished:
+                    print(f"  ✗ {name} 超出时间预算，已停止")
+                    self.record_failure(name)
+                elif future.exception():
+                    self.report_failure(name, future.exception())
+            
+            self.observe_schedule(tasks, futures, unfinished)
+            elapsed = time.monotonic() - start
+            print(f"✓ 采集完成，共收集 {total} 条新闻，耗时 {elapsed:.2f}s")
+            self.report_stats()
+            self.write_record(started_at, elapsed, total)
+    
+    def run_source(self, name, func):
+        """在当前线程标记来源后运行采集任务并记录耗时"""
+        self._source.name = name
+        start = time.monotonic()
+        try:
+            return func()
+        finally:
+            elapsed = time.monotonic() - start
+            self._source.name = None
+            self.metrics.observe('source_duration_seconds', elapsed, source=name)
+            with self._lock:
+                self._source_entry(name)['latency_s'] += elapsed
+    
+    def current_source(self):
+        """当前线程正在采集的来源名称"""
+        return getattr(self._source, 'name', None)
+    
+    def _source_entry(self, name):
+        """本轮某个来源的统计（调用方持有 self._lock）"""
+        return self.source_stats.setdefault(name, {
+            'latency_s': 0.0, 'requests': 0, 'bytes': 0,
+            'items': 0, 'errors': 0, 'fetch_s': []
+        })
+    
+    def record_response(self, url, elapsed, nbytes, error):
+        """HTTP 请求回调：按来源（没有来源时按主机）累计延迟、字节数和错误"""
+        source = self.current_source() or urlparse(url).netloc
+        self.metrics.observe('fetch_seconds', elapsed, source=source)
+        self.metrics.inc('fetch_requests_total', source=source)
+        self.metrics.inc('fetch_bytes_total', nbytes, source=source)
+        if error:
+            self.metrics.inc('fetch_errors_total', source=source)
+        with self._lock:
+            entry = self._source_entry(source)
+            entry['requests'] += 1
+            entry['bytes'] += nbytes
+            entry['fetch_s'].append(elapsed)
+    
+    def record_failure(self, name):
+        """记一次采集任务失败"""
+        self.metrics.inc('source_errors_total', source=name)
+        with self._lock:
+            self._source_entry(name)['errors'] += 1
+    
+    def report_failure(self, name, error):
+        """打印并记录采集失败"""
+        print(f"  ✗ {name} 采集失败: {error}")
+        self.record_failure(name)
+    
+    def write_record(self, started_at, elapsed, total):
+        """追加本轮的采集运行记录：各源耗时、请求、字节、条数、错误和请求延迟百分位"""
+        with self._lock:
+            stats = {name: dict(entry) for name, entry in self.source_stats.items()}
+        
+        sources = {}
+        for name, entry in stats.items():
+            fetch_s = entry.pop('fetch_s')
+            entry['latency_s'] = round(entry['latency_s'], 3)
+            entry['fetch_p50_s'] = round(percentile(fetch_s, 50) or 0, 3)
+            entry['fetch_p90_s'] = round(percentile(fetch_s, 90) or 0, 3)
+            entry['fetch_max_s'] = round(max(fetch_s, default=0), 3)
+            sources[name] = entry
         
-        # 采集官方博客（RSS）
-        print("→ 采集官方博客...")
-        self.collect_blogs()
+        append_record(records_path(self.config), 'collect',
+                      started_at=started_at,
+                      elapsed_seconds=round(elapsed, 3),
+                      collected=total,
+                      sources=sources,
+                      http=self.http.stats())
+    
+    def observe_schedule(self, tasks, futures, unfinished=()):
+        """把本轮各源的新增条数计入自适应排期；超时或全部请求失败的源不计入统计"""
+        if not self.scheduler:
+            return
         
-        # 采集新闻网站
-        print("→ 采集新闻网站...")
-        self.collect_news_sites()
+        intervals = {name: interval for name, interval, func in tasks}
+        with self._lock:
+            stats = {name: dict(entry) for name, entry in self.source_stats.items()}
         
-        # 采集 X/Twitter（如果有 API）
-        print("→ 采集 X/Twitter...")
-        self.collect_twitter()
+        for future, name in futures.items():
+            entry = stats.get(name, {})
+            items = entry.get('items', 0)
+            failed = (future in unfinished or future.cancelled() or bool(future.exception())
+                      or (entry.get('errors', 0) > 0 and not items))
+            self.scheduler.observe(name, intervals[name], items, failed=failed)
+    
+    def report_stats(self):
+        """保存缓存并打印本轮的缓存、连接和已见索引统计"""
+        self.feed_cache.save()
+        self.watermarks.save()
+        if self.scheduler:
+            self.scheduler.save()
+        cache_stats = self.feed_cache.stats()
+        print(f"  订阅源缓存: 304 命中 {cache_stats['hits']}，间隔内跳过 "
+              f"{cache_stats['skipped']}，重新下载 {cache_stats['misses']}")
         
-        # 采集 Hacker News
-        print("→ 采集 Hacker News...")
-        self.collect_hackernews()
+        http_stats = self.http.stats()
+        print(f"  HTTP 连接: 发出 {http_stats['requests']} 个请求，新建 "
+              f"{http_stats['connections']} 个连接，重试 {http_stats['retries']} 次")
         
-        print(f"✓ 采集完成，共收集 {len(self.collected_news)} 条新闻\n")
+        if self.seen_store:
+            self.seen_store.commit()
+            stats = self.seen_store.stats()
+            print(f"  已见索引: 查询 {stats['lookups']} 次，命中 {stats['hits']} 次"
+                  f"（命中率 {stats['hit_rate']:.1%}），共 {stats['size']} 条记录")
         
-        return self.collected_news
+        if self.news_store:
+            self.news_store.commit()
+            print(f"  新闻库: 共 {self.news_store.size()} 条新闻")
+        print()
     
-    def collect_arxiv(self):
-        """采集 arXiv AI 论文"""
-        base_url = "http://export.arxiv.org/api/query?"
+    def build_tasks(self):
+        """构建采集任务列表 [(名称, 轮询间隔秒数, 可调用对象)]"""
+        tasks = []
+        default_interval = self.config.get('update_interval_minutes', 5) * 60
+        
+        # arXiv 论文（所有分类合并为一个查询，或每个分类一个任务）
+        arxiv_config = self.config.get('arxiv', {})
+        arxiv_interval = arxiv_config.get('update_interval', default_interval)
+        if arxiv_config.get('combined', True):
+            tasks.append(("arXiv", arxiv_interval, self.collect_arxiv))
+        else:
+            for cat in self.get_arxiv_categories():
+                tasks.append((f"arXiv {cat}", arxiv_interval,
+                              lambda cat=cat: self.collect_arxiv_category(cat)))
+        
+        # 官方博客 RSS（每个源一个任务）
+        for blog in self.config.get('blogs', []):
+            tasks.append((blog['name'], blog.get('update_interval', default_interval),
+                          lambda blog=blog: self.collect_blog(blog)))
+        
+        # 新闻网站、X/Twitter、Hacker News
+        hn_interval = self.config.get('hackernews', {}).get('update_interval', default_interval)
+        tasks.append(("新闻网站", default_interval, self.collect_news_sites))
+        tasks.append(("X/Twitter", default_interval, self.collect_twitter))
+        tasks.append(("Hacker News", hn_interval, self.collect_hackernews))
+        
+        return tasks
+    
+    def add_news(self, news_item):
+        """线程安全地加入一条新闻（按 URL 去重），返回是否加入"""
+        with self._lock:
+            if not self._accepting:
+                return False
+            
+            url = news_item.get('url')
+            if url in self.seen_urls:
+                return False
+            
+            self.seen_urls.add(url)
+            # 源响应解析后加入采集结果的时间，用于统计 来源 → 通知 的延迟
+            news_item.setdefault('fetched_at', time.time())
+            if self.retain_news:
+                self.collected_news.append(news_item)
+            if self._stream is not None:
+                self._stream.put(news_item)
+        
+        source = self.current_source() or news_item.get('source')
+        self.metrics.inc('items_total', source=source)
+        with self._lock:
+            self._source_entry(source)['items'] += 1
         
-        categories = self.config.get('arxiv_categories', [
+        self.mark_seen(url)
+        if self.news_store is not None:
+            self.news_store.upsert(news_item)
+        return True
+    
+    def is_seen(self, url):
+        """URL 是否在之前的运行中已采集过"""
+        return bool(url) and self.seen_store is not None and self.seen_store.contains(url)
+    
+    def mark_seen(self, url):
+        """将 URL 记入跨运行的已见索引"""
+        if url and self.seen_store is not None:
+            self.seen_store.add(url)
+    
+    def get_arxiv_categories(self):
+        """获取 arXiv 分类配置"""
+        return self.config.get('arxiv_categories', [
             'cs.AI',   # Artificial Intelligence
             'cs.CL',   # Computation and Language
             'cs.CV',   # Computer Vision
             'cs.LG',   # Machine Learning
             'cs.NE'    # Neural and Evolutionary Computing
         ])
+    
+    def window_start(self, key, initial, now=None):
+        """增量采集的起点（UTC）
         
-        # 查询最近 24 小时的论文
-        for cat in categories:
-            try:
-                # 构建查询：指定类别 + 最近时间
-                query = f"cat:{cat}"
-                
+        从上次成功采集的高水位开始；没有水位时回看 initial，
+        停机后的追赶不早于 max_catchup 之前。
+        """
+        now = now or datetime.now(timezone.utc)
+        watermark = self.watermarks.get(key)
+        since = datetime.fromisoformat(watermark) if watermark else now - initial
+        return max(since, now - self.max_catchup)
+    
+    def collect_arxiv(self):
+        """采集 arXiv AI 论文"""
+        if self.config.get('arxiv', {}).get('combined', True):
+            # 合并查询，跨分类的论文只取一次
+            self.collect_arxiv_query(self.get_arxiv_categories())
+        else:
+            for cat in self.get_arxiv_categories():
+                self.collect_arxiv_category(cat)
+    
+    def collect_arxiv_category(self, cat):
+        """采集单个 arXiv 分类"""
+        self.collect_arxiv_query([cat])
+    
+    def collect_arxiv_query(self, categories):
+        """按提交时间范围查询 arXiv 并分页取完
+        
+        时间范围从上次采集到的最新提交时间（高水位）到现在；
+        首次运行取最近 initial_window_hours 小时，停机后最多追赶 max_catchup_hours。
+        """
+        base_url = self.ARXIV_API_URL
+        arxiv_config = self.config.get('arxiv', {})
+        key = f"arxiv:{','.join(categories)}"
+        name = 'arXiv' if len(categories) > 1 else f"arXiv {categories[0]}"
+        
+        # 未到轮询间隔
+        interval = arxiv_config.get('update_interval', 0)
+        if interval and not self.scheduler and self.watermarks.age(key) < interval:
+            return
+        
+        page_size = arxiv_config.get('page_size', 100)
+        max_results = arxiv_config.get('max_results', 1000)
+        
+        try:
+            started = time.time()
+            now = datetime.fromtimestamp(started, timezone.utc)
+            initial = timedelta(hours=arxiv_config.get('initial_window_hours', 1))
+            since = self.window_start(key, initial, now)
+            
+            # 构建查询：分类 OR 组合 + 提交时间范围（GMT，精确到分钟）
+            cats = ' OR '.join(f"cat:{cat}" for cat in categories)
+            query = (f"({cats}) AND submittedDate:"
+                     f"[{since:%Y%m%d%H%M} TO {now:%Y%m%d%H%M}]")
+            
+            newest = since
+            # 已处理（加入或之前已采集过）的最早提交时间；结果按提交时间降序返回
+            oldest = None
+            exhausted = False
+            fetched = 0
+            start = 0
+            while start < max_results and self._accepting:
                 params = {
                     'search_query': query,
-                    'start': 0,
-                    'max_results': 50,
+                    'start': start,
+                    'max_results': min(page_size, max_results - start),
                     'sortBy': 'submittedDate',
                     'sortOrder': 'descending'
                 }
                 
-                response = requests.get(base_url, params=params, timeout=30)
+                with self.host_limiter.limit(base_url):
+                    response = self.http.get(base_url, params=params, timeout=30)
                 response.raise_for_status()
                 
-                feed = feedparser.parse(response.content)
+                feed = parse_feed(response.content, self.feed_backend)
                 
+                stopped = False
                 for entry in feed.entries:
-                    # 检查是否在 1 小时内
-                    published = datetime(*entry.published_parsed[:6])
-                    if datetime.now() - published > timedelta(hours=1):
-                        continue
-                    
-                    # 去重
-                    if entry.link in self.seen_urls:
-                        continue
+                    published = datetime(*entry.published_parsed[:6], tzinfo=timezone.utc)
                     
-                    self.seen_urls.add(entry.link)
+                    # 之前的运行已采集过
+                    if not self.is_seen(entry.link):
+                        primary = entry.get('arxiv_primary_category', {}).get('term')
+                        
+                        # 去重后加入；采集已停止接收时这篇及更早的论文留给下一轮
+                        added = self.add_news({
+                            'source': 'arXiv',
+                            'category': primary or categories[0],
+                            'title': entry.title,
+                            'url': entry.link,
+                            'authors': [author.name for author in entry.authors],
+                            'abstract': entry.summary,
+                            'published': published.isoformat(),
+                            'importance_score': 0  # 后续计算
+                        })
+                        if not added and not self._accepting:
+                            stopped = True
+                            break
                     
-                    self.collected_news.append({
-                        'source': 'arXiv',
-                        'category': cat,
-                        'title': entry.title,
-                        'url': entry.link,
-                        'authors': [author.name for author in entry.authors],
-                        'abstract': entry.summary,
-                        'published': published.isoformat(),
-                        'importance_score': 0  # 后续计算
-                    })
-                    
-            except Exception as e:
-                print(f"  ✗ arXiv {cat} 采集失败: {e}")
+                    newest = max(newest, published)
+                    oldest = published if oldest is None else min(oldest, published)
+                    fetched += 1
+                
+                if stopped:
+                    break
+                start += len(feed.entries)
+                total = int(feed.feed.get('opensearch_totalresults', 0))
+                if len(feed.entries) < params['max_results'] or start >= total:
+                    exhausted = True
+                    break
+            
+            # 窗口取完才推进到最新提交时间；受 max_results 或停止接收所限时
+            # 只推进到实际取到的最早一篇，更早的论文留在下一轮的窗口内
+            mark = newest if exhausted else (oldest or since)
+            self.watermarks.set(key, mark.isoformat(), started)
+            note = '' if exhausted else f"（未取完，下轮从 {mark:%m-%d %H:%M} 继续）"
+            print(f"  ✓ {name}: {since:%m-%d %H:%M} 起共 {fetched} 篇{note}")
+                
+        except Exception as e:
+            self.report_failure(name, e)
     
     def collect_blogs(self):
         """采集官方博客 RSS"""
-        blogs = self.config.get('blogs', [])
+        for blog in self.config.get('blogs', []):
+            self.collect_blog(blog)
+    
+    def collect_blog(self, blog):
+        """采集单个博客 RSS（只取上次成功采集的最新发布时间之后的文章）"""
+        interval = blog.get('update_interval', 0)
+        key = f"blog:{blog['url']}"
         
-        for blog in blogs:
-            try:
-                feed = feedparser.parse(blog['url'])
-                
-                for entry in feed.entries[:20]:  # 每个源最多 20 条
-                    # 检查时效（1 小时内）
-                    if hasattr(entry, 'published_parsed'):
-                        published = datetime(*entry.published_parsed[:6])
-                    else:
-                        published = datetime.now() - timedelta(minutes=30)
-                    
-                    if datetime.now() - published > timedelta(hours=1):
-                        continue
-                    
-                    # 去重
-                    if entry.link in self.seen_urls:
+        try:
+            # 启用自适应调度时轮询时机由调度决定，这里不再按固定间隔跳过；
+            # 新的 ETag 等全部条目都被接收后才提交
+            with self.host_limiter.limit(blog['url']):
+                content = self.feed_cache.fetch(blog['url'], 0 if self.scheduler else interval,
+                                                deferred=True)
+            
+            # 未到轮询间隔或内容未变化
+            if content is None:
+                return
+            
+            # 每个博客最多取最新的 max_entries 条（默认 20）
+            feed = parse_feed(content, self.feed_backend, blog.get('max_entries', 20))
+            
+            # 首次采集回看 1 小时或一个轮询间隔
+            since = self.window_start(key, max(timedelta(hours=1), timedelta(seconds=interval)))
+            newest = since
+            # 已接收条目的发布时间，和采集停止接收后剩下的条目
+            accepted = []
+            remaining = []
+            
+            for position, entry in enumerate(feed.entries):
+                # 没有发布时间的条目只靠已见索引去重，不推进水位
+                if entry.get('published_parsed'):
+                    published = datetime(*entry.published_parsed[:6], tzinfo=timezone.utc)
+                    if published < since:
                         continue
-                    
-                    self.seen_urls.add(entry.link)
-                    
-                    self.collected_news.append({
+                    dated = True
+                else:
+                    published = datetime.now(timezone.utc)
+                    dated = False
+                
+                # 之前的运行已采集过
+                if not self.is_seen(entry.link):
+                    # 去重后加入
+                    added = self.add_news({
                         'source': blog['name'],
                         'title': entry.title,
                         'url': entry.link,
@@ -145,9 +609,31 @@ class AINewsCollector:
                         'published': published.isoformat(),
                         'importance_score': 0
                     })
-                    
-            except Exception as e:
-                print(f"  ✗ {blog['name']} 采集失败: {e}")
+                    if not added and not self._accepting:
+                        remaining = feed.entries[position:]
+                        break
+                
+                if dated:
+                    newest = max(newest, published)
+                    accepted.append(published)
+            
+            if not remaining:
+                # 整个订阅源处理完才推进水位、提交 ETag
+                self.feed_cache.commit(blog['url'])
+                self.watermarks.set(key, newest.isoformat())
+                return
+            
+            # 水位只推进到最早的未接收条目之前，ETag 不提交，下一轮重新取回整个订阅源
+            left = [datetime(*entry.published_parsed[:6], tzinfo=timezone.utc)
+                    for entry in remaining if entry.get('published_parsed')]
+            left = [published for published in left if published >= since]
+            if left:
+                newest = max((published for published in accepted if published < min(left)),
+                             default=since)
+            self.watermarks.set(key, newest.isoformat())
+                
+        except Exception as e:
+            self.report_failure(blog['name'], e)
     
     def collect_news_sites(self):
         """采集新闻网站"""
@@ -162,61 +648,221 @@ class AINewsCollector:
         pass
     
     def collect_hackernews(self):
-        """采集 Hacker News AI 相关"""
+        """采集 Hacker News AI 相关
+        
+        只处理 id 大于上次成功处理的最大 id（高水位）的 story。
+        """
+        hn_config = self.config.get('hackernews', {})
+        if hn_config.get('mode', 'newstories') == 'maxitem':
+            self.collect_hackernews_range()
+            return
+        
+        concurrency = max(1, int(hn_config.get('concurrency', 32)))
+        max_stories = hn_config.get('max_stories', 100)
+        key = 'hackernews'
+        
         try:
+            last_id = self.watermarks.get(key, 0)
+            
+            # 首次采集回看 1 小时，停机后最多追赶 max_catchup
+            now = datetime.now(timezone.utc)
+            since = now - (self.max_catchup if last_id else timedelta(hours=1))
+            
             # 获取最新 stories
-            api_url = "https://hacker-news.firebaseio.com/v0/newstories.json"
-            response = requests.get(api_url, timeout=10)
+            api_url = f"{self.HN_API_BASE}/newstories.json"
+            with self.host_limiter.limit(api_url):
+                response = self.http.get(api_url, timeout=10)
             response.raise_for_status()
             
-            story_ids = response.json()[:100]  # 最新 100 条
+            # 只取水位之上的 id（newstories 按 id 倒序）
+            new_ids = [sid for sid in response.json() if sid > last_id]
             
-            for story_id in story_ids:
-                try:
-                    # 获取 story 详情
-                    story_url = f"https://hacker-news.firebaseio.com/v0/item/{story_id}.json"
-                    story_resp = requests.get(story_url, timeout=5)
-                    story_resp.raise_for_status()
-                    story = story_resp.json()
-                    
-                    # 检查时间（1 小时内）
-                    if story.get('time'):
-                        published = datetime.fromtimestamp(story['time'])
-                        if datetime.now() - published > timedelta(hours=1):
-                            continue
-                    
-                    # 检查是否是 AI 相关（标题或 URL）
-                    title = story.get('title', '').lower()
-                    url = story.get('url', '')
-                    
-                    ai_keywords = ['ai', 'machine learning', 'deep learning', 
-                                  'neural network', 'gpt', 'llm', 'model',
-                                  'openai', 'anthropic', 'google gemini']
+            # 跳过之前的运行已处理过的 story，不再请求详情；
+            # 其余的取最新 max_stories 条，更早的留给下一轮
+            pending = [sid for sid in new_ids if not self.is_seen(self.hn_item_url(sid))]
+            story_ids, deferred = pending[:max_stories], pending[max_stories:]
+            
+            # 并发获取 story 详情（结果顺序与 story_ids 一致）
+            stories = self.fetch_hn_items(story_ids, concurrency)
+            fetched = dict(zip(story_ids, stories))
+            
+            # 未处理完的 id：获取失败、超出时间预算、采集已停止接收、超出 max_stories
+            unhandled = list(deferred)
+            for sid in story_ids:
+                story = fetched.get(sid)
+                if story is None or not self.handle_hn_story(sid, story, since):
+                    unhandled.append(sid)
+            
+            # 水位推进到第一个未处理完的 id 之前
+            if unhandled:
+                mark = min(unhandled) - 1
+            else:
+                mark = max(new_ids, default=last_id)
+            self.watermarks.set(key, max(mark, last_id))
                     
-                    if not any(kw in title for kw in ai_keywords):
+        except Exception as e:
+            self.report_failure('Hacker News', e)
+    
+    def collect_hackernews_range(self):
+        """按 id 区间扫描 HN（maxitem 模式）
+        
+        从 maxitem 向下扫描到高水位，每批并发获取；一批 item 全部早于
+        采集起点时提前停止。评论等非 story 的 item 直接丢弃，请求数只与
+        上次运行以来新增的 item 数有关。
+        """
+        hn_config = self.config.get('hackernews', {})
+        concurrency = max(1, int(hn_config.get('concurrency', 32)))
+        max_scan = hn_config.get('max_scan', 2000)
+        key = 'hackernews'
+        
+        try:
+            last_id = self.watermarks.get(key, 0)
+            
+            # 首次采集回看 1 小时，停机后最多追赶 max_catchup
+            now = datetime.now(timezone.utc)
+            since = now - (self.max_catchup if last_id else timedelta(hours=1))
+            cutoff = since.timestamp()
+            
+            api_url = f"{self.HN_API_BASE}/maxitem.json"
+            with self.host_limiter.limit(api_url):
+                response = self.http.get(api_url, timeout=10)
+            response.raise_for_status()
+            max_id = int(response.json())
+            
+            # 单轮最多扫描 max_scan 个 id
+            item_ids = range(max_id, max(last_id, max_id - max_scan), -1)
+            
+            missing = []
+            batch = None
+            complete = False
+            for batch, items in self.iter_hn_batches(item_ids, concurrency):
+                for item_id, item in zip(batch, items):
+                    if item is None:
+                        missing.append(item_id)
                         continue
-                    
-                    # 去重
-                    if url in self.seen_urls:
+                    if item.get('type') != 'story' or item.get('deleted'):
                         continue
                     
-                    self.seen_urls.add(url)
-                    
-                    self.collected_news.append({
-                        'source': 'Hacker News',
-                        'title': story.get('title'),
-                        'url': url,
-                        'score': story.get('score', 0),
-                        'comments': story.get('descendants', 0),
-                        'published': datetime.fromtimestamp(story['time']).isoformat(),
-                        'importance_score': 0
-                    })
-                    
-                except Exception as e:
-                    continue
+                    # 之前的运行已处理过
+                    if self.is_seen(self.hn_item_url(item_id)):
+                        continue
+                    if not self.handle_hn_story(item_id, item, since):
+                        missing.append(item_id)
+                
+                # 整批都早于采集起点，更早的 id 不必再看
+                times = [item['time'] for item in items if item and item.get('time')]
+                if times and max(times) < cutoff:
+                    complete = True
+                    break
+            else:
+                complete = not item_ids or (batch is not None and batch[-1] == item_ids[-1])
+            
+            # 向下扫描被时间预算打断时水位不动，已处理的 story 靠已见索引去重；
+            # 否则推进到第一个获取失败或未被接收的 id 之前
+            if complete:
+                mark = min(missing) - 1 if missing else max_id
+                self.watermarks.set(key, max(mark, last_id))
                     
         except Exception as e:
-            print(f"  ✗ Hacker News 采集失败: {e}")
+            self.report_failure('Hacker News', e)
+    
+    def handle_hn_story(self, story_id, story, since):
+        """处理一条已获取的 HN item，返回是否处理完
+        
+        采集已停止接收时返回 False，不记入已见索引，留给下一轮；
+        被过滤或加入的 story 记入已见索引，之后不再请求详情。
+        """
+        if story and not self.add_hn_story(story, since) and not self._accepting:
+            return False
+        self.mark_seen(self.hn_item_url(story_id))
+        return True
+    
+    def add_hn_story(self, story, since):
+        """时间和 AI 关键词过滤后加入一条 HN story，返回是否加入"""
+        # 检查时间（不早于采集起点）
+        if story.get('time'):
+            published = datetime.fromtimestamp(story['time'], timezone.utc)
+            if published < since:
+                return False
+        
+        # 检查是否是 AI 相关（标题或 URL）
+        title = story.get('title', '').lower()
+        url = story.get('url', '')
+        
+        ai_keywords = ['ai', 'machine learning', 'deep learning', 
+                      'neural network', 'gpt', 'llm', 'model',
+                      'openai', 'anthropic', 'google gemini']
+        
+        if not any(kw in title for kw in ai_keywords):
+            return False
+        
+        # 去重后加入
+        return self.add_news({
+            'source': 'Hacker News',
+            'title': story.get('title'),
+            'url': url,
+            'score': story.get('score', 0),
+            'comments': story.get('descendants', 0),
+            'published': datetime.fromtimestamp(story['time'], timezone.utc).isoformat(),
+            'importance_score': 0
+        })
+    
+    def get_hn_item(self, item_id):
+        """请求单条 HN item，失败返回 None，item 不存在返回空字典"""
+        try:
+            item_url = f"{self.HN_API_BASE}/item/{item_id}.json"
+            with self.host_limiter.limit(item_url):
+                item_resp = self.http.get(item_url, timeout=5)
+            item_resp.raise_for_status()
+            return item_resp.json() or {}
+        except Exception:
+            return None
+    
+    @staticmethod
+    def hn_item_url(story_id):
+        """HN 讨论页 URL（作为 story 的去重键）"""
+        return f"https://news.ycombinator.com/item?id={story_id}"
+    
+    def iter_hn_batches(self, item_ids, concurrency=32, fetch=None):
+        """按 concurrency 分批并发获取 HN item，逐批产出 (id 列表, 结果列表)
+        
+        消费方可以随时停止迭代，之后的批次不会再发起请求。
+        """
+        fetch = fetch or self.get_hn_item
+        item_ids = list(item_ids)
+        if not item_ids:
+            return
+        
+        # 工作线程沿用调用方的来源标记，请求统计归入同一来源
+        source = self.current_source()
+        
+        def fetch_in_source(item_id):
+            self._source.name = source
+            return fetch(item_id)
+        
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            for start in range(0, len(item_ids), concurrency):
+                # 整轮采集已超出时间预算，不再发起新批次
+                if not self._accepting:
+                    break
+                
+                batch = item_ids[start:start + concurrency]
+                batch_start = time.monotonic()
+                results = list(pool.map(fetch_in_source, batch))
+                elapsed = time.monotonic() - batch_start
+                print(f"  · HN 批次 {start // concurrency + 1}: "
+                      f"{len(batch)} 条，耗时 {elapsed:.2f}s")
+                yield batch, results
+    
+    def fetch_hn_items(self, story_ids, concurrency=32):
+        """并发获取 HN story 详情，返回列表与 story_ids 一一对应
+        
+        超出时间预算时返回已获取的部分。
+        """
+        results = []
+        for batch, stories in self.iter_hn_batches(story_ids, concurrency):
+            results.extend(stories)
+        return results
     
     def save_results(self, output_path):
         """保存采集结果"""
@@ -239,6 +885,8 @@ def main():
                        help='配置文件路径')
     parser.add_argument('--output', default='data/news_raw.json',
                        help='输出文件路径')
+    parser.add_argument('--stream', action='store_true',
+                       help='流式输出 NDJSON：每条新闻到达即写出一行')
     
     args = parser.parse_args()
     
@@ -248,11 +896,29 @@ def main():
     # 初始化采集器
     collector = AINewsCollector(args.config)
     
-    # 采集所有源
-    news = collector.collect_all()
+    if args.stream:
+        # 流式采集，不在内存中累积
+        collector.retain_news = False
+        with NDJSONWriter(args.output) as writer:
+            for news_item in collector.iter_collect():
+                writer.write(news_item)
+        print(f"✓ 结果已流式写入: {args.output}（{writer.count} 条）")
+    else:
+        # 采集所有源
+        news = collector.collect_all()
+        
+        # 保存结果
+        collector.save_results(args.output)
+    
+    # 压缩并关闭已见索引
+    if collector.seen_store:
+        collector.seen_store.compact()
+        collector.seen_store.close()
+    
+    if collector.news_store:
+        collector.news_store.close()
     
-    # 保存结果
-    collector.save_results(args.output)
+    collector.http.close()
     
     return 0
 
@@ -0,0 +1,349 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+AI 新闻常驻监控进程
+在同一进程内按各源的轮询间隔运行 采集 → 评分 → 摘要 → 通知，
+连接池、订阅源缓存和已见索引常驻内存，配置文件修改后自动热加载
+"""
+
+import json
+import signal
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+from metrics import append_record, records_path
+from news_store import parse_published
+from pipeline import AINewsPipeline
+from summarize import DigestDocument
+
+
+class StatusHandler(BaseHTTPRequestHandler):
+    """本地健康检查 / 状态接口"""
+
+    def do_GET(self):
+        tracker = self.server.tracker
+
+        if self.path == '/health':
+            body = {'status': 'ok', 'uptime_seconds': tracker.uptime()}
+        elif self.path == '/status':
+            body = tracker.status()
+        elif self.path == '/metrics':
+            self.send_body(tracker.metrics.render().encode('utf-8'),
+                           'text/plain; version=0.0.4; charset=utf-8')
+            return
+        else:
+            self.send_error(404)
+            return
+
+        data = json.dumps(body, ensure_ascii=False, indent=2).encode('utf-8')
+        self.send_body(data, 'application/json; charset=utf-8')
+
+    def send_body(self, data, content_type):
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class AINewsDaemon:
+    """AI 新闻常驻监控进程"""
+
+    def __init__(self, config_path, data_dir='data', logs_dir='logs'):
+        self.config_path = Path(config_path)
+        self.data_dir = Path(data_dir)
+        self.logs_dir = Path(logs_dir)
+
+        self.pipeline = AINewsPipeline(config_path)
+        self.collector = self.pipeline.collector
+        self.scorer = self.pipeline.scorer
+        self.summarizer = self.pipeline.summarizer
+        # 采集器的指标注册表，评分和推送的指标也记在这里
+        self.metrics = self.collector.metrics
+        self.metrics.describe('cycle_duration_seconds', '一轮 采集 → 评分 → 通知 的耗时')
+        self.metrics.describe('scored_items_total', '评分条数')
+        self.metrics.describe('score_dimension_seconds_total', '各评分维度的累计耗时')
+        self.metrics.describe('notify_seconds', '生成并写出通知的耗时')
+        self.metrics.describe('notifications_total', '发出的通知条数')
+        # 通知分发器：评分后立即并发送往各通知渠道
+        self.dispatcher = self.pipeline.enable_dispatcher()
+        self.config_mtime = self.config_path.stat().st_mtime
+
+        self.started_at = time.time()
+        self.cycles = 0
+        self.last_cycle = None
+        self.next_due = {}       # 源名称 -> 下次运行时间（time.time()）
+        self.last_run = {}       # 源名称 -> 上次运行时间
+        self.recent = {}         # URL -> 评分后的新闻（滚动保留）
+        self.digest = self.open_digest()
+        self._stop = threading.Event()
+
+    @property
+    def config(self):
+        return self.collector.config
+
+    def uptime(self):
+        return round(time.time() - self.started_at, 1)
+
+    def open_digest(self):
+        """按配置的格式打开汇总文件（data/news_digest.md 及同名的 .html/.txt）"""
+        formats = self.config.get('digest', {}).get('formats', ['markdown'])
+        return DigestDocument(self.data_dir / 'news_digest.md', self.summarizer, formats)
+
+    def due_tasks(self):
+        """返回已到轮询时间的采集任务，并排定其下次运行时间
+
+        启用自适应调度时由调度按各源的更新规律排期，采集结束后排定下次运行时间。
+        """
+        now = time.time()
+        if self.collector.scheduler:
+            due = self.collector.due_tasks(now)
+            for name, interval, func in due:
+                self.last_run[name] = now
+            return due
+
+        due = []
+        for name, interval, func in self.collector.build_tasks():
+            if self.next_due.get(name, 0) <= now:
+                due.append((name, interval, func))
+                self.next_due[name] = now + interval
+                self.last_run[name] = now
+        return due
+
+    def check_reload(self):
+        """配置文件变化时热加载"""
+        try:
+            mtime = self.config_path.stat().st_mtime
+        except OSError:
+            return
+
+        if mtime == self.config_mtime:
+            return
+
+        try:
+            self.collector.reload_config()
+        except (OSError, ValueError) as e:
+            print(f"  ✗ 配置重新加载失败，继续使用旧配置: {e}")
+            return
+
+        self.scorer.apply_config(self.collector.config)
+        self.config_mtime = mtime
+
+        # 按新的通知渠道配置重建分发器，已排队的通知先发送完
+        if self.dispatcher:
+            self.dispatcher.close()
+        self.dispatcher = self.pipeline.enable_dispatcher()
+        self.digest = self.open_digest()
+
+        # 按新间隔重新排期：已删除的源不再排期，新增的源立即运行
+        self.next_due = {name: self.last_run[name] + interval
+                         for name, interval, func in self.collector.build_tasks()
+                         if name in self.last_run}
+        print(f"[{datetime.now()}] ✓ 配置已重新加载")
+
+    def run_cycle(self, tasks):
+        """运行一轮 采集 → 评分 → 摘要 → 通知"""
+        start = time.time()
+
+        result = self.pipeline.run(tasks)
+        raw_news = result['raw']
+        scored_news = result['scored']
+
+        self.prune_recent()
+        self.rescore_recent()
+        for news in scored_news:
+            self.recent[news['url']] = news
+
+        if raw_news:
+            self.save_outputs(result)
+
+        elapsed = time.time() - start
+        timing = self.scorer.timing_stats()
+        self.metrics.observe('cycle_duration_seconds', elapsed)
+        self.metrics.inc('scored_items_total', timing['items'])
+        for dimension, seconds in timing['dimensions_s'].items():
+            self.metrics.inc('score_dimension_seconds_total', seconds, dimension=dimension)
+
+        self.cycles += 1
+        self.last_cycle = {
+            'started_at': datetime.fromtimestamp(start).isoformat(),
+            'elapsed_seconds': round(elapsed, 2),
+            'sources': [name for name, interval, func in tasks],
+            'collected': len(raw_news),
+            'important': len(scored_news),
+            'scoring': {**self.scorer.cache_stats(), **timing}
+        }
+
+    def prune_recent(self):
+        """丢弃超出保留时长的新闻"""
+        retention = timedelta(hours=self.config.get('daemon', {}).get('retention_hours', 24))
+        cutoff = time.time() - retention.total_seconds()
+        # 按解析后的时间戳比较，与发布时间字符串的时区写法无关；没有发布时间的新闻直接丢弃
+        self.recent = {url: news for url, news in self.recent.items()
+                       if (parse_published(news.get('published')) or 0) >= cutoff}
+
+    def rescore_recent(self):
+        """时效性随时间下降：重新计算近期新闻的总分
+
+        创新性、影响力、可验证性取自评分缓存，只重算关注度和时效性，
+        总分跨越阈值时重新分类。
+        """
+        now = datetime.now().astimezone()
+        for news in self.recent.values():
+            self.scorer.score_item(news, now)
+
+    def save_outputs(self, result):
+        """写出与 cron 模式相同的数据文件，供其他脚本读取"""
+        self.data_dir.mkdir(parents=True, exist_ok=True)
+        self.logs_dir.mkdir(parents=True, exist_ok=True)
+
+        self.collector.save_results(self.data_dir / 'news_raw.json')
+
+        # 评分结果和摘要基于滚动保留的近期新闻
+        recent = sorted((n for n in self.recent.values()
+                         if n['importance_score'] >= result['threshold']),
+                        key=lambda x: x['importance_score'], reverse=True)
+        self.scorer.save_results(self.data_dir / 'news_scored.json', recent,
+                                 len(result['raw']), result['threshold'])
+
+        # 汇总只插入/删除有变化的新闻，没有变化时不重写
+        self.digest.update(recent)
+        self.digest.write()
+
+        # 只通知本轮新出现的重要新闻；启用分发器时已在评分后逐条发送，这里只写出消息文件
+        message = result['message']
+        if message:
+            start = time.monotonic()
+            with open(self.logs_dir / 'latest_message.txt', 'w', encoding='utf-8') as f:
+                f.write(message)
+            if self.dispatcher:
+                return
+            print(f"\n{message}\n")
+            elapsed = time.monotonic() - start
+            self.metrics.observe('notify_seconds', elapsed, notifier='daemon')
+            self.metrics.inc('notifications_total', len(result['scored']), notifier='daemon')
+            append_record(records_path(self.config), 'notify', notifier='daemon',
+                          elapsed_seconds=round(elapsed, 4), items=len(result['scored']))
+
+    def status(self):
+        """状态接口返回的内容"""
+        now = time.time()
+        sources = {}
+        scheduler = self.collector.scheduler
+        for name, interval, func in self.collector.build_tasks():
+            last_run = self.last_run.get(name)
+            next_due = self.next_due.get(name, now)
+            if scheduler:
+                interval = round(scheduler.interval(name, interval))
+                next_due = scheduler.next_due(name) or now
+            sources[name] = {
+                'interval_seconds': interval,
+                'last_run': datetime.fromtimestamp(last_run).isoformat() if last_run else None,
+                'next_run_in_seconds': round(max(0, next_due - now), 1)
+            }
+
+        recent = list(self.recent.values())
+        status = {
+            'status': 'ok',
+            'started_at': datetime.fromtimestamp(self.started_at).isoformat(),
+            'uptime_seconds': self.uptime(),
+            'cycles': self.cycles,
+            'last_cycle': self.last_cycle,
+            'recent': {
+                'total': len(recent),
+                'critical': len([n for n in recent if n.get('category') == '🔴 极重要']),
+                'important': len([n for n in recent if n.get('category') == '🟡 重要'])
+            },
+            'sources': sources,
+            'feed_cache': self.collector.feed_cache.stats(),
+            'digest_cache': self.summarizer.cache_stats(),
+            'http': self.collector.http.stats()
+        }
+        if self.collector.seen_store:
+            status['seen_store'] = self.collector.seen_store.stats()
+        if self.dispatcher:
+            status['notifications'] = self.dispatcher.stats()
+        if self.collector.scheduler:
+            status['schedule'] = self.collector.scheduler.stats()
+        return status
+
+    def start_status_server(self):
+        """在后台线程启动状态接口"""
+        daemon_config = self.config.get('daemon', {})
+        host = daemon_config.get('host', '127.0.0.1')
+        port = daemon_config.get('port', 8765)
+
+        server = ThreadingHTTPServer((host, port), StatusHandler)
+        server.tracker = self
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        print(f"✓ 状态接口: http://{host}:{port}/status，指标: http://{host}:{port}/metrics")
+        return server
+
+    def stop(self, *args):
+        self._stop.set()
+
+    def run(self):
+        """主循环"""
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+
+        server = self.start_status_server()
+        print(f"[{datetime.now()}] AI 新闻常驻监控已启动")
+
+        try:
+            while not self._stop.is_set():
+                self.check_reload()
+
+                tasks = self.due_tasks()
+                if tasks:
+                    self.run_cycle(tasks)
+
+                self._stop.wait(self.config.get('daemon', {}).get('tick', 5))
+        finally:
+            server.shutdown()
+            self.close()
+            print(f"[{datetime.now()}] AI 新闻常驻监控已停止")
+
+    def close(self):
+        """释放连接池和已见索引"""
+        self.pipeline.close()
+
+
+def main():
+    """主函数"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='AI 新闻常驻监控进程')
+    parser.add_argument('--config', default='config/sources.json',
+                       help='配置文件路径')
+    parser.add_argument('--data-dir', default='data',
+                       help='数据目录')
+    parser.add_argument('--logs-dir', default='logs',
+                       help='日志目录')
+    parser.add_argument('--once', action='store_true',
+                       help='只运行一轮所有源后退出')
+
+    args = parser.parse_args()
+
+    daemon = AINewsDaemon(args.config, args.data_dir, args.logs_dir)
+
+    if args.once:
+        daemon.run_cycle(daemon.due_tasks())
+        daemon.close()
+        return 0
+
+    daemon.run()
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,378 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+通知分发
+评分后的新闻放入进程内队列，由各通知渠道（控制台、日志文件、Webhook、SMTP）
+的工作线程并发送出；每个渠道有独立的有界队列、限速和重试，慢渠道不会阻塞其他渠道。
+🔴 极重要新闻走快速通道，评分和聚类后立即入队并排在普通新闻之前；
+普通新闻在一轮结束后作为一批摘要发送
+"""
+
+import abc
+import itertools
+import queue
+import random
+import smtplib
+import threading
+import time
+from datetime import datetime
+from email.message import EmailMessage
+from pathlib import Path
+
+from http_client import HTTPClient
+from metrics import append_record, records_path
+from notify import format_news_message
+from summarize import AINewsSummarizer
+
+
+# 队列优先级：数值越小越先发送
+CRITICAL_PRIORITY = 0
+DIGEST_PRIORITY = 1
+
+
+class Channel(abc.ABC):
+    """通知渠道基类
+
+    子类实现 send(news_list)：一次送出一批新闻，失败时抛出异常，由工作线程重试。
+    """
+
+    # 两次发送之间的最小间隔（秒），可用渠道配置 min_interval 覆盖
+    MIN_INTERVAL = 0
+
+    def __init__(self, name, options):
+        self.name = name
+        self.min_interval = options.get('min_interval', self.MIN_INTERVAL)
+        self.summarizer = AINewsSummarizer()
+
+    @abc.abstractmethod
+    def send(self, news_list):
+        """送出一批新闻"""
+
+    def close(self):
+        pass
+
+
+class ConsoleChannel(Channel):
+    """打印到标准输出"""
+
+    def send(self, news_list):
+        for news_item in news_list:
+            print(f"[{datetime.now()}] 🚨 {self.summarizer.generate_notification(news_item)}\n")
+
+
+class LogChannel(Channel):
+    """追加到日志文件，每条新闻一行"""
+
+    def __init__(self, name, options):
+        super().__init__(name, options)
+        self.path = Path(options.get('path', 'logs/notifications.log'))
+
+    def send(self, news_list):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, 'a', encoding='utf-8') as f:
+            for news_item in news_list:
+                text = self.summarizer.generate_notification(news_item).replace('\n', ' | ')
+                f.write(f"[{datetime.now().isoformat()}] {text}\n")
+
+
+class WebhookChannel(Channel):
+    """以 JSON POST 到 Webhook 地址：{"text": 通知消息, "items": [...]}"""
+
+    MIN_INTERVAL = 1
+
+    def __init__(self, name, options):
+        super().__init__(name, options)
+        self.url = options['url']
+        self.timeout = options.get('timeout', 10)
+        # 重试由工作线程负责
+        self.http = HTTPClient(pool_size=2, max_retries=0)
+
+    def send(self, news_list):
+        items = [{key: news_item.get(key) for key in
+                  ('title', 'url', 'source', 'category', 'importance_score')}
+                 for news_item in news_list]
+        response = self.http.post(self.url, json={'text': format_news_message(list(news_list)),
+                                                  'items': items}, timeout=self.timeout)
+        response.raise_for_status()
+
+    def close(self):
+        self.http.close()
+
+
+class SMTPChannel(Channel):
+    """发送邮件，默认投递到本地 SMTP 服务（如 python -m aiosmtpd -n -l localhost:1025）"""
+
+    MIN_INTERVAL = 1
+
+    def __init__(self, name, options):
+        super().__init__(name, options)
+        self.host = options.get('host', 'localhost')
+        self.port = options.get('port', 1025)
+        self.sender = options.get('sender', 'ai-news-tracker@localhost')
+        self.recipients = options.get('recipients', ['root@localhost'])
+        self.timeout = options.get('timeout', 10)
+
+    def send(self, news_list):
+        critical = len([n for n in news_list if n.get('category') == '🔴 极重要'])
+        message = EmailMessage()
+        message['Subject'] = (f"AI 新闻: {len(news_list)} 条重要新闻"
+                              + (f"（{critical} 条极重要）" if critical else ""))
+        message['From'] = self.sender
+        message['To'] = ', '.join(self.recipients)
+        message.set_content(format_news_message(list(news_list)))
+
+        with smtplib.SMTP(self.host, self.port, timeout=self.timeout) as smtp:
+            smtp.send_message(message)
+
+
+CHANNEL_TYPES = {
+    'console': ConsoleChannel,
+    'log': LogChannel,
+    'webhook': WebhookChannel,
+    'smtp': SMTPChannel
+}
+
+
+def build_channel(spec):
+    """按配置创建渠道：spec 为类型名，或 {"type": ..., "name": ..., 其他选项}"""
+    options = {'type': spec} if isinstance(spec, str) else dict(spec)
+    channel_cls = CHANNEL_TYPES.get(options.get('type'))
+    if channel_cls is None:
+        raise ValueError(f"未知的通知渠道类型: {options.get('type')}")
+    return channel_cls(options.get('name', options['type']), options)
+
+
+class ChannelWorker:
+    """单个渠道的有界队列和工作线程
+
+    队列按优先级出队，🔴 极重要新闻排在普通新闻之前。普通新闻排队已满 queue_size 条时
+    入队最多等待 put_timeout 秒，对生产者形成背压但不会长时间阻塞其他渠道，仍然满则丢弃本条；
+    极重要新闻在此之外还可多占 critical_reserve 个位置，超出后同样等待后丢弃，
+    渠道长时间不可用时队列不会无限增长。
+    工作线程每次取出当前排队的新闻（最多 batch_size 条）一起发送，两次发送之间
+    至少间隔渠道的 min_interval，等待期间到达的新闻合并到下一批。
+    """
+
+    def __init__(self, channel, queue_size, batch_size, max_retries, backoff, on_sent,
+                 put_timeout=0.05, critical_reserve=100):
+        self.channel = channel
+        self.put_timeout = put_timeout
+        self.batch_size = batch_size
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.on_sent = on_sent
+
+        self.queue_size = queue_size
+        self.critical_reserve = critical_reserve
+        self.queue = queue.PriorityQueue()
+        self.sent = 0
+        self.errors = 0
+        self.dropped = 0
+        self._next_allowed = 0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self.thread = threading.Thread(target=self.run, name=f"notify-{channel.name}",
+                                       daemon=True)
+        self.thread.start()
+
+    def offer(self, entry):
+        """入队 (优先级, 序号, 入队时间, 新闻)，返回是否已入队"""
+        limit = self.queue_size
+        if entry[0] == CRITICAL_PRIORITY:
+            limit += self.critical_reserve
+        deadline = time.monotonic() + self.put_timeout
+        while self.queue.qsize() >= limit:
+            if time.monotonic() >= deadline:
+                with self._lock:
+                    self.dropped += 1
+                return False
+            time.sleep(0.005)
+
+        self.queue.put(entry)
+        return True
+
+    def run(self):
+        while not self._stop.is_set():
+            try:
+                first = self.queue.get(timeout=0.2)
+            except queue.Empty:
+                continue
+
+            # 限速：等到允许发送的时间，期间到达的新闻合并到本批
+            delay = self._next_allowed - time.monotonic()
+            if delay > 0:
+                self._stop.wait(delay)
+
+            batch = [first]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            self.deliver(batch)
+            self._next_allowed = time.monotonic() + self.channel.min_interval
+            for _ in batch:
+                self.queue.task_done()
+
+    def deliver(self, batch):
+        """发送一批，异常时指数退避（带抖动）重试"""
+        news_list = [entry[3] for entry in batch]
+        for attempt in range(self.max_retries + 1):
+            try:
+                self.channel.send(news_list)
+            except Exception as e:
+                if attempt == self.max_retries or self._stop.is_set():
+                    with self._lock:
+                        self.errors += len(batch)
+                    print(f"  ✗ 通知渠道 {self.channel.name} 发送失败: {e}")
+                    return
+                self._stop.wait(random.uniform(0, self.backoff * 2 ** attempt))
+                continue
+
+            with self._lock:
+                self.sent += len(batch)
+            self.on_sent(self.channel, batch)
+            return
+
+    def flush(self, timeout):
+        """等待队列清空，超时返回 False"""
+        deadline = time.monotonic() + timeout
+        with self.queue.all_tasks_done:
+            while self.queue.unfinished_tasks:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self.queue.all_tasks_done.wait(remaining)
+        return True
+
+    def stop(self):
+        self._stop.set()
+        self.thread.join()
+        self.channel.close()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'sent': self.sent,
+                'errors': self.errors,
+                'dropped': self.dropped,
+                'queued': self.queue.qsize()
+            }
+
+
+def open_dispatcher(config, store=None, metrics=None):
+    """按配置创建通知分发器，未启用通知或没有可用渠道时返回 None"""
+    if not config.get('enable_notification', True):
+        return None
+    dispatcher = NotificationDispatcher(config, store, metrics)
+    if not dispatcher.workers:
+        dispatcher.close()
+        return None
+    return dispatcher
+
+
+class NotificationDispatcher:
+    """把评分后的新闻分发到 notification_channels 配置的各个渠道
+
+    submit() 只把新闻放入各渠道的队列，立即返回；defer() 暂存普通新闻，
+    release() 时一起入队。发送成功的新闻记入新闻库的通知台账（渠道名即台账中的
+    channel），并记录从源响应（采集器写入的 fetched_at）到送达的耗时；
+    🔴 极重要新闻每条每个渠道追加一条 alert 运行记录。
+    """
+
+    def __init__(self, config, store=None, metrics=None):
+        settings = config.get('dispatcher', {})
+        self.store = store
+        self.metrics = metrics
+        self.records = records_path(config)
+        self.deferred = []
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+        if metrics:
+            metrics.describe('dispatch_latency_seconds', '新闻从入队到送达各渠道的耗时')
+            metrics.describe('notify_latency_seconds', '新闻从源响应到送达各渠道的耗时')
+            metrics.describe('dispatched_total', '各渠道送达的新闻条数')
+
+        self.workers = []
+        for spec in config.get('notification_channels', ['console']):
+            try:
+                channel = build_channel(spec)
+            except (KeyError, ValueError) as e:
+                print(f"  ✗ 通知渠道配置无效，已跳过: {e}")
+                continue
+            self.workers.append(ChannelWorker(
+                channel,
+                queue_size=settings.get('queue_size', 1000),
+                batch_size=settings.get('batch_size', 20),
+                max_retries=settings.get('max_retries', 3),
+                backoff=settings.get('backoff', 0.5),
+                on_sent=self.record_sent,
+                put_timeout=settings.get('put_timeout', 0.05),
+                critical_reserve=settings.get('critical_reserve', 100)
+            ))
+
+    def submit(self, news_item):
+        """把一条新闻放入所有渠道的队列，🔴 极重要新闻优先发送"""
+        priority = (CRITICAL_PRIORITY if news_item.get('category') == '🔴 极重要'
+                    else DIGEST_PRIORITY)
+        entry = (priority, next(self._seq), time.monotonic(), news_item)
+        for worker in self.workers:
+            worker.offer(entry)
+
+    def defer(self, news_item):
+        """暂存普通新闻，release() 时作为一批摘要入队"""
+        with self._lock:
+            self.deferred.append(news_item)
+
+    def release(self):
+        """把暂存的新闻放入各渠道的队列，跳过已被同簇更高分新闻取代的"""
+        with self._lock:
+            deferred, self.deferred = self.deferred, []
+        for news_item in deferred:
+            if not news_item.get('superseded'):
+                self.submit(news_item)
+
+    def record_sent(self, channel, batch):
+        """工作线程发送成功后回调：记录耗时并写入通知台账"""
+        now = time.time()
+        sent_at = time.monotonic()
+        for priority, seq, queued_at, news_item in batch:
+            lane = 'critical' if priority == CRITICAL_PRIORITY else 'digest'
+            fetched_at = news_item.get('fetched_at')
+            latency = now - fetched_at if fetched_at else None
+            if self.metrics:
+                self.metrics.observe('dispatch_latency_seconds', sent_at - queued_at,
+                                     channel=channel.name, lane=lane)
+                if latency is not None:
+                    self.metrics.observe('notify_latency_seconds', latency,
+                                         channel=channel.name, lane=lane)
+            if lane == 'critical':
+                append_record(self.records, 'alert', channel=channel.name,
+                              url=news_item.get('url'), source=news_item.get('source'),
+                              latency_s=round(latency, 3) if latency is not None else None,
+                              queue_s=round(sent_at - queued_at, 3))
+
+        if self.metrics:
+            self.metrics.inc('dispatched_total', len(batch), channel=channel.name)
+        if self.store:
+            self.store.mark_delivered(channel.name, [entry[3] for entry in batch])
+
+    def flush(self, timeout=10):
+        """等待所有渠道发送完已入队的新闻，超时返回 False"""
+        deadline = time.monotonic() + timeout
+        return all([worker.flush(max(0, deadline - time.monotonic()))
+                    for worker in self.workers])
+
+    def stats(self):
+        """各渠道的发送、失败、丢弃和排队条数"""
+        return {worker.channel.name: worker.stats() for worker in self.workers}
+
+    def close(self, timeout=10):
+        """发送完暂存和已入队的新闻（最多等待 timeout 秒）后停止工作线程"""
+        self.release()
+        if not self.flush(timeout):
+            print(f"  ✗ 通知队列未在 {timeout}s 内清空，剩余新闻已丢弃")
+        for worker in self.workers:
+            worker.stop()
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+RSS/Atom 订阅源缓存
+保存每个源的 ETag / Last-Modified，发送条件请求，并按 update_interval 限制轮询频率
+"""
+
+import json
+import threading
+import time
+from pathlib import Path
+
+import requests
+
+
+class FeedCache:
+    """订阅源条件请求缓存
+
+    fetch() 只在源内容有变化时返回响应体；以下情况返回 None：
+    - 距上次抓取不足 min_interval 秒（跳过，不发请求）
+    - 服务器返回 304 Not Modified（命中）
+
+    deferred=True 时新的 ETag / Last-Modified 暂不生效，调用方处理完全部条目后
+    用 commit() 提交；未提交时下次仍按旧的校验值请求，服务器会返回完整内容。
+    """
+
+    USER_AGENT = 'Mozilla/5.0 (compatible; ai-news-tracker; +https://github.com/HachikoJ/ai-news-tracker)'
+
+    def __init__(self, path=None, session=requests):
+        self.path = Path(path) if path else None
+        self.session = session
+        self.entries = self.load()
+        # 尚未提交的校验值：{缓存键: {'etag', 'last_modified'}}
+        self.pending = {}
+        self.hits = 0
+        self.misses = 0
+        self.skipped = 0
+        self._lock = threading.Lock()
+
+    def load(self):
+        """加载缓存文件"""
+        if not self.path or not self.path.exists():
+            return {}
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def save(self):
+        """保存缓存文件"""
+        if not self.path:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            data = json.dumps(self.entries, ensure_ascii=False, indent=2)
+        with open(self.path, 'w', encoding='utf-8') as f:
+            f.write(data)
+
+    @staticmethod
+    def cache_key(url, params=None):
+        """带查询参数的完整 URL"""
+        return requests.Request('GET', url, params=params).prepare().url
+
+    def fetch(self, url, min_interval=0, params=None, timeout=30, deferred=False):
+        """条件请求订阅源，内容有变化时返回响应体 bytes，否则返回 None"""
+        key = self.cache_key(url, params)
+        now = time.time()
+
+        with self._lock:
+            entry = dict(self.entries.get(key, {}))
+
+        # 未到配置的轮询间隔
+        if min_interval and now - entry.get('fetched_at', 0) < min_interval:
+            with self._lock:
+                self.skipped += 1
+            return None
+
+        headers = {'User-Agent': self.USER_AGENT}
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+
+        response = self.session.get(url, params=params, headers=headers, timeout=timeout)
+
+        if response.status_code == 304:
+            with self._lock:
+                self.hits += 1
+                self.entries.setdefault(key, {})['fetched_at'] = now
+            return None
+
+        response.raise_for_status()
+
+        validators = {
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified')
+        }
+        with self._lock:
+            self.misses += 1
+            if deferred:
+                self.pending[key] = validators
+                self.entries.setdefault(key, {})['fetched_at'] = now
+            else:
+                self.pending.pop(key, None)
+                self.entries[key] = {**validators, 'fetched_at': now}
+
+        return response.content
+
+    def commit(self, url, params=None):
+        """提交 deferred 抓取得到的校验值"""
+        key = self.cache_key(url, params)
+        with self._lock:
+            validators = self.pending.pop(key, None)
+            if validators is not None:
+                self.entries.setdefault(key, {}).update(validators)
+
+    def stats(self):
+        """命中统计"""
+        lookups = self.hits + self.skipped + self.misses
+        cached = self.hits + self.skipped
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'skipped': self.skipped,
+            'hit_rate': round(cached / lookups, 4) if lookups else 0.0
+        }
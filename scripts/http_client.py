@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+共享 HTTP 客户端
+连接池复用、429/5xx 指数退避重试（带抖动）、按主机限速
+"""
+
+import random
+import threading
+import time
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+
+class HTTPClient:
+    """所有采集源共用的 HTTP 会话
+
+    同一主机的请求复用 keep-alive 连接；stats() 给出本次运行实际新建的
+    连接数与发出的请求数，用于确认连接复用。
+    """
+
+    USER_AGENT = 'Mozilla/5.0 (compatible; ai-news-tracker; +https://github.com/HachikoJ/ai-news-tracker)'
+
+    # 需要重试的状态码
+    RETRY_STATUS = (429, 500, 502, 503, 504)
+
+    def __init__(self, pool_size=32, max_retries=3, backoff=0.5,
+                 max_backoff=30, rate_limits=None):
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        # 主机 -> 两次请求之间的最小间隔（秒）
+        self.rate_limits = rate_limits or {}
+        # 每个请求结束后回调 on_response(url, 耗时秒数, 响应字节数, 是否出错)
+        self.on_response = None
+        # 设置后不再重试，退避和限速等待立即结束，让进行中的请求尽快返回
+        self.stopped = threading.Event()
+
+        self.requests_sent = 0
+        self.connections = 0
+        self.retries = 0
+        self._next_allowed = {}
+        self._lock = threading.Lock()
+
+        self.session = requests.Session()
+        self.session.headers['User-Agent'] = self.USER_AGENT
+        self.adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('http://', self.adapter)
+        self.session.mount('https://', self.adapter)
+
+        # 统计真实建立的 TCP(+TLS) 连接（包括断开后重连）
+        self.adapter.poolmanager.pool_classes_by_scheme = {
+            'http': type('CountingHTTPConnectionPool', (HTTPConnectionPool,),
+                         {'ConnectionCls': self._counting(HTTPConnection)}),
+            'https': type('CountingHTTPSConnectionPool', (HTTPSConnectionPool,),
+                          {'ConnectionCls': self._counting(HTTPSConnection)})
+        }
+
+    def _counting(self, connection_cls):
+        """生成在每次 connect() 时计数的连接类"""
+        client = self
+
+        class CountingConnection(connection_cls):
+            def connect(self):
+                super().connect()
+                with client._lock:
+                    client.connections += 1
+
+        return CountingConnection
+
+    def get(self, url, **kwargs):
+        """GET 请求，429/5xx 和连接错误按指数退避重试"""
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url, **kwargs):
+        """POST 请求，重试策略同 get()"""
+        return self.request('POST', url, **kwargs)
+
+    def request(self, method, url, **kwargs):
+        """发送请求，429/5xx 和连接错误按指数退避重试"""
+        for attempt in range(self.max_retries + 1):
+            self._throttle(url)
+
+            start = time.monotonic()
+            try:
+                response = self.session.request(method, url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout):
+                with self._lock:
+                    self.requests_sent += 1
+                self._report(url, start, 0, True)
+                if attempt == self.max_retries or self.stopped.is_set():
+                    raise
+                self._sleep_backoff(attempt)
+                continue
+
+            with self._lock:
+                self.requests_sent += 1
+            self._report(url, start, len(response.content), response.status_code >= 400)
+
+            if (response.status_code in self.RETRY_STATUS and attempt < self.max_retries
+                    and not self.stopped.is_set()):
+                self._sleep_backoff(attempt, response.headers.get('Retry-After'))
+                response.close()
+                continue
+
+            return response
+
+    def _report(self, url, start, nbytes, error):
+        """回调 on_response"""
+        if self.on_response:
+            self.on_response(url, time.monotonic() - start, nbytes, error)
+
+    def _sleep_backoff(self, attempt, retry_after=None):
+        """退避等待：优先遵循 Retry-After，否则指数退避 + 全抖动"""
+        with self._lock:
+            self.retries += 1
+
+        if retry_after and retry_after.isdigit():
+            delay = min(float(retry_after), self.max_backoff)
+        else:
+            delay = random.uniform(0, min(self.backoff * 2 ** attempt, self.max_backoff))
+
+        self.stopped.wait(delay)
+
+    def _throttle(self, url):
+        """按主机限速：同一主机两次请求间隔不小于配置值"""
+        host = urlparse(url).netloc
+        interval = self.rate_limits.get(host)
+        if not interval:
+            return
+
+        with self._lock:
+            now = time.monotonic()
+            scheduled = max(now, self._next_allowed.get(host, 0))
+            self._next_allowed[host] = scheduled + interval
+
+        if scheduled > now:
+            self.stopped.wait(scheduled - now)
+
+    def stats(self):
+        """连接复用统计"""
+        return {
+            'requests': self.requests_sent,
+            'connections': self.connections,
+            'retries': self.retries,
+            'reuse_ratio': (round(self.requests_sent / self.connections, 2)
+                            if self.connections else 0.0)
+        }
+
+    def close(self):
+        """关闭会话"""
+        self.session.close()
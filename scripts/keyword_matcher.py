@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+多类别关键词匹配器
+构建时把各类别的关键词统一转小写、去重，编译为一个多模式匹配器，
+一次扫描文本即得到全部命中的关键词及其类别。匹配语义与逐个
+`kw.lower() in text` 的子串查找完全相同，评分结果不因匹配器而改变。
+安装了 pyahocorasick 时用 Aho-Corasick 自动机，否则对去重后的关键词逐个做子串查找
+（CPython 的正则在几十个备选词上比逐个 `in` 慢得多，不作为回退方案）
+"""
+
+from collections import defaultdict
+
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+
+def automaton_available():
+    """是否可以使用 Aho-Corasick 自动机（pyahocorasick）"""
+    return ahocorasick is not None
+
+
+class KeywordMatcher:
+    """预编译的多类别关键词匹配器
+
+    文本需已转为小写。find() 一次扫描返回 {类别: {命中的关键词}}，
+    scan() / categories() 只返回命中的类别。
+    """
+
+    def __init__(self, categories, backend=None):
+        # 类别 -> 小写关键词元组（保持原顺序）
+        self.keywords = {category: tuple(dict.fromkeys(word.lower() for word in words if word))
+                         for category, words in categories.items()}
+
+        owners = defaultdict(set)
+        for category, words in self.keywords.items():
+            for word in words:
+                owners[word].add(category)
+        words = list(owners)
+
+        if backend is None:
+            backend = 'automaton' if automaton_available() else 'substring'
+        self.backend = backend
+
+        # 每个关键词对应 (类别集合, ((类别, 关键词), ...))：scan 只用前者，find 用后者
+        self._values = {word: (frozenset(owners[word]),
+                               tuple((category, word) for category in owners[word]))
+                        for word in words}
+
+        self._automaton = None
+        if words and backend == 'automaton':
+            self._automaton = ahocorasick.Automaton()
+            for word, value in self._values.items():
+                self._automaton.add_word(word, value)
+            self._automaton.make_automaton()
+
+    def _matches(self, text):
+        """文本中每处命中的 (类别集合, ((类别, 关键词), ...))"""
+        if not text:
+            return ()
+        if self._automaton is not None:
+            return (value for _, value in self._automaton.iter(text))
+        return (value for word, value in self._values.items() if word in text)
+
+    def categories(self, text):
+        """返回命中的类别集合"""
+        found = set()
+        for categories, _ in self._matches(text):
+            found |= categories
+        return found
+
+    def scan(self, text):
+        """返回 text 命中的类别，支持 `category in hits`"""
+        return self.categories(text)
+
+    def find(self, text):
+        """返回 {类别: {命中的关键词}}"""
+        hits = defaultdict(set)
+        for _, pairs in self._matches(text):
+            for category, word in pairs:
+                hits[category].add(word)
+        return dict(hits)
+
+    def matches(self, text, category):
+        """text 是否包含 category 中的任一关键词"""
+        return category in self.categories(text)
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+运行指标
+进程内按标签聚合的计数器和直方图，以 Prometheus 文本格式导出（常驻进程 /metrics）；
+每轮采集、评分、推送各追加一条 JSON 运行记录（data/metrics.jsonl），供状态报告统计延迟百分位
+"""
+
+import json
+import math
+import threading
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from datetime import datetime
+from pathlib import Path
+
+
+# 延迟直方图的桶上界（秒）
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+# 指标名前缀
+PREFIX = 'ainews_'
+
+
+def percentile(values, q):
+    """最近秩法百分位数（q 取 0-100），values 为空时返回 None"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, math.ceil(q / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def _escape(value):
+    """Prometheus 标签值转义"""
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(labels, extra=()):
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{k}="{_escape(v)}"' for k, v in pairs) + '}'
+
+
+def _number(value):
+    if value == math.inf:
+        return '+Inf'
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value)
+
+
+class Metrics:
+    """线程安全的计数器和直方图
+
+    同名指标按标签分别累计；render() 输出 Prometheus 文本格式。
+    """
+
+    def __init__(self):
+        self.counters = defaultdict(float)    # (名称, 标签) -> 累计值
+        self.histograms = {}                  # (名称, 标签) -> [各桶计数, 总和, 次数]
+        self.buckets = {}                     # 名称 -> 桶上界
+        self.help = {}                        # 名称 -> 说明
+        self._lock = threading.Lock()
+
+    def describe(self, name, text):
+        """登记指标说明（# HELP）"""
+        self.help[name] = text
+
+    def inc(self, name, value=1, **labels):
+        """计数器增加 value"""
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self.counters[key] += value
+
+    def observe(self, name, value, buckets=LATENCY_BUCKETS, **labels):
+        """直方图记录一个观测值"""
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                self.buckets.setdefault(name, buckets)
+                histogram = self.histograms[key] = [[0] * len(self.buckets[name]), 0.0, 0]
+            index = bisect_left(self.buckets[name], value)
+            if index < len(histogram[0]):
+                histogram[0][index] += 1
+            histogram[1] += value
+            histogram[2] += 1
+
+    def render(self):
+        """Prometheus 文本格式（0.0.4）"""
+        lines = []
+        with self._lock:
+            counters = sorted(self.counters.items())
+            histograms = sorted((key, ([*h[0]], h[1], h[2])) for key, h in self.histograms.items())
+
+        seen = set()
+        for (name, labels), value in counters:
+            if name not in seen:
+                seen.add(name)
+                if name in self.help:
+                    lines.append(f"# HELP {PREFIX}{name} {self.help[name]}")
+                lines.append(f"# TYPE {PREFIX}{name} counter")
+            lines.append(f"{PREFIX}{name}{_labels(labels)} {_number(value)}")
+
+        for (name, labels), (counts, total, count) in histograms:
+            if name not in seen:
+                seen.add(name)
+                if name in self.help:
+                    lines.append(f"# HELP {PREFIX}{name} {self.help[name]}")
+                lines.append(f"# TYPE {PREFIX}{name} histogram")
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets[name], counts):
+                cumulative += bucket_count
+                lines.append(f"{PREFIX}{name}_bucket{_labels(labels, [('le', _number(bound))])}"
+                             f" {cumulative}")
+            lines.append(f"{PREFIX}{name}_bucket{_labels(labels, [('le', '+Inf')])} {count}")
+            lines.append(f"{PREFIX}{name}_sum{_labels(labels)} {_number(total)}")
+            lines.append(f"{PREFIX}{name}_count{_labels(labels)} {count}")
+
+        return '\n'.join(lines) + '\n'
+
+
+def records_path(config):
+    """运行记录文件路径，未启用时返回 None"""
+    metrics_config = config.get('metrics', {})
+    if not metrics_config.get('enabled', True):
+        return None
+    return Path(metrics_config.get('path', 'data/metrics.jsonl'))
+
+
+def append_record(path, kind, max_bytes=5 * 1024 * 1024, **fields):
+    """追加一条运行记录；文件超过 max_bytes 时轮转为 .1"""
+    if path is None:
+        return
+    path = Path(path)
+    record = {'kind': kind, 'recorded_at': datetime.now().isoformat(),
+              'timestamp': time.time(), **fields}
+
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if path.exists() and path.stat().st_size > max_bytes:
+            path.replace(path.with_name(path.name + '.1'))
+        with open(path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(record, ensure_ascii=False) + '\n')
+    except OSError as e:
+        print(f"  ✗ 运行记录写入失败: {e}")
+
+
+def load_records(path, kind=None, since=None):
+    """读取运行记录，可按类型和时间戳下限过滤"""
+    path = Path(path)
+    if not path.exists():
+        return []
+
+    records = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            if kind and record.get('kind') != kind:
+                continue
+            if since and record.get('timestamp', 0) < since:
+                continue
+            records.append(record)
+    return records
@@ -63,39 +63,24 @@ EOF
     echo -e "${GREEN}✓ 配置文件已创建${NC}\n"
 fi
 
-# 2. 采集新闻
-echo -e "${YELLOW}📡 步骤 1: 采集 AI 新闻...${NC}"
-python3 "$SCRIPT_DIR/collect.py" \
-    --config "$CONFIG_DIR/sources.json" \
-    --output "$DATA_DIR/news_raw.json"
-
-if [ $? -ne 0 ]; then
-    echo -e "${RED}✗ 采集失败${NC}"
-    exit 1
+# 2-4. 采集 → 评分 → 摘要（单进程流水线，阶段之间不经过文件中转）
+# 设置 AI_NEWS_DISPATCH=1 时加 --dispatch：极重要新闻确定后立即发送到配置的通知渠道，
+# 不等本轮结束；默认不发送，只在下面显示极重要新闻
+DISPATCH_ARGS=()
+if [ "${AI_NEWS_DISPATCH:-0}" = "1" ]; then
+    DISPATCH_ARGS=(--dispatch)
 fi
 
-# 3. 评分和过滤
-echo -e "${YELLOW}🎯 步骤 2: 评分和过滤...${NC}"
-python3 "$SCRIPT_DIR/score.py" \
-    --input "$DATA_DIR/news_raw.json" \
-    --output "$DATA_DIR/news_scored.json" \
+echo -e "${YELLOW}📡 步骤 1-3: 采集、评分、生成摘要...${NC}"
+python3 "$SCRIPT_DIR/pipeline.py" \
     --config "$CONFIG_DIR/sources.json" \
-    --threshold 10
-
-if [ $? -ne 0 ]; then
-    echo -e "${RED}✗ 评分失败${NC}"
-    exit 1
-fi
-
-# 4. 生成摘要
-echo -e "${YELLOW}📝 步骤 3: 生成摘要...${NC}"
-python3 "$SCRIPT_DIR/summarize.py" \
-    --input "$DATA_DIR/news_scored.json" \
-    --output "$DATA_DIR/news_digest.md" \
-    --format digest
+    --raw-output "$DATA_DIR/news_raw.json" \
+    --scored-output "$DATA_DIR/news_scored.json" \
+    --digest-output "$DATA_DIR/news_digest.md" \
+    "${DISPATCH_ARGS[@]}"
 
 if [ $? -ne 0 ]; then
-    echo -e "${RED}✗ 摘要生成失败${NC}"
+    echo -e "${RED}✗ 流水线运行失败${NC}"
     exit 1
 fi
 
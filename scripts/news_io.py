@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+新闻数据流式读写
+NDJSON（每行一条新闻）逐条写出并立即落盘；读取时同时兼容 NDJSON 和整体 JSON 文档
+"""
+
+import json
+from pathlib import Path
+
+
+def iter_news(path):
+    """逐条读取新闻文件
+
+    .ndjson / .jsonl 文件逐行解析，内存占用与文件大小无关；
+    其他文件按原有的 {"news": [...]} 整体 JSON 格式读取。
+    """
+    path = Path(path)
+
+    if path.suffix in ('.ndjson', '.jsonl'):
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    yield json.loads(line)
+        return
+
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    yield from data.get('news', [])
+
+
+class NDJSONWriter:
+    """NDJSON 写出器：每条新闻写一行并立即 flush"""
+
+    def __init__(self, path, append=False):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.file = open(self.path, 'a' if append else 'w', encoding='utf-8')
+        self.count = 0
+
+    def write(self, news_item):
+        self.file.write(json.dumps(news_item, ensure_ascii=False))
+        self.file.write('\n')
+        self.file.flush()
+        self.count += 1
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,408 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+新闻库
+基于 SQLite（WAL 模式）保存新闻、评分、评分明细和各通知渠道的送达记录，
+按 URL 哈希 upsert；“最近 24 小时最重要的 20 条”之类的查询走索引，
+不再整体加载 JSON 快照后在 Python 中排序；
+标题、摘要和作者同时写入 FTS5 全文索引，支持按相关度检索历史新闻
+"""
+
+import json
+import re
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+from seen_store import url_hash
+
+
+def parse_published(published):
+    """把 ISO 格式的发布时间转为时间戳，无法解析时返回 None
+
+    不带时区的时间按本地时间处理。
+    """
+    if not published or not isinstance(published, str):
+        return None
+    try:
+        return datetime.fromisoformat(published.replace('Z', '+00:00')).timestamp()
+    except (ValueError, OverflowError, OSError):
+        return None
+
+
+def search_text(news_item):
+    """全文索引的三列：标题、正文（摘要 + arXiv 摘要）、作者"""
+    body = ' '.join(filter(None, (news_item.get('summary'), news_item.get('abstract'))))
+    authors = news_item.get('authors') or []
+    if isinstance(authors, str):
+        authors = [authors]
+    return news_item.get('title') or '', body, ' '.join(authors)
+
+
+def fts_query(query):
+    """把用户输入转为 FTS5 查询：每个词加引号后按 AND 组合，避免语法错误"""
+    words = re.findall(r'\w+', query)
+    return ' '.join(f'"{word}"' for word in words)
+
+
+def open_news_store(config):
+    """按配置打开新闻库，未启用时返回 None"""
+    store_config = config.get('news_store', {})
+    if not store_config.get('enabled', True):
+        return None
+    return NewsStore(store_config.get('path', 'data/news.db'))
+
+
+class NewsStore:
+    """SQLite 新闻库
+
+    每条新闻一行，主键为规范化 URL 的 64 位哈希；完整的新闻对象以 JSON
+    保存在 data 列，评分、分类和通知状态另存为可索引的列。
+    """
+
+    COLUMNS = "data, importance_score, category, score_details"
+
+    # 相关度排序时 标题、正文、作者 三列的权重
+    FTS_WEIGHTS = (5.0, 1.0, 2.0)
+
+    # 相关度排序的候选窗口：只在最近收录的这么多条匹配中排序，
+    # 常见词匹配数十万条时延迟仍与窗口大小而非库规模相关
+    SEARCH_WINDOW = 10000
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS news ("
+            " url_hash INTEGER PRIMARY KEY,"
+            " url TEXT NOT NULL,"
+            " title TEXT,"
+            " source TEXT,"
+            " published_at REAL NOT NULL,"
+            " collected_at REAL NOT NULL,"
+            " importance_score REAL,"
+            " category TEXT,"
+            " score_details TEXT,"
+            " scored_at REAL,"
+            " notified_at REAL,"
+            " fts_rowid INTEGER,"
+            " data TEXT NOT NULL)"
+        )
+        self.conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_news_published ON news(published_at)"
+        )
+        self.conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_news_source ON news(source, published_at)"
+        )
+        self.conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_news_score ON news(importance_score)"
+        )
+        self.conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_news_category"
+            " ON news(category, importance_score)"
+        )
+        # 全文检索按 fts_rowid 回表过滤，覆盖索引避免读取整行
+        self.conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_news_fts"
+            " ON news(fts_rowid, source, category, published_at)"
+        )
+        # 通知台账：每条新闻在每个渠道的送达记录，记下送达时的分类以便升级为极重要时重新通知
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS deliveries ("
+            " url_hash INTEGER NOT NULL,"
+            " channel TEXT NOT NULL,"
+            " category TEXT,"
+            " delivered_at REAL NOT NULL,"
+            " PRIMARY KEY (url_hash, channel)) WITHOUT ROWID"
+        )
+        self.conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_deliveries_channel"
+            " ON deliveries(channel, delivered_at)"
+        )
+        self.fts = self._create_fts()
+        self.conn.commit()
+
+    def _create_fts(self):
+        """创建全文索引；SQLite 未编译 FTS5 时返回 False
+
+        索引的 rowid 按收录顺序递增（记在 news.fts_rowid），
+        rowid 越大收录越晚，检索时可按 rowid 截取最近的匹配。
+        """
+        exists = self.conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'news_fts'"
+        ).fetchone()
+        try:
+            self.conn.execute(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS news_fts"
+                " USING fts5(title, body, authors, tokenize='unicode61 remove_diacritics 2')"
+            )
+        except sqlite3.OperationalError:
+            return False
+
+        # 首次创建时按收录顺序为已有新闻补建索引
+        if not exists:
+            rows = self.conn.execute(
+                "SELECT url_hash, data FROM news ORDER BY collected_at"
+            ).fetchall()
+            for key, data in rows:
+                self._index_text(key, None, json.loads(data))
+        return True
+
+    def _index_text(self, key, fts_rowid, news_item):
+        """写入全文索引；已收录的新闻原位更新，保留其收录顺序"""
+        values = search_text(news_item)
+        if fts_rowid is not None:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO news_fts (rowid, title, body, authors)"
+                " VALUES (?, ?, ?, ?)", (fts_rowid, *values)
+            )
+            return
+
+        cursor = self.conn.execute(
+            "INSERT INTO news_fts (title, body, authors) VALUES (?, ?, ?)", values
+        )
+        self.conn.execute(
+            "UPDATE news SET fts_rowid = ? WHERE url_hash = ?", (cursor.lastrowid, key)
+        )
+
+    def upsert(self, news_item):
+        """写入或更新一条新闻
+
+        评分后的新闻（带 score_details）同时更新评分列；原始采集结果中的
+        占位评分 importance_score=0 和 arXiv 学科分类不写入评分列，
+        已有评分和通知状态不受影响。
+        """
+        url = news_item.get('url')
+        if not url:
+            return
+
+        key = url_hash(url)
+        now = time.time()
+        scored = 'score_details' in news_item
+        published_at = parse_published(news_item.get('published')) or now
+
+        with self._lock:
+            self.conn.execute(
+                "INSERT INTO news (url_hash, url, title, source, published_at, collected_at,"
+                " importance_score, category, score_details, scored_at, data)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+                " ON CONFLICT(url_hash) DO UPDATE SET"
+                " url = excluded.url, title = excluded.title, source = excluded.source,"
+                " data = excluded.data,"
+                " importance_score = COALESCE(excluded.importance_score, importance_score),"
+                " category = COALESCE(excluded.category, category),"
+                " score_details = COALESCE(excluded.score_details, score_details),"
+                " scored_at = COALESCE(excluded.scored_at, scored_at)",
+                (key, url, news_item.get('title'), news_item.get('source'),
+                 published_at, now,
+                 news_item.get('importance_score') if scored else None,
+                 news_item.get('category') if scored else None,
+                 json.dumps(news_item['score_details'], ensure_ascii=False) if scored else None,
+                 now if scored else None,
+                 json.dumps(news_item, ensure_ascii=False))
+            )
+            if self.fts:
+                row = self.conn.execute(
+                    "SELECT fts_rowid FROM news WHERE url_hash = ?", (key,)
+                ).fetchone()
+                self._index_text(key, row[0], news_item)
+
+    def upsert_many(self, news_list):
+        """批量 upsert 并提交，返回写入条数"""
+        count = 0
+        for news_item in news_list:
+            if news_item.get('url'):
+                self.upsert(news_item)
+                count += 1
+        self.commit()
+        return count
+
+    def commit(self):
+        """提交待写入的记录"""
+        with self._lock:
+            self.conn.commit()
+
+    def score_details(self, url):
+        """已保存的评分明细，没有时返回 None"""
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT score_details FROM news WHERE url_hash = ?", (url_hash(url),)
+            ).fetchone()
+        if row is None or row[0] is None:
+            return None
+        return json.loads(row[0])
+
+    def _row_to_news(self, row):
+        data, importance_score, category, score_details = row
+        news_item = json.loads(data)
+        if importance_score is not None:
+            news_item['importance_score'] = importance_score
+            news_item['category'] = category
+        if score_details is not None:
+            news_item['score_details'] = json.loads(score_details)
+        return news_item
+
+    def top(self, category=None, min_score=None, since_hours=24, limit=20,
+            source=None, unnotified=False):
+        """按评分降序返回最近 since_hours 小时内的新闻"""
+        where = ["published_at >= ?", "importance_score IS NOT NULL"]
+        params = [time.time() - since_hours * 3600]
+
+        if category:
+            where.append("category = ?")
+            params.append(category)
+        if min_score is not None:
+            where.append("importance_score >= ?")
+            params.append(min_score)
+        if source:
+            where.append("source = ?")
+            params.append(source)
+        if unnotified:
+            where.append("notified_at IS NULL")
+
+        params.append(limit)
+        with self._lock:
+            rows = self.conn.execute(
+                f"SELECT {self.COLUMNS} FROM news WHERE {' AND '.join(where)}"
+                " ORDER BY importance_score DESC LIMIT ?", params
+            ).fetchall()
+        return [self._row_to_news(row) for row in rows]
+
+    def search(self, query, source=None, category=None, since=None, until=None,
+               limit=20):
+        """全文检索，按相关度（BM25）排序
+
+        since / until 为时间戳，限定发布时间范围。返回的新闻带 search_rank，
+        数值越小越相关。相关度只在最近收录的 SEARCH_WINDOW 条匹配中排序，
+        过滤后不足 limit 条时逐步扩大窗口直到覆盖全部匹配。
+        """
+        if not self.fts:
+            raise RuntimeError('当前 SQLite 未编译 FTS5，无法全文检索')
+
+        match = fts_query(query)
+        if not match:
+            return []
+
+        where = ["news_fts MATCH ?", "news_fts.rowid >= ?"]
+        params = [match, 0]
+
+        if source:
+            where.append("n.source = ?")
+            params.append(source)
+        if category:
+            where.append("n.category = ?")
+            params.append(category)
+        if since is not None:
+            where.append("n.published_at >= ?")
+            params.append(since)
+        if until is not None:
+            where.append("n.published_at < ?")
+            params.append(until)
+
+        # 先只取 rowid 和相关度排出前 limit 条，再读取这几条的完整数据
+        weights = ', '.join(str(w) for w in self.FTS_WEIGHTS)
+        join = " JOIN news n ON n.fts_rowid = news_fts.rowid" if len(where) > 2 else ""
+        sql = (f"SELECT n.data, n.importance_score, n.category, n.score_details, f.rank"
+               f" FROM (SELECT news_fts.rowid AS fts_rowid, bm25(news_fts, {weights}) AS rank"
+               f" FROM news_fts{join} WHERE {' AND '.join(where)} ORDER BY rank LIMIT ?) f"
+               f" JOIN news n ON n.fts_rowid = f.fts_rowid ORDER BY f.rank")
+        params.append(limit)
+
+        window = self.SEARCH_WINDOW
+        with self._lock:
+            while True:
+                # 最近 window 条匹配中最早一条的 rowid，匹配不足 window 条时为 None
+                cutoff = self.conn.execute(
+                    "SELECT rowid FROM news_fts WHERE news_fts MATCH ?"
+                    " ORDER BY rowid DESC LIMIT 1 OFFSET ?", (match, window - 1)
+                ).fetchone()
+                params[1] = cutoff[0] if cutoff else 0
+
+                rows = self.conn.execute(sql, params).fetchall()
+                if len(rows) >= limit or cutoff is None:
+                    break
+                window *= 4
+
+        results = []
+        for row in rows:
+            news_item = self._row_to_news(row[:4])
+            news_item['search_rank'] = round(row[4], 4)
+            results.append(news_item)
+        return results
+
+    def counts(self, since_hours=24):
+        """最近 since_hours 小时内各分类的新闻数"""
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT category, COUNT(*) FROM news"
+                " WHERE published_at >= ? AND category IS NOT NULL GROUP BY category",
+                (time.time() - since_hours * 3600,)
+            ).fetchall()
+        return dict(rows)
+
+    def last_scored_at(self):
+        """最近一次评分时间（ISO 格式），无记录时返回 None"""
+        with self._lock:
+            row = self.conn.execute("SELECT MAX(scored_at) FROM news").fetchone()
+        return datetime.fromtimestamp(row[0]).isoformat() if row[0] else None
+
+    def pending(self, channel, min_score=10, since_hours=24, limit=20):
+        """channel 尚未送达的新闻，按评分降序
+
+        已送达的新闻不再返回，除非送达后分类升级为 🔴 极重要。
+        只扫描最近 since_hours 小时内达到 min_score 的新闻，台账按主键逐条查找，
+        每次的开销与待送达的新闻数而非历史评分结果的总量相关。
+        """
+        with self._lock:
+            rows = self.conn.execute(
+                f"SELECT {self.COLUMNS} FROM news n"
+                " WHERE n.published_at >= ? AND n.importance_score >= ?"
+                " AND NOT EXISTS (SELECT 1 FROM deliveries d"
+                "  WHERE d.url_hash = n.url_hash AND d.channel = ?"
+                "  AND (d.category IS n.category OR n.category != '🔴 极重要'))"
+                " ORDER BY n.importance_score DESC LIMIT ?",
+                (time.time() - since_hours * 3600, min_score, channel, limit)
+            ).fetchall()
+        return [self._row_to_news(row) for row in rows]
+
+    def mark_delivered(self, channel, news_list):
+        """记录新闻已通过 channel 送达，同时更新 notified_at"""
+        now = time.time()
+        rows = [(url_hash(n['url']), n.get('category')) for n in news_list if n.get('url')]
+        with self._lock:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO deliveries (url_hash, channel, category, delivered_at)"
+                " VALUES (?, ?, ?, ?)", [(key, channel, category, now) for key, category in rows]
+            )
+            self.conn.executemany(
+                "UPDATE news SET notified_at = ? WHERE url_hash = ?",
+                [(now, key) for key, category in rows]
+            )
+            self.conn.commit()
+
+    def last_delivered_at(self, channel):
+        """channel 最近一次送达的时间戳，从未送达时返回 None"""
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT MAX(delivered_at) FROM deliveries WHERE channel = ?", (channel,)
+            ).fetchone()
+        return row[0]
+
+    def size(self):
+        """当前记录数"""
+        with self._lock:
+            return self.conn.execute("SELECT COUNT(*) FROM news").fetchone()[0]
+
+    def close(self):
+        """提交并关闭"""
+        with self._lock:
+            self.conn.commit()
+            self.conn.close()
@@ -9,14 +9,60 @@ AI 新闻实时推送脚本
 import json
 import sys
 import os
+import time
 from datetime import datetime
 from pathlib import Path
 
-def load_news(file_path):
-    """加载评分后的新闻"""
-    with open(file_path, 'r', encoding='utf-8') as f:
-        data = json.load(f)
-    return data.get('news', [])
+from metrics import append_record
+from news_store import NewsStore
+
+# 通知台账的默认设置（配置 notifications）
+NOTIFICATION_DEFAULTS = {
+    'min_score': 10,        # 通知的最低评分
+    'since_hours': 24,      # 只通知最近这么多小时内发布的新闻
+    'batch_size': 20,       # 每次最多通知的条数，其余留到下次
+    'coalesce_minutes': 30  # 距上次通知不足这么久且没有极重要新闻时暂缓，合并到下次
+}
+
+def notification_settings(config_path):
+    """读取配置中的 notifications 设置，缺省项取默认值"""
+    settings = dict(NOTIFICATION_DEFAULTS)
+    try:
+        with open(config_path, 'r', encoding='utf-8') as f:
+            settings.update(json.load(f).get('notifications', {}))
+    except (OSError, ValueError):
+        pass
+    return settings
+
+def take_pending(store, channel, settings):
+    """从通知台账取出 channel 尚未送达的重要新闻（已按评分降序）
+
+    距上次送达不足 coalesce_minutes 且其中没有 🔴 极重要新闻时返回空列表，
+    短时间内陆续出现的 🟡 重要新闻合并到下一次推送。送达后调用方负责
+    store.mark_delivered()。
+    """
+    news_list = store.pending(channel, min_score=settings['min_score'],
+                              since_hours=settings['since_hours'],
+                              limit=settings['batch_size'])
+    if not news_list:
+        return []
+
+    last = store.last_delivered_at(channel)
+    if (last and time.time() - last < settings['coalesce_minutes'] * 60
+            and not any(n.get('category') == '🔴 极重要' for n in news_list)):
+        return []
+    return news_list
+
+def open_ledger(db_path):
+    """打开通知台账所在的新闻库，不存在时提示并返回 None
+
+    待推送、合并推送都依赖台账记录的送达状态；评分文件只有最近一轮的结果，
+    不能代替台账，所以不再回退到评分文件。
+    """
+    if not Path(db_path).exists():
+        print(f"✗ 未找到新闻库 {db_path}：通知台账需要启用 news_store", file=sys.stderr)
+        return None
+    return NewsStore(db_path)
 
 def format_news_message(news_list):
     """格式化新闻消息"""
@@ -42,6 +88,8 @@ def format_news_message(news_list):
             lines.append(f"   📍 来源: {news.get('source')}")
             lines.append(f"   ⭐ 评分: {news.get('importance_score')}/20")
             lines.append(f"   🔗 {news.get('url')}")
+            for related in news.get('related', []):
+                lines.append(f"   🔗 {related.get('source')}: {related.get('url')}")
 
     if important:
         lines.append("\n## 🟡 重要新闻")
@@ -53,6 +101,8 @@ def format_news_message(news_list):
                 summary = news.get('summary')[:100]
                 lines.append(f"   📝 {summary}...")
             lines.append(f"   🔗 {news.get('url')}")
+            for related in news.get('related', []):
+                lines.append(f"   🔗 {related.get('source')}: {related.get('url')}")
 
     return "\n".join(lines)
 
@@ -61,35 +111,60 @@ def main():
     import argparse
 
     parser = argparse.ArgumentParser(description='AI 新闻推送')
-    parser.add_argument('--input', default='data/news_scored.json',
-                       help='评分后的新闻文件')
     parser.add_argument('--output', default='logs/news_message.txt',
                        help='输出的消息文件')
+    parser.add_argument('--db', default='data/news.db',
+                       help='新闻库文件（含通知台账）')
+    parser.add_argument('--config', default='config/sources.json',
+                       help='配置文件，读取其中的 notifications 设置')
+    parser.add_argument('--channel', default='notify',
+                       help='通知台账中的渠道名（默认: notify）')
+    parser.add_argument('--hours', type=int,
+                       help='新闻库查询的时间范围（小时，默认取配置，24）')
+    parser.add_argument('--limit', type=int,
+                       help='每次最多通知的条数（默认取配置，20）')
+    parser.add_argument('--metrics', default='data/metrics.jsonl',
+                       help='运行记录文件')
 
     args = parser.parse_args()
 
-    # 加载新闻
-    news_list = load_news(args.input)
+    start = time.monotonic()
 
-    if not news_list:
-        print("✓ 无需推送的新闻")
-        return 0
+    # 从新闻库的通知台账取本渠道尚未送达的新闻
+    store = open_ledger(args.db)
+    if store is None:
+        return 1
+
+    try:
+        settings = notification_settings(args.config)
+        if args.hours is not None:
+            settings['since_hours'] = args.hours
+        if args.limit is not None:
+            settings['batch_size'] = args.limit
+        news_list = take_pending(store, args.channel, settings)
+
+        # 格式化消息
+        message = format_news_message(news_list)
+        if not message:
+            print("✓ 无需推送的新闻")
+            return 0
+
+        # 保存消息
+        output_path = Path(args.output)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
 
-    # 格式化消息
-    message = format_news_message(news_list)
+        with open(output_path, 'w', encoding='utf-8') as f:
+            f.write(message)
 
-    if not message:
-        print("✓ 无需推送的新闻")
-        return 0
+        print(f"✓ 消息已保存到: {output_path}")
 
-    # 保存消息
-    output_path = Path(args.output)
-    output_path.parent.mkdir(parents=True, exist_ok=True)
+        store.mark_delivered(args.channel, news_list)
+    finally:
+        store.close()
 
-    with open(output_path, 'w', encoding='utf-8') as f:
-        f.write(message)
+    append_record(args.metrics, 'notify', notifier='notify',
+                  elapsed_seconds=round(time.monotonic() - start, 4), items=len(news_list))
 
-    print(f"✓ 消息已保存到: {output_path}")
     print(f"\n{message}")
 
     return 0
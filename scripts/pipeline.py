@@ -0,0 +1,364 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+AI 新闻处理流水线
+采集 → 评分 → 摘要 → 通知 在同一进程内以生成器串联，
+新闻对象直接在各阶段之间传递，文件输出只是可选的 sink
+"""
+
+import sys
+from datetime import datetime
+from pathlib import Path
+
+from clustering import open_cluster_index
+from collect import AINewsCollector
+from dispatcher import open_dispatcher
+from news_io import NDJSONWriter
+from notify import format_news_message
+from score import AINewsScorer
+from summarize import AINewsSummarizer
+
+
+def threshold_stage(news_iter, threshold=10):
+    """过滤阶段：只放行达到阈值的新闻"""
+    for news_item in news_iter:
+        if news_item['importance_score'] >= threshold:
+            yield news_item
+
+
+def related_link(news_item):
+    """related 列表中的一条：{source, title, url}"""
+    return {
+        'source': news_item.get('source'),
+        'title': news_item.get('title'),
+        'url': news_item.get('url')
+    }
+
+
+def cluster_stage(news_iter, index):
+    """聚类阶段（评分之后）：每个簇只放行得分最高的新闻作为代表
+
+    新簇的首条新闻直接放行。同簇的后来者得分不高于当前代表时，追加到本轮代表的
+    related 列表（代表来自之前的运行、已通知过时直接丢弃）；得分更高时取代代表并再次放行，
+    related 带上簇内其余全部成员（包括历史成员）。本轮被取代的代表标记 superseded，
+    不再进入本轮结果和摘要。
+
+    每个簇只发一次 🔴 告警：簇内已有成员告警过时，新代表标记 cluster_update，
+    只更新摘要中的条目。
+    """
+    representatives = {}
+    for news_item in news_iter:
+        cluster_id, is_new = index.assign(news_item)
+        if cluster_id is None or is_new:
+            if cluster_id is not None:
+                representatives[cluster_id] = news_item
+                mark_alerted(index, cluster_id, news_item)
+            yield news_item
+            continue
+
+        representative = representatives.get(cluster_id)
+        if representative is not None:
+            best = representative['importance_score']
+        else:
+            # 历史簇：与已记录的最高分比较，成员都没有评分记录的簇不再重复通知
+            best = index.best_score(cluster_id, news_item['url'])
+
+        if best is None or news_item['importance_score'] <= best:
+            if representative is not None:
+                representative.setdefault('related', []).append(related_link(news_item))
+            continue
+
+        news_item['related'] = [member for member in index.members(cluster_id)
+                                if member['url'] != news_item['url']]
+        if representative is not None:
+            representative['superseded'] = True
+        representatives[cluster_id] = news_item
+        mark_alerted(index, cluster_id, news_item)
+        yield news_item
+
+
+def mark_alerted(index, cluster_id, news_item):
+    """🔴 簇代表：簇内首次告警时记入索引，已告警过时标记 cluster_update"""
+    if (news_item['category'] == '🔴 极重要'
+            and not index.mark_alerted(cluster_id, news_item['url'])):
+        news_item['cluster_update'] = True
+
+
+def is_alert(news_item):
+    """是否需要单独告警：🔴 极重要且不是已告警簇的更新"""
+    return news_item['category'] == '🔴 极重要' and not news_item.get('cluster_update')
+
+
+def critical_stage(news_iter, dispatcher):
+    """快速通道：原样放行，🔴 极重要新闻立即交给通知分发器，不等本轮其余新闻"""
+    for news_item in news_iter:
+        if is_alert(news_item):
+            dispatcher.submit(news_item)
+        yield news_item
+
+
+def dispatch_stage(news_iter, dispatcher):
+    """分发阶段：原样放行，普通新闻交给通知分发器暂存，本轮结束后作为一批摘要发送
+
+    🔴 极重要新闻已在聚类后经快速通道（critical_stage）入队；
+    已告警簇的更新随摘要发送。
+    """
+    for news_item in news_iter:
+        if not is_alert(news_item):
+            dispatcher.defer(news_item)
+        yield news_item
+
+
+def store_stage(news_iter, store):
+    """入库阶段：原样放行，评分后的新闻逐条写入新闻库（包括同簇重复和未达到阈值的）"""
+    for news_item in news_iter:
+        store.upsert(news_item)
+        yield news_item
+
+
+def record_stage(news_iter, records):
+    """旁路记录阶段：原样放行，同时把经过的新闻追加到 records"""
+    for news_item in news_iter:
+        records.append(news_item)
+        yield news_item
+
+
+class RawFileSink:
+    """写出原始采集结果（news_raw.json）"""
+
+    def __init__(self, path):
+        self.path = Path(path)
+
+    def write(self, pipeline, result):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        pipeline.collector.save_results(self.path)
+
+
+class ScoredFileSink:
+    """写出评分结果（news_scored.json）"""
+
+    def __init__(self, path):
+        self.path = Path(path)
+
+    def write(self, pipeline, result):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        pipeline.scorer.save_results(self.path, result['scored'],
+                                     len(result['raw']), result['threshold'])
+        print(f"✓ 评分结果已保存到: {self.path}")
+
+
+class TextFileSink:
+    """写出文本结果（摘要 digest 或通知 message）"""
+
+    def __init__(self, path, key):
+        self.path = Path(path)
+        self.key = key
+
+    def write(self, pipeline, result):
+        content = result.get(self.key)
+        if content is None:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, 'w', encoding='utf-8') as f:
+            f.write(content)
+        print(f"✓ {self.key} 已保存到: {self.path}")
+
+
+class AINewsPipeline:
+    """AI 新闻处理流水线"""
+
+    def __init__(self, config_path, collector=None, scorer=None, summarizer=None):
+        self.collector = collector or AINewsCollector(config_path)
+        self.scorer = scorer or AINewsScorer(config_path, store=self.collector.news_store)
+        self.summarizer = summarizer or AINewsSummarizer()
+        self.clusters = open_cluster_index(self.collector.config)
+        # 通知分发器，由 enable_dispatcher() 按需启动
+        self.dispatcher = None
+
+    @property
+    def threshold(self):
+        return self.collector.config.get('importance_threshold', 10)
+
+    def enable_dispatcher(self):
+        """启动通知分发器
+
+        🔴 极重要新闻在聚类确定为簇代表后立即送往各通知渠道（快速通道），
+        其余达到阈值的新闻在每轮结束后作为一批摘要发送。
+        """
+        self.dispatcher = open_dispatcher(self.collector.config, self.collector.news_store,
+                                          self.collector.metrics)
+        return self.dispatcher
+
+    def stream(self, news_iter, threshold=None, store=None):
+        """评分（+ 入库）+ 聚类 + 过滤（+ 分发）各阶段串联成的生成器
+
+        先评分再聚类，簇代表取簇内得分最高的新闻；给出 store 时评分后的新闻
+        在聚类前逐条入库，同簇重复和未达到阈值的新闻也带上评分。
+        """
+        if threshold is None:
+            threshold = self.threshold
+        news_iter = self.scorer.iter_score(news_iter)
+        if store is not None:
+            news_iter = store_stage(news_iter, store)
+        if self.clusters:
+            news_iter = cluster_stage(news_iter, self.clusters)
+        if self.dispatcher:
+            news_iter = critical_stage(news_iter, self.dispatcher)
+        news_iter = threshold_stage(news_iter, threshold)
+        if self.dispatcher:
+            news_iter = dispatch_stage(news_iter, self.dispatcher)
+        return news_iter
+
+    def run(self, tasks=None, sinks=()):
+        """运行一轮流水线，返回各阶段结果并交给 sinks 输出
+
+        tasks 为 None 时采集到了轮询时间的源。各源的新闻在响应后立即进入聚类和评分，
+        不等其他源采集完成，极重要新闻的快速通道通知因此不受最慢的源拖累。
+        """
+        if tasks is None:
+            tasks = self.collector.due_tasks()
+
+        threshold = self.threshold
+        raw_news = []
+
+        self.collector.reset()
+        self.scorer.reset_stats()
+        collected = self.collector.iter_collect(tasks)
+
+        scored_news = list(self.stream(record_stage(collected, raw_news), threshold))
+        # 本轮被同簇更高分新闻取代的代表不再单独列出
+        scored_news = [n for n in scored_news if not n.get('superseded')]
+        
+        # 评分在原对象上进行，raw_news 此时已带评分
+        if self.collector.news_store:
+            self.collector.news_store.upsert_many(raw_news)
+        if self.clusters:
+            self.clusters.commit()
+        self.scorer.write_record()
+        if self.dispatcher:
+            self.dispatcher.release()
+        
+        scored_news.sort(key=lambda x: x['importance_score'], reverse=True)
+
+        result = {
+            'threshold': threshold,
+            'raw': raw_news,
+            'scored': scored_news,
+            'digest': self.summarizer.generate_digest(scored_news),
+            'message': format_news_message(list(scored_news))
+        }
+
+        for sink in sinks:
+            sink.write(self, result)
+
+        return result
+
+    def run_stream(self, tasks=None, output_path=None, on_item=None):
+        """流式运行：每条新闻在其源响应后立即评分、写出 NDJSON
+
+        不累积原始或评分结果，内存占用与本轮新闻数量无关；
+        🔴 极重要新闻在评分后立即打印通知（启用分发器时由各通知渠道发送），不等待其他源。
+        返回写出的新闻条数。
+        """
+        writer = NDJSONWriter(output_path) if output_path else None
+        count = 0
+
+        self.collector.reset()
+        self.scorer.reset_stats()
+        self.collector.retain_news = False
+        try:
+            news_iter = self.collector.iter_collect(tasks)
+            for news_item in self.stream(news_iter, store=self.collector.news_store):
+                count += 1
+                if writer:
+                    writer.write(news_item)
+
+                if is_alert(news_item) and not self.dispatcher:
+                    print(f"[{datetime.now()}] 🚨 "
+                          f"{self.summarizer.generate_notification(news_item)}\n")
+
+                if on_item:
+                    on_item(news_item)
+        finally:
+            self.collector.retain_news = True
+            if self.dispatcher:
+                self.dispatcher.release()
+            if self.collector.news_store:
+                self.collector.news_store.commit()
+            if self.clusters:
+                self.clusters.commit()
+            self.scorer.write_record()
+            if writer:
+                writer.close()
+
+        return count
+
+    def close(self):
+        """发送完排队的通知，释放采集器持有的连接池、已见索引、新闻库和聚类索引"""
+        if self.dispatcher:
+            self.dispatcher.close()
+        if self.collector.seen_store:
+            self.collector.seen_store.compact()
+            self.collector.seen_store.close()
+        if self.collector.news_store:
+            self.collector.news_store.close()
+        if self.clusters:
+            self.clusters.compact()
+            self.clusters.close()
+        self.collector.http.close()
+
+
+def main():
+    """主函数"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='AI 新闻处理流水线（单进程）')
+    parser.add_argument('--config', default='config/sources.json',
+                       help='配置文件路径')
+    parser.add_argument('--raw-output',
+                       help='原始新闻输出文件（可选）')
+    parser.add_argument('--scored-output',
+                       help='评分后输出文件（可选）')
+    parser.add_argument('--digest-output',
+                       help='摘要输出文件（可选）')
+    parser.add_argument('--message-output',
+                       help='通知消息输出文件（可选）')
+    parser.add_argument('--stream-output',
+                       help='流式模式：评分结果逐条写入该 NDJSON 文件，'
+                            '忽略其他输出选项')
+    parser.add_argument('--dispatch', action='store_true',
+                       help='评分后立即把重要新闻发送到 notification_channels 配置的渠道')
+
+    args = parser.parse_args()
+
+    sinks = []
+    if args.raw_output:
+        sinks.append(RawFileSink(args.raw_output))
+    if args.scored_output:
+        sinks.append(ScoredFileSink(args.scored_output))
+    if args.digest_output:
+        sinks.append(TextFileSink(args.digest_output, 'digest'))
+    if args.message_output:
+        sinks.append(TextFileSink(args.message_output, 'message'))
+
+    pipeline = AINewsPipeline(args.config)
+    if args.dispatch:
+        pipeline.enable_dispatcher()
+
+    if args.stream_output:
+        count = pipeline.run_stream(output_path=args.stream_output)
+        pipeline.close()
+        print(f"✓ 流水线完成：{count} 条重要新闻已写入 {args.stream_output}")
+        return 0
+
+    result = pipeline.run(sinks=sinks)
+    pipeline.close()
+
+    print(f"✓ 流水线完成：{len(result['raw'])} → {len(result['scored'])}")
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
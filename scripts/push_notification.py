@@ -5,26 +5,34 @@
 推送重要新闻到当前会话
 """
 
-import json
 import sys
+import time
 from pathlib import Path
 from datetime import datetime
 
-def check_and_push_news():
-    """检查并推送重要新闻"""
-    
-    data_file = Path("/root/.openclaw/workspace/skills/ai-news-tracker/data/news_scored.json")
-    
-    if not data_file.exists():
-        return None
+from metrics import append_record
+from notify import notification_settings, open_ledger, take_pending
+
+# 运行记录文件
+METRICS_FILE = Path("/root/.openclaw/workspace/skills/ai-news-tracker/data/metrics.jsonl")
+
+# 新闻库（含通知台账）和配置文件
+DB_FILE = Path("/root/.openclaw/workspace/skills/ai-news-tracker/data/news.db")
+CONFIG_FILE = Path("/root/.openclaw/workspace/skills/ai-news-tracker/config/sources.json")
+
+# 通知台账中的渠道名
+CHANNEL = 'push_notification'
+
+def check_and_push_news(store):
+    """检查并推送重要新闻，返回 (消息, 消息中展示的新闻)
     
-    with open(data_file, 'r', encoding='utf-8') as f:
-        data = json.load(f)
+    从新闻库的通知台账只取本渠道尚未推送的新闻。
+    """
     
-    news_list = data.get('news', [])
+    news_list = take_pending(store, CHANNEL, notification_settings(CONFIG_FILE))
     
     if not news_list:
-        return "✅ 监控运行正常，暂无重要新闻"
+        return "✅ 监控运行正常，暂无重要新闻", []
     
     # 按重要性排序
     news_list.sort(key=lambda x: x.get('importance_score', 0), reverse=True)
@@ -33,7 +41,7 @@ def check_and_push_news():
     important = [n for n in news_list if n.get('category') == '🟡 重要']
     
     if not critical and not important:
-        return "✅ 监控运行正常，暂无重要新闻"
+        return "✅ 监控运行正常，暂无重要新闻", []
     
     lines = []
     lines.append("🤖 **AI 新闻监控报告**")
@@ -54,13 +62,26 @@ def check_and_push_news():
             lines.append(f"📍 {news.get('source')} | ⭐ {news.get('importance_score')}/20")
             lines.append(f"🔗 {news.get('url')}\n")
     
-    return "\n".join(lines)
+    # 只展示的新闻记为已送达，其余留到下次推送
+    return "\n".join(lines), critical + important[:3]
 
 if __name__ == '__main__':
-    message = check_and_push_news()
-    if message and not message.startswith("✅"):
-        print(message)
-        sys.exit(0)
-    else:
+    start = time.monotonic()
+    store = open_ledger(DB_FILE)
+    if store is None:
+        sys.exit(1)
+    
+    try:
+        message, news_list = check_and_push_news(store)
+        sent = bool(message and not message.startswith("✅"))
+        if METRICS_FILE.parent.exists():
+            append_record(METRICS_FILE, 'notify', notifier='push_notification',
+                          elapsed_seconds=round(time.monotonic() - start, 4),
+                          sent=sent, items=len(news_list))
         # 无重要新闻时静默
-        sys.exit(0)
+        if sent:
+            print(message)
+            store.mark_delivered(CHANNEL, news_list)
+    finally:
+        store.close()
+    sys.exit(0)
@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+自适应轮询调度
+按每个源最近的抓取结果调整其轮询间隔：有新内容时缩短，没有时逐步放长，
+限制在 [update_interval, update_interval × max_factor] 之内，从不比配置的间隔更频繁；
+同时按小时统计各源出现新内容的时段：常有新内容的小时内按 update_interval 轮询，
+这些时段开始时提前轮询，其余时段和冷门源逐步放长
+"""
+
+import json
+import math
+import threading
+import time
+from pathlib import Path
+
+
+# 各小时新内容计数的衰减时间常数（秒）：一周前的规律权重降为 1/e
+HOUR_DECAY = 7 * 86400
+# 衰减后累计新内容少于该条数时小时规律不可靠，按冷门源处理
+ACTIVE_ITEMS = 5
+
+
+def hour_shares(start, end):
+    """[(UTC 小时, 占比)]：(start, end] 这段时间落在各个整点小时内的比例"""
+    shares = {}
+    t = start
+    while t < end:
+        boundary = min(end, (t // 3600 + 1) * 3600)
+        hour = time.gmtime(t).tm_hour
+        shares[hour] = shares.get(hour, 0) + (boundary - t) / (end - start)
+        t = boundary
+    return list(shares.items())
+
+
+def align(moment, step):
+    """不早于 moment 的第一个 step 整数倍时刻"""
+    return math.ceil(moment / step) * step
+
+
+def open_scheduler(config):
+    """按配置打开自适应调度，未启用时返回 None"""
+    adaptive_config = config.get('scheduler', {}).get('adaptive', {})
+    if not adaptive_config.get('enabled', True):
+        return None
+    return AdaptiveScheduler(adaptive_config.get('path', 'data/schedule.json'), adaptive_config)
+
+
+class AdaptiveScheduler:
+    """各源独立的轮询排期，持久化为 JSON 文件
+
+    每个源记录当前间隔、下次轮询时间、新内容命中率（指数滑动平均）、
+    新内容速率（条/小时）和按 UTC 小时累计的新内容条数。
+    间隔范围为 [update_interval × min_factor, update_interval × max_factor]，
+    再限制在 [min_seconds, max_seconds] 之内；min_factor 不小于 1，
+    即不会比配置的 update_interval 更频繁地轮询。活跃时段内按 update_interval 轮询，
+    发现延迟与固定间隔轮询相同；请求数的节省来自冷门源和非活跃时段。
+    """
+
+    def __init__(self, path=None, options=None):
+        options = options or {}
+        self.path = Path(path) if path else None
+        self.min_factor = max(1, options.get('min_factor', 1))
+        self.max_factor = options.get('max_factor', 4)
+        self.min_seconds = options.get('min_seconds', 60)
+        self.max_seconds = options.get('max_seconds', 86400)
+        self.growth = options.get('growth', 1.5)    # 没有新内容时间隔乘以该值
+        self.shrink = options.get('shrink', 0.5)    # 有新内容时间隔乘以该值
+        self.alpha = options.get('alpha', 0.3)      # 滑动平均的权重
+        # 新内容计数达到平均值该比例的小时视为活跃小时
+        self.active_share = options.get('active_share', 0.1)
+        self.entries = self.load()
+        self._lock = threading.Lock()
+
+    def load(self):
+        """加载排期文件"""
+        if not self.path or not self.path.exists():
+            return {}
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def save(self):
+        """保存排期文件"""
+        if not self.path:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            data = json.dumps(self.entries, ensure_ascii=False, indent=2)
+        with open(self.path, 'w', encoding='utf-8') as f:
+            f.write(data)
+
+    def bounds(self, base):
+        """按配置的 update_interval 计算间隔上下限"""
+        low = max(self.min_seconds, base * self.min_factor)
+        high = min(self.max_seconds, max(low, base * self.max_factor))
+        return low, high
+
+    def is_due(self, name, now=None):
+        """是否到了轮询时间，没有记录的源立即轮询"""
+        now = now or time.time()
+        with self._lock:
+            entry = self.entries.get(name)
+        return entry is None or entry['next_due'] <= now
+
+    def next_due(self, name):
+        """下次轮询时间戳，没有记录时返回 None"""
+        with self._lock:
+            entry = self.entries.get(name)
+        return entry['next_due'] if entry else None
+
+    def interval(self, name, base):
+        """当前轮询间隔（秒），没有记录时为 update_interval"""
+        with self._lock:
+            entry = self.entries.get(name)
+        return entry['interval'] if entry else base
+
+    def is_active(self, entry):
+        """最近是否经常有新内容（衰减后累计条数达到 ACTIVE_ITEMS）"""
+        return sum(entry['hours']) >= ACTIVE_ITEMS
+
+    def active_hours(self, entry):
+        """新内容计数不低于平均值 active_share 倍的 UTC 小时
+
+        不是活跃源时规律不可靠，返回空集合。
+        """
+        if not self.is_active(entry):
+            return set()
+        hours = entry['hours']
+        threshold = self.active_share * sum(hours) / 24
+        # 和相邻小时一起判断，偶尔没有新内容的小时不会打断活跃时段
+        return {hour for hour in range(24)
+                if max(hours[hour - 1], hours[hour], hours[(hour + 1) % 24]) >= threshold}
+
+    def observe(self, name, base, items, failed=False, now=None):
+        """记录一次轮询结果并排定下次轮询
+
+        items 为本次新增的新闻条数；失败的轮询保持当前间隔，不计入统计。
+        返回下次轮询时间戳。
+        """
+        now = now or time.time()
+        low, high = self.bounds(base)
+
+        with self._lock:
+            entry = self.entries.setdefault(name, {
+                'interval': base, 'next_due': now, 'last_poll': None,
+                'hit_rate': 0.0, 'rate': 0.0, 'hours': [0.0] * 24,
+                'hours_updated': now, 'polls': 0, 'hits': 0
+            })
+
+            if not failed:
+                elapsed = now - entry['last_poll'] if entry['last_poll'] else None
+                hit = items > 0
+                entry['polls'] += 1
+                entry['hits'] += hit
+                entry['hit_rate'] = (1 - self.alpha) * entry['hit_rate'] + self.alpha * hit
+                if elapsed:
+                    rate = items / elapsed * 3600
+                    entry['rate'] = (1 - self.alpha) * entry['rate'] + self.alpha * rate
+
+                # 按时间衰减后把本次的新内容按时长比例分摊到上次轮询以来经过的各 UTC 小时；
+                # 首次轮询取到的是回看窗口内的积压，不计入
+                decay = math.exp(-(now - entry['hours_updated']) / HOUR_DECAY)
+                entry['hours'] = [count * decay for count in entry['hours']]
+                if elapsed and items:
+                    for hour, share in hour_shares(entry['last_poll'], now):
+                        entry['hours'][hour] += items * share
+                entry['hours_updated'] = now
+
+                interval = entry['interval'] * (self.shrink if hit else self.growth)
+                entry['interval'] = min(high, max(low, interval))
+                entry['last_poll'] = now
+            else:
+                entry['interval'] = min(high, max(low, entry['interval']))
+
+            entry['next_due'] = self.schedule(entry, now, base, low)
+            return entry['next_due']
+
+    def schedule(self, entry, now, base, low):
+        """下次轮询时间
+
+        活跃小时内按最短间隔（即 update_interval）轮询，时刻对齐到该间隔的整数倍，
+        与固定间隔轮询同一时刻，发现延迟相同；其余时段按当前间隔，间隔内有活跃小时
+        开始时提前到该小时开始后的第一个对齐时刻。两次轮询之间不少于最短间隔。
+        """
+        active = self.active_hours(entry)
+        if time.gmtime(now).tm_hour in active:
+            return align(now + low, low)
+
+        next_due = now + entry['interval']
+        hour_start = (now // 3600 + 1) * 3600
+        while hour_start < next_due:
+            if time.gmtime(hour_start).tm_hour in active:
+                return min(next_due, align(max(hour_start, now + low), low))
+            hour_start += 3600
+        return next_due
+
+    def stats(self):
+        """各源的当前间隔、下次轮询、命中率和新内容速率"""
+        now = time.time()
+        stats = {}
+        with self._lock:
+            for name, entry in self.entries.items():
+                stats[name] = {
+                    'interval_seconds': round(entry['interval']),
+                    'next_run_in_seconds': round(max(0, entry['next_due'] - now), 1),
+                    'hit_rate': round(entry['hit_rate'], 3),
+                    'items_per_hour': round(entry['rate'], 2),
+                    'active_hours_utc': sorted(self.active_hours(entry))
+                }
+        return stats
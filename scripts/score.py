@@ -6,12 +6,21 @@ AI 新闻智能过滤和评分系统
 多维度评估新闻重要性
 """
 
+import hashlib
 import json
 import re
 import sys
+import time
+from collections import OrderedDict, defaultdict
 from datetime import datetime, timedelta
 from pathlib import Path
 
+from batch_score import BatchScorer, numpy_available
+from keyword_matcher import KeywordMatcher
+from news_io import NDJSONWriter, iter_news
+from metrics import append_record, records_path
+from news_store import open_news_store
+
 
 class AINewsScorer:
     """AI 新闻评分器"""
@@ -39,6 +48,22 @@ class AINewsScorer:
         'novel', 'innovative'
     ]
     
+    # 开源突破关键词
+    OPEN_SOURCE_KEYWORDS = ['open source', '开源', 'weights released']
+    
+    # 性能数量级提升关键词
+    SCALE_KEYWORDS = ['10x', '100x', 'order of magnitude']
+    
+    # 新能力涌现关键词
+    EMERGENT_KEYWORDS = ['emergent', 'new capability', 'first']
+    
+    # 普通改进关键词
+    IMPROVEMENT_KEYWORDS = ['improve', 'better', 'faster']
+    
+    # 分类阈值
+    CRITICAL_THRESHOLD = 15
+    IMPORTANT_THRESHOLD = 10
+    
     # 可信来源（加分）
     TRUSTED_SOURCES = [
         'openai.com', 'anthropic.com', 'deepmind.google',
@@ -46,8 +71,88 @@ class AINewsScorer:
         'mit.edu', 'stanford.edu'
     ]
     
-    def __init__(self, config_path):
-        self.config = self.load_config(config_path)
+    # 静态维度缓存的最大条目数
+    STATIC_CACHE_SIZE = 100000
+    
+    # 静态维度的评分规则版本，规则变化时递增，新闻库中按旧规则保存的评分随之失效
+    STATIC_RULES_VERSION = 1
+    
+    def __init__(self, config_path, store=None):
+        # 内容摘要 -> (创新性, 影响力, 可验证性, 关注词, 内容摘要)，按最近使用淘汰
+        self.static_cache = OrderedDict()
+        # 新闻库：进程内缓存未命中时复用库中内容摘要相同的评分明细，跨运行生效
+        self.store = store
+        self.cache_hits = 0
+        self.store_hits = 0
+        self.full_scores = 0
+        # 本轮评分条数、总耗时和各维度耗时（秒）
+        self.scored = 0
+        self.scoring_seconds = 0.0
+        self.dimension_seconds = defaultdict(float)
+        self.apply_config(self.load_config(config_path))
+    
+    def apply_config(self, config):
+        """应用配置并重建关键词匹配器（关键词可能变化，清空静态维度缓存）"""
+        self.config = config
+        self.matcher = self.build_matcher()
+        self.rules_digest = json.dumps([self.STATIC_RULES_VERSION, self.matcher.keywords,
+                                        self.TRUSTED_SOURCES], sort_keys=True)
+        self.static_cache.clear()
+    
+    def reset_stats(self):
+        """清零本轮的缓存命中 / 完整评分计数和耗时统计"""
+        self.cache_hits = 0
+        self.store_hits = 0
+        self.full_scores = 0
+        self.scored = 0
+        self.scoring_seconds = 0.0
+        self.dimension_seconds = defaultdict(float)
+    
+    def cache_stats(self):
+        """本轮的静态维度缓存统计"""
+        total = self.cache_hits + self.full_scores
+        return {
+            'cache_hits': self.cache_hits,
+            'store_hits': self.store_hits,
+            'full_scores': self.full_scores,
+            'hit_rate': round(self.cache_hits / total, 4) if total else 0.0,
+            'size': len(self.static_cache)
+        }
+    
+    def timing_stats(self):
+        """本轮的评分吞吐量和各维度耗时"""
+        return {
+            'items': self.scored,
+            'seconds': round(self.scoring_seconds, 4),
+            'items_per_s': round(self.scored / self.scoring_seconds, 1) if self.scoring_seconds else 0.0,
+            'dimensions_s': {name: round(seconds, 4)
+                             for name, seconds in self.dimension_seconds.items()}
+        }
+    
+    def write_record(self):
+        """追加本轮的评分运行记录"""
+        append_record(records_path(self.config), 'score',
+                      **self.timing_stats(), cache=self.cache_stats())
+    
+    def build_matcher(self):
+        """把各类关键词表和配置中的关注词（keywords）编译为一个匹配器
+        
+        关注词不参与评分，命中的词记在 score_details['keywords'] 中
+        """
+        return KeywordMatcher({
+            'breakthrough': self.BREAKTHROUGH_KEYWORDS,
+            'model': self.MODEL_KEYWORDS,
+            'research': self.RESEARCH_KEYWORDS,
+            'open_source': self.OPEN_SOURCE_KEYWORDS,
+            'scale': self.SCALE_KEYWORDS,
+            'emergent': self.EMERGENT_KEYWORDS,
+            'improvement': self.IMPROVEMENT_KEYWORDS,
+            'watchlist': self.config.get('keywords', [])
+        })
+    
+    def watchlist(self, hits):
+        """命中的关注词（小写、排序）"""
+        return tuple(sorted(hits.get('watchlist', ())))
     
     def load_config(self, config_path):
         """加载配置"""
@@ -57,64 +162,143 @@ class AINewsScorer:
         except:
             return {}
     
-    def score_news(self, news_item):
-        """单条新闻评分"""
+    def keyword_text(self, news_item):
+        """参与关键词匹配的文本：标题 + 摘要前 500 字，小写"""
+        title = news_item.get('title', '').lower()
+        summary = news_item.get('summary', '')[:500].lower()
+        return f"{title} {summary}"
+    
+    def content_digest(self, news_item):
+        """静态维度的缓存键：URL、标题、摘要、来源和评分规则的 blake2b 摘要，跨进程稳定"""
+        content = json.dumps([self.rules_digest, news_item.get('url', ''),
+                              news_item.get('title'), news_item.get('summary'),
+                              news_item.get('source')], ensure_ascii=False)
+        return hashlib.blake2b(content.encode('utf-8'), digest_size=16).hexdigest()
+    
+    def stored_scores(self, news_item, key):
+        """新闻库中内容摘要相同的评分明细，没有时返回 None"""
+        if self.store is None:
+            return None
+        details = self.store.score_details(news_item.get('url', ''))
+        if not details or details.get('digest') != key:
+            return None
+        return (details['innovation'], details['impact'], details['verifiability'],
+                tuple(details.get('keywords', ())), key)
+    
+    def static_scores(self, news_item):
+        """只依赖标题、摘要、URL、来源的三个维度及命中的关注词，按内容摘要缓存
+        
+        先查进程内缓存，再查新闻库中已保存的评分明细，都未命中时完整评分。
+        """
+        key = self.content_digest(news_item)
+        
+        cached = self.static_cache.get(key)
+        if cached is not None:
+            self.static_cache.move_to_end(key)
+            self.cache_hits += 1
+            return cached
+        
+        cached = self.stored_scores(news_item, key)
+        if cached is not None:
+            self.cache_hits += 1
+            self.store_hits += 1
+            self.remember(key, cached)
+            return cached
+        
+        timings = self.dimension_seconds
+        start = time.perf_counter()
+        combined_text = self.keyword_text(news_item)
+        
+        # 一次扫描得到全部类别的命中
+        hits = self.matcher.find(combined_text)
+        matched = time.perf_counter()
+        
+        innovation = self.score_innovation(combined_text, news_item, hits)
+        innovated = time.perf_counter()
+        impact = self.score_impact(combined_text, news_item, hits)
+        impacted = time.perf_counter()
+        verifiability = self.score_verifiability(news_item)
+        verified = time.perf_counter()
+        scores = (innovation, impact, verifiability, self.watchlist(hits), key)
+        
+        timings['keywords'] += matched - start
+        timings['innovation'] += innovated - matched
+        timings['impact'] += impacted - innovated
+        timings['verifiability'] += verified - impacted
+        
+        self.full_scores += 1
+        self.remember(key, scores)
+        return scores
+    
+    def remember(self, key, scores):
+        """写入进程内缓存，超出容量时淘汰最久未用的条目"""
+        self.static_cache[key] = scores
+        if len(self.static_cache) > self.STATIC_CACHE_SIZE:
+            self.static_cache.popitem(last=False)
+    
+    def score_news(self, news_item, now=None):
+        """单条新闻评分
+        
+        now 为计算时效性的参考时间，默认为当前时间。
+        创新性、影响力、可验证性取自缓存，每次只重新计算关注度和时效性。
+        """
         score = 0
         details = {}
         
-        title = news_item.get('title', '').lower()
-        summary = news_item.get('summary', '')[:500].lower()
-        url = news_item.get('url', '')
-        source = news_item.get('source', '')
-        combined_text = f"{title} {summary}"
+        innovation, impact, verifiability, keywords, digest = self.static_scores(news_item)
         
         # 1. 技术创新性 (0-5分，权重2x)
-        innovation = self.score_innovation(combined_text, news_item)
         score += innovation * 2
         details['innovation'] = innovation
         
         # 2. 行业影响力 (0-5分，权重1.5x)
-        impact = self.score_impact(combined_text, news_item)
         score += impact * 1.5
         details['impact'] = impact
         
         # 3. 可验证性 (0-5分，权重1x)
-        verifiability = self.score_verifiability(news_item)
         score += verifiability
         details['verifiability'] = verifiability
         
         # 4. 关注度 (0-5分，权重1x)
+        start = time.perf_counter()
         attention = self.score_attention(news_item)
         score += attention
         details['attention'] = attention
+        attended = time.perf_counter()
         
         # 5. 时效性 (0-5分，权重0.5x)
-        timeliness = self.score_timeliness(news_item)
+        timeliness = self.score_timeliness(news_item, now)
         score += timeliness * 0.5
         details['timeliness'] = timeliness
         
+        self.dimension_seconds['attention'] += attended - start
+        self.dimension_seconds['timeliness'] += time.perf_counter() - attended
+        
+        # 命中的关注词，不计分
+        details['keywords'] = list(keywords)
+        # 内容摘要，下次运行据此复用新闻库中的静态维度
+        details['digest'] = digest
+        
         return round(score, 2), details
     
-    def score_innovation(self, text, news_item):
+    def score_innovation(self, text, news_item, hits=None):
         """评分：技术创新性"""
         score = 0
         
+        if hits is None:
+            hits = self.matcher.scan(text)
+        
         # 跨时代突破 (5分)
-        for kw in self.BREAKTHROUGH_KEYWORDS:
-            if kw.lower() in text:
-                return 5
+        if 'breakthrough' in hits:
+            return 5
         
         # 大模型发布 (4分)
-        for kw in self.MODEL_KEYWORDS:
-            if kw in text:
-                score = 4
-                break
+        if 'model' in hits:
+            score = 4
         
         # 研究突破 (3分)
-        for kw in self.RESEARCH_KEYWORDS:
-            if kw in text:
-                score = max(score, 3)
-                break
+        if 'research' in hits:
+            score = max(score, 3)
         
         # arXiv 论文 (基础2分)
         if news_item.get('source') == 'arXiv':
@@ -122,24 +306,27 @@ class AINewsScorer:
         
         return min(score, 5)
     
-    def score_impact(self, text, news_item):
+    def score_impact(self, text, news_item, hits=None):
         """评分：行业影响力"""
         score = 0
         
+        if hits is None:
+            hits = self.matcher.scan(text)
+        
         # 开源突破 (5分)
-        if any(kw in text for kw in ['open source', '开源', 'weights released']):
+        if 'open_source' in hits:
             score = 5
         
         # 性能数量级提升 (4分)
-        elif any(kw in text for kw in ['10x', '100x', 'order of magnitude']):
+        elif 'scale' in hits:
             score = 4
         
         # 新能力涌现 (3分)
-        elif any(kw in text for kw in ['emergent', 'new capability', 'first']):
+        elif 'emergent' in hits:
             score = 3
         
         # 普通改进 (2分)
-        elif any(kw in text for kw in ['improve', 'better', 'faster']):
+        elif 'improvement' in hits:
             score = 2
         
         return min(score, 5)
@@ -203,7 +390,7 @@ class AINewsScorer:
         
         return score
     
-    def score_timeliness(self, news_item):
+    def score_timeliness(self, news_item, now=None):
         """评分：时效性"""
         published = news_item.get('published')
         
@@ -212,7 +399,13 @@ class AINewsScorer:
         
         try:
             pub_time = datetime.fromisoformat(published.replace('Z', '+00:00'))
-            age = datetime.now(pub_time.tzinfo) - pub_time
+            if now is None:
+                age = datetime.now(pub_time.tzinfo) - pub_time
+            elif pub_time.tzinfo:
+                age = now.astimezone(pub_time.tzinfo) - pub_time
+            else:
+                # 不带时区的时间按本地时间比较
+                age = now.astimezone().replace(tzinfo=None) - pub_time
             
             if age < timedelta(minutes=30):
                 return 5
@@ -229,59 +422,162 @@ class AINewsScorer:
     
     def classify_news(self, score, news_item):
         """分类新闻"""
-        if score >= 15:
+        if score >= self.CRITICAL_THRESHOLD:
             return '🔴 极重要'
-        elif score >= 10:
+        elif score >= self.IMPORTANT_THRESHOLD:
             return '🟡 重要'
         else:
             return '🟢 一般'
     
-    def filter_and_score(self, input_path, output_path, threshold=10):
-        """过滤并评分所有新闻"""
-        print(f"[{datetime.now()}] 开始评分和过滤...")
-        
-        # 加载原始新闻
-        with open(input_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-        
-        news_list = data.get('news', [])
-        
-        filtered_news = []
-        
-        for news_item in news_list:
-            # 评分
-            score, details = self.score_news(news_item)
-            news_item['importance_score'] = score
-            news_item['score_details'] = details
-            
-            # 分类
+    def crosses_threshold(self, old_score, new_score):
+        """新旧总分是否落在不同的分类区间"""
+        for threshold in (self.CRITICAL_THRESHOLD, self.IMPORTANT_THRESHOLD):
+            if (old_score >= threshold) != (new_score >= threshold):
+                return True
+        return False
+    
+    def score_item(self, news_item, now=None):
+        """评分并分类单条新闻（原地写入 importance_score / score_details / category）
+        
+        已评过分的新闻只在总分跨越分类阈值时重新分类
+        """
+        start = time.perf_counter()
+        old_score = news_item.get('importance_score')
+        score, details = self.score_news(news_item, now)
+        news_item['importance_score'] = score
+        news_item['score_details'] = details
+        if (old_score is None or 'category' not in news_item
+                or self.crosses_threshold(old_score, score)):
             news_item['category'] = self.classify_news(score, news_item)
-            
-            # 过滤
-            if score >= threshold:
-                filtered_news.append(news_item)
+        self.scored += 1
+        self.scoring_seconds += time.perf_counter() - start
+        return news_item
+    
+    def iter_score(self, news_iter):
+        """逐条评分的生成器"""
+        for news_item in news_iter:
+            yield self.score_item(news_item)
+    
+    def score_items(self, news_list, threshold=10):
+        """评分、分类并过滤一组新闻，返回按分数降序排列的结果"""
+        filtered_news = [n for n in self.iter_score(news_list)
+                         if n['importance_score'] >= threshold]
         
         # 按分数排序
         filtered_news.sort(key=lambda x: x['importance_score'], reverse=True)
         
-        # 保存结果
+        return filtered_news
+    
+    def save_results(self, output_path, filtered_news, total_raw, threshold=10):
+        """保存评分结果"""
         result = {
             'processed_at': datetime.now().isoformat(),
             'threshold': threshold,
-            'total_raw': len(news_list),
+            'total_raw': total_raw,
             'total_filtered': len(filtered_news),
             'news': filtered_news
         }
         
         with open(output_path, 'w', encoding='utf-8') as f:
             json.dump(result, f, ensure_ascii=False, indent=2)
+    
+    def score_batch(self, news_list, threshold=10, now=None):
+        """向量化批量评分（需要 NumPy），结果与 score_items 相同"""
+        BatchScorer(self).score_items(news_list, now)
+        
+        filtered_news = [n for n in news_list if n['importance_score'] >= threshold]
+        filtered_news.sort(key=lambda x: x['importance_score'], reverse=True)
+        
+        return filtered_news
+    
+    def filter_and_score(self, input_path, output_path, threshold=10, batch=False,
+                         store=None):
+        """过滤并评分所有新闻，store 不为空时把全部评分结果 upsert 到新闻库"""
+        print(f"[{datetime.now()}] 开始评分和过滤...")
+        
+        # 加载原始新闻
+        with open(input_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        
+        news_list = data.get('news', [])
+        self.reset_stats()
+        
+        if batch and not numpy_available():
+            print("  ✗ 未安装 NumPy，改为逐条评分")
+            batch = False
+        
+        if batch:
+            filtered_news = self.score_batch(news_list, threshold)
+        else:
+            filtered_news = self.score_items(news_list, threshold)
+        
+        # 保存结果
+        self.save_results(output_path, filtered_news, len(news_list), threshold)
+        if store:
+            store.upsert_many(news_list)
         
         print(f"✓ 过滤完成：{len(news_list)} → {len(filtered_news)}")
         print(f"  🔴 极重要: {len([n for n in filtered_news if n['category'] == '🔴 极重要'])}")
         print(f"  🟡 重要: {len([n for n in filtered_news if n['category'] == '🟡 重要'])}")
+        if not batch:
+            self.print_cache_stats()
+            self.write_record()
         print(f"✓ 结果已保存到: {output_path}\n")
         
         return filtered_news
+    
+    def print_cache_stats(self):
+        stats = self.cache_stats()
+        print(f"  评分缓存: 命中 {stats['cache_hits']} 条（新闻库 {stats['store_hits']} 条），"
+              f"完整评分 {stats['full_scores']} 条")
+        timing = self.timing_stats()
+        print(f"  评分速度: {timing['items']} 条，{timing['items_per_s']:.0f} 条/s")
+    
+    def verify_batch(self, input_path):
+        """差分校验：批量评分与逐条评分的结果必须完全一致"""
+        if not numpy_available():
+            print("✗ 未安装 NumPy，无法进行批量评分")
+            return False
+        
+        news_list = list(iter_news(input_path))
+        mismatches, single_elapsed, batch_elapsed = BatchScorer(self).verify(news_list)
+        
+        print(f"  逐条评分: {single_elapsed:.2f}s，批量评分: {batch_elapsed:.2f}s")
+        if mismatches:
+            print(f"✗ 批量评分与逐条评分不一致：{len(mismatches)}/{len(news_list)} 条")
+            for i in mismatches[:10]:
+                print(f"  - {news_list[i].get('title', '')[:60]}")
+            return False
+        
+        print(f"✓ 批量评分与逐条评分一致：{len(news_list)} 条")
+        return True
+    
+    def stream_score(self, input_path, output_path, threshold=10, store=None):
+        """流式评分：逐条读取、评分，达到阈值的立即写出一行 NDJSON
+        
+        不对结果排序，内存占用与输入规模无关。
+        """
+        print(f"[{datetime.now()}] 开始流式评分...")
+        
+        total_raw = 0
+        self.reset_stats()
+        with NDJSONWriter(output_path) as writer:
+            for news_item in self.iter_score(iter_news(input_path)):
+                total_raw += 1
+                if store:
+                    store.upsert(news_item)
+                if news_item['importance_score'] >= threshold:
+                    writer.write(news_item)
+        
+        if store:
+            store.commit()
+        
+        print(f"✓ 过滤完成：{total_raw} → {writer.count}")
+        self.print_cache_stats()
+        self.write_record()
+        print(f"✓ 结果已流式写入: {output_path}\n")
+        
+        return writer.count
 
 
 def main():
@@ -297,17 +593,37 @@ def main():
                        help='配置文件')
     parser.add_argument('--threshold', type=int, default=10,
                        help='重要性阈值 (默认: 10)')
+    parser.add_argument('--stream', action='store_true',
+                       help='流式评分，输出 NDJSON（输入可为 NDJSON 或 JSON）')
+    parser.add_argument('--batch', action='store_true',
+                       help='向量化批量评分（需要 NumPy），适合大批量回补')
+    parser.add_argument('--verify', action='store_true',
+                       help='只校验批量评分与逐条评分结果一致，不写出文件')
     
     args = parser.parse_args()
     
+    # 初始化评分器
+    scorer = AINewsScorer(args.config)
+    
+    if args.verify:
+        return 0 if scorer.verify_batch(args.input) else 1
+    
     # 创建输出目录
     Path(args.output).parent.mkdir(parents=True, exist_ok=True)
     
-    # 初始化评分器
-    scorer = AINewsScorer(args.config)
+    # 评分结果同时写入新闻库，库中已有的评分明细用作静态维度缓存
+    store = open_news_store(scorer.config)
+    scorer.store = store
     
     # 过滤和评分
-    news = scorer.filter_and_score(args.input, args.output, args.threshold)
+    if args.stream:
+        scorer.stream_score(args.input, args.output, args.threshold, store)
+    else:
+        news = scorer.filter_and_score(args.input, args.output, args.threshold,
+                                       args.batch, store)
+    
+    if store:
+        store.close()
     
     return 0
 
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+历史新闻全文检索
+在新闻库的 FTS5 索引上按相关度查询，可按来源、分类和时间范围过滤
+"""
+
+import json
+import re
+import sys
+import time
+from pathlib import Path
+
+from news_store import NewsStore, parse_published
+
+
+# 分类简写
+CATEGORIES = {
+    'critical': '🔴 极重要',
+    'important': '🟡 重要',
+    'normal': '🟢 一般'
+}
+
+
+def parse_time(value):
+    """时间参数：相对时长（30m / 24h / 7d）或 ISO 日期时间，返回时间戳"""
+    if value is None:
+        return None
+
+    match = re.fullmatch(r'(\d+)([mhd])', value)
+    if match:
+        seconds = {'m': 60, 'h': 3600, 'd': 86400}[match.group(2)]
+        return time.time() - int(match.group(1)) * seconds
+
+    timestamp = parse_published(value)
+    if timestamp is None:
+        raise ValueError(f"无法解析的时间: {value}")
+    return timestamp
+
+
+def format_results(results):
+    """格式化检索结果"""
+    lines = []
+    for i, news in enumerate(results, 1):
+        lines.append(f"{i}. {news.get('title')}")
+        lines.append(f"   📍 {news.get('source')} | 📅 {news.get('published') or 'N/A'}"
+                     f" | ⭐ {news.get('importance_score', '-')} {news.get('category', '')}")
+        lines.append(f"   🔗 {news.get('url')}")
+    return "\n".join(lines)
+
+
+def main():
+    """主函数"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='历史新闻全文检索')
+    parser.add_argument('query', nargs='+',
+                       help='检索词（多个词需同时出现）')
+    parser.add_argument('--db', default='data/news.db',
+                       help='新闻库文件')
+    parser.add_argument('--source',
+                       help='只检索该来源，如 arXiv、Hacker News')
+    parser.add_argument('--category', choices=sorted(CATEGORIES),
+                       help='只检索该分类')
+    parser.add_argument('--since',
+                       help='发布时间下限：30m / 24h / 7d 或 ISO 日期')
+    parser.add_argument('--until',
+                       help='发布时间上限：30m / 24h / 7d 或 ISO 日期')
+    parser.add_argument('--limit', type=int, default=20,
+                       help='最多返回条数 (默认: 20)')
+    parser.add_argument('--json', action='store_true',
+                       help='以 JSON 输出')
+
+    args = parser.parse_args()
+
+    if not Path(args.db).exists():
+        print(f"✗ 新闻库不存在: {args.db}")
+        return 1
+
+    try:
+        since = parse_time(args.since)
+        until = parse_time(args.until)
+    except ValueError as e:
+        print(f"✗ {e}")
+        return 1
+
+    store = NewsStore(args.db)
+    start = time.perf_counter()
+    results = store.search(' '.join(args.query), source=args.source,
+                           category=CATEGORIES.get(args.category),
+                           since=since, until=until, limit=args.limit)
+    elapsed = time.perf_counter() - start
+    store.close()
+
+    if args.json:
+        print(json.dumps(results, ensure_ascii=False, indent=2))
+        return 0
+
+    if not results:
+        print("✓ 没有匹配的新闻")
+        return 0
+
+    print(format_results(results))
+    print(f"\n✓ {len(results)} 条结果，耗时 {elapsed * 1000:.1f}ms")
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
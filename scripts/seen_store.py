@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+跨运行的已见 URL 索引
+基于 SQLite 持久化，按规范化 URL 的 64 位哈希去重，支持 TTL 压缩
+"""
+
+import hashlib
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+
+# 不影响内容的跟踪参数
+TRACKING_PARAMS = ('utm_', 'ref', 'ref_src', 'fbclid', 'gclid', 'mc_cid', 'mc_eid')
+
+
+def normalize_url(url):
+    """规范化 URL：忽略协议、www、默认端口、片段、跟踪参数和结尾斜杠"""
+    if not url:
+        return ''
+
+    parts = urlsplit(url.strip())
+    host = (parts.hostname or '').lower()
+    if host.startswith('www.'):
+        host = host[4:]
+    if parts.port and parts.port not in (80, 443):
+        host = f"{host}:{parts.port}"
+
+    query = [(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+             if not k.lower().startswith(TRACKING_PARAMS)]
+    query.sort()
+
+    path = parts.path.rstrip('/') or '/'
+
+    return urlunsplit(('', host, path, urlencode(query), ''))
+
+
+def url_hash(url):
+    """规范化 URL 的 64 位有符号哈希（可直接作为 SQLite 主键）"""
+    digest = hashlib.sha1(normalize_url(url).encode('utf-8')).digest()
+    return int.from_bytes(digest[:8], 'big', signed=True)
+
+
+class SeenURLStore:
+    """持久化的已见 URL 索引
+
+    每个 URL 只存 64 位哈希和时间戳，按主键查找；内存占用只取决于
+    SQLite 页缓存，与记录数无关。
+    """
+
+    def __init__(self, path, ttl_days=7):
+        self.path = Path(path)
+        self.ttl = ttl_days * 86400
+        self.lookups = 0
+        self.hits = 0
+        self._lock = threading.Lock()
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS seen ("
+            " url_hash INTEGER PRIMARY KEY,"
+            " first_seen REAL NOT NULL,"
+            " last_seen REAL NOT NULL)"
+        )
+        self.conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_seen_last_seen ON seen(last_seen)"
+        )
+        self.conn.commit()
+
+    def contains(self, url):
+        """URL 是否已见过（计入命中率统计）"""
+        key = url_hash(url)
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT 1 FROM seen WHERE url_hash = ?", (key,)
+            ).fetchone()
+            self.lookups += 1
+            if row:
+                self.hits += 1
+        return row is not None
+
+    def add(self, url):
+        """记录一个 URL"""
+        now = time.time()
+        with self._lock:
+            self.conn.execute(
+                "INSERT INTO seen (url_hash, first_seen, last_seen) VALUES (?, ?, ?)"
+                " ON CONFLICT(url_hash) DO UPDATE SET last_seen = excluded.last_seen",
+                (url_hash(url), now, now)
+            )
+
+    def commit(self):
+        """提交待写入的记录"""
+        with self._lock:
+            self.conn.commit()
+
+    def compact(self):
+        """删除超过 TTL 的记录，返回删除条数"""
+        cutoff = time.time() - self.ttl
+        with self._lock:
+            cursor = self.conn.execute(
+                "DELETE FROM seen WHERE last_seen < ?", (cutoff,)
+            )
+            self.conn.commit()
+        return cursor.rowcount
+
+    def size(self):
+        """当前记录数"""
+        with self._lock:
+            return self.conn.execute("SELECT COUNT(*) FROM seen").fetchone()[0]
+
+    def stats(self):
+        """命中率统计"""
+        return {
+            'lookups': self.lookups,
+            'hits': self.hits,
+            'misses': self.lookups - self.hits,
+            'hit_rate': round(self.hits / self.lookups, 4) if self.lookups else 0.0,
+            'size': self.size()
+        }
+
+    def close(self):
+        """提交并关闭"""
+        with self._lock:
+            self.conn.commit()
+            self.conn.close()
@@ -7,9 +7,77 @@
 
 import json
 import os
+import time
+import urllib.request
 from datetime import datetime
 from pathlib import Path
 
+from metrics import load_records, percentile
+from news_store import NewsStore
+
+def fetch_daemon_status(url="http://127.0.0.1:8765/status"):
+    """读取常驻监控进程的状态接口，未运行时返回 None"""
+    try:
+        with urllib.request.urlopen(url, timeout=2) as response:
+            return json.loads(response.read().decode('utf-8'))
+    except Exception:
+        return None
+
+def format_percentiles(values, unit='s'):
+    """p50 / p90 / p99"""
+    return " / ".join(f"p{q} {percentile(values, q):.2f}{unit}" for q in (50, 90, 99))
+
+def run_interval(records):
+    """相邻两轮运行的间隔中位数（秒），不足两轮时返回 None"""
+    timestamps = sorted(r['timestamp'] for r in records)
+    gaps = [b - a for a, b in zip(timestamps, timestamps[1:])]
+    return percentile(gaps, 50)
+
+def latency_report(metrics_file, hours=24):
+    """根据运行记录统计最近的采集、评分、推送延迟"""
+    since = time.time() - hours * 3600
+    collects = load_records(metrics_file, 'collect', since)
+    if not collects:
+        return []
+
+    lines = [f"⏱️ **最近 {hours} 小时运行统计**（{len(collects)} 轮采集）:"]
+    lines.append(f"  - 每轮采集耗时: {format_percentiles([r['elapsed_seconds'] for r in collects])}")
+
+    # 各源：任务耗时百分位、单请求 p90 的中位数、错误和条数合计
+    sources = {}
+    for record in collects:
+        for name, stats in record.get('sources', {}).items():
+            sources.setdefault(name, []).append(stats)
+    for name, runs in sorted(sources.items()):
+        errors = sum(run['errors'] for run in runs)
+        items = sum(run['items'] for run in runs)
+        fetch_p90 = percentile([run['fetch_p90_s'] for run in runs if run['requests']], 50)
+        line = f"  - {name}: {format_percentiles([run['latency_s'] for run in runs])}"
+        if fetch_p90 is not None:
+            line += f"，单请求 p90 {fetch_p90:.2f}s"
+        line += f"，{items} 条" + (f"，⚠️ 错误 {errors} 次" if errors else "")
+        lines.append(line)
+
+    scores = load_records(metrics_file, 'score', since)
+    if scores:
+        rates = [r['items_per_s'] for r in scores if r.get('items')]
+        if rates:
+            lines.append(f"  - 评分速度: 中位数 {percentile(rates, 50):.0f} 条/s")
+
+    notifies = load_records(metrics_file, 'notify', since)
+    if notifies:
+        lines.append(f"  - 推送: {len(notifies)} 次，耗时 "
+                     f"{format_percentiles([r['elapsed_seconds'] for r in notifies])}")
+
+    # 快速通道：每条极重要新闻从源响应到送达各渠道的延迟
+    alerts = load_records(metrics_file, 'alert', since)
+    latencies = [r['latency_s'] for r in alerts if r.get('latency_s') is not None]
+    if latencies:
+        lines.append(f"  - 🔴 快速通道: 送达 {len(latencies)} 次，来源响应 → 通知 "
+                     f"{format_percentiles(latencies)}")
+    lines.append("")
+    return lines
+
 def generate_status_report():
     """生成状态报告"""
 
@@ -25,9 +93,32 @@ def generate_status_report():
     lines.append(f"📍 **项目路径**: {project_dir}")
     lines.append("")
 
-    # 检查最新数据
+    # 检查最新数据：优先查询新闻库（索引查询），否则读取评分文件
+    db_file = data_dir / "news.db"
     scored_file = data_dir / "news_scored.json"
-    if scored_file.exists():
+    if db_file.exists():
+        store = NewsStore(db_file)
+        counts = store.counts(since_hours=24)
+        critical = counts.get('🔴 极重要', 0)
+        important = counts.get('🟡 重要', 0)
+        top_news = store.top(min_score=10, since_hours=24, limit=3)
+        last_scored = store.last_scored_at()
+        store.close()
+
+        lines.append("📊 **最近 24 小时监控结果**:")
+        lines.append(f"  - 评分时间: {last_scored or 'N/A'}")
+        lines.append(f"  - 总计: {critical + important} 条重要新闻")
+        lines.append(f"  - 🔴 极重要: {critical} 条")
+        lines.append(f"  - 🟡 重要: {important} 条")
+        lines.append("")
+
+        if top_news:
+            lines.append("**🔝 最新重要新闻**:")
+            for news in top_news:
+                lines.append(f"  • {news.get('title')[:60]}...")
+                lines.append(f"    来源: {news.get('source')} | 评分: {news.get('importance_score')}/20")
+            lines.append("")
+    elif scored_file.exists():
         with open(scored_file, 'r', encoding='utf-8') as f:
             data = json.load(f)
 
@@ -52,12 +143,39 @@ def generate_status_report():
         lines.append("⏳ **等待首次监控完成...**")
         lines.append("")
 
-    # 定时任务状态
-    lines.append("⏰ **定时任务配置**:")
-    lines.append("  - 监控频率: 每 10 分钟")
-    lines.append("  - 通知频率: 每 30 分钟")
-    lines.append("  - 下次监控: 立即（cron 任务已设置）")
-    lines.append("")
+    # 调度状态：优先读取常驻进程，否则为 cron 模式
+    daemon_status = fetch_daemon_status()
+    if daemon_status:
+        lines.append("⏰ **常驻进程调度**:")
+        lines.append(f"  - 运行时长: {daemon_status.get('uptime_seconds', 0) / 3600:.1f} 小时，"
+                     f"已完成 {daemon_status.get('cycles', 0)} 轮")
+        for name, source in daemon_status.get('sources', {}).items():
+            lines.append(f"  - {name}: 每 {source['interval_seconds']}s，"
+                         f"{source['next_run_in_seconds']:.0f}s 后运行")
+        lines.append("")
+    else:
+        # cron 模式：频率取自实际的运行记录
+        metrics_file = data_dir / "metrics.jsonl"
+        collects = load_records(metrics_file, 'collect', time.time() - 86400)
+        notifies = load_records(metrics_file, 'notify', time.time() - 86400)
+        lines.append("⏰ **定时任务**:")
+        if collects:
+            interval = run_interval(collects)
+            last = collects[-1]
+            lines.append(f"  - 上次监控: {last['recorded_at'][:19]}，"
+                         f"耗时 {last['elapsed_seconds']:.1f}s")
+            if interval:
+                lines.append(f"  - 监控频率: 约每 {interval / 60:.0f} 分钟（实测）")
+        else:
+            lines.append("  - 暂无监控运行记录")
+        if notifies:
+            interval = run_interval(notifies)
+            if interval:
+                lines.append(f"  - 通知频率: 约每 {interval / 60:.0f} 分钟（实测）")
+        lines.append("")
+
+    # 延迟百分位：来自每轮追加的运行记录
+    lines.extend(latency_report(data_dir / "metrics.jsonl"))
 
     # 数据源状态
     config_file = project_dir / "config" / "sources.json"
@@ -76,6 +194,7 @@ def generate_status_report():
     lines.append(f"  - 监控日志: {logs_dir / 'monitor.log'}")
     lines.append(f"  - Cron 日志: {logs_dir / 'cron.log'}")
     lines.append(f"  - 最新消息: {logs_dir / 'latest_message.txt'}")
+    lines.append(f"  - 运行记录: {data_dir / 'metrics.jsonl'}")
     lines.append("")
 
     # 管理命令
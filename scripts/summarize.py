@@ -3,23 +3,153 @@
 
 """
 AI 新闻摘要生成器
-使用模板生成可读性强的新闻摘要
+使用模板生成可读性强的新闻摘要，支持 Markdown、HTML 和纯文本（IM）三种格式
 """
 
+import hashlib
+import html
 import json
 import sys
+import threading
+from bisect import bisect_left, insort
+from collections import OrderedDict
 from datetime import datetime
 from pathlib import Path
 
+CRITICAL = '🔴 极重要'
+IMPORTANT = '🟡 重要'
+# 汇总中最多列出的重要新闻条数
+MAX_IMPORTANT = 10
+
+# 各格式汇总的版式：标题、分节标题、每条新闻之后的分隔
+DIGEST_LAYOUTS = {
+    'markdown': {
+        'empty': "# {title}\n\n暂无重要新闻。\n",
+        'header': "# {title}\n📅 {time}\n📊 共 {count} 条重要新闻\n\n",
+        CRITICAL: ("## 🔴 极重要新闻\n\n", "\n\n---\n\n"),
+        IMPORTANT: ("## 🟡 重要新闻\n\n", "\n\n"),
+        'footer': ""
+    },
+    'html': {
+        'empty': "<h1>{title}</h1>\n<p>暂无重要新闻。</p>\n",
+        'header': "<h1>{title}</h1>\n<p>📅 {time} · 📊 共 {count} 条重要新闻</p>\n",
+        CRITICAL: ("<h2>🔴 极重要新闻</h2>\n", "\n<hr>\n"),
+        IMPORTANT: ("<h2>🟡 重要新闻</h2>\n", "\n"),
+        'footer': ""
+    },
+    'text': {
+        'empty': "{title}\n暂无重要新闻。\n",
+        'header': "{title}\n{time} · 共 {count} 条重要新闻\n\n",
+        CRITICAL: ("【🔴 极重要新闻】\n\n", "\n\n"),
+        IMPORTANT: ("【🟡 重要新闻】\n\n", "\n\n"),
+        'footer': ""
+    }
+}
+DIGEST_SUFFIXES = {'markdown': '.md', 'html': '.html', 'text': '.txt'}
+
+
+# 各格式渲染时读取的新闻字段（summary 不出现在任何格式中）
+RENDERED_FIELDS = ('url', 'title', 'source', 'importance_score', 'category',
+                   'related', 'authors', 'abstract')
+
+
+def fragment_key(news_item):
+    """单条新闻渲染片段的缓存键：新闻标识加上全部渲染字段的 blake2b 摘要"""
+    fields = json.dumps([news_item.get(field) for field in RENDERED_FIELDS],
+                        ensure_ascii=False, sort_keys=True, default=str)
+    return (news_item.get('url') or news_item.get('title', ''),
+            hashlib.blake2b(fields.encode('utf-8'), digest_size=16).hexdigest())
+
+
+def digest_parts(fmt, critical, important, count, title, time=None):
+    """按 fmt 的版式排列汇总的各段：标题行、分节标题、渲染片段和分隔
+
+    critical / important 为已渲染的片段（str 或已编码的 bytes），count 为汇总涵盖的新闻总数。
+    """
+    layout = DIGEST_LAYOUTS[fmt]
+    if fmt == 'html':
+        title = html.escape(title)
+    if not count:
+        return [layout['empty'].format(title=title)]
+
+    parts = [layout['header'].format(
+        title=title, count=count,
+        time=time or datetime.now().strftime('%Y-%m-%d %H:%M'))]
+    for category, fragments in ((CRITICAL, critical), (IMPORTANT, important)):
+        if not fragments:
+            continue
+        heading, separator = layout[category]
+        parts.append(heading)
+        for fragment in fragments:
+            parts.append(fragment)
+            parts.append(separator)
+    parts.append(layout['footer'])
+    return parts
+
+
+def split_categories(news_list):
+    """一次遍历按级别分组，重要新闻只取前 MAX_IMPORTANT 条"""
+    critical, important = [], []
+    for news in news_list:
+        category = news.get('category')
+        if category == CRITICAL:
+            critical.append(news)
+        elif category == IMPORTANT:
+            important.append(news)
+    return critical, important[:MAX_IMPORTANT]
+
 
 class AINewsSummarizer:
-    """AI 新闻摘要生成器"""
+    """AI 新闻摘要生成器
     
-    def __init__(self):
-        pass
+    单条新闻的渲染结果按 fragment_key 缓存（LRU，最多 cache_size 条），
+    新闻没有变化时各格式的汇总直接拼接缓存的片段。
+    """
+    
+    def __init__(self, cache_size=4096):
+        self.cache_size = cache_size
+        self._fragments = OrderedDict()  # 缓存键 -> {格式: 渲染结果}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.renderers = {
+            'markdown': self.summarize_single,
+            'html': self.summarize_html,
+            'text': self.summarize_text
+        }
+    
+    def fragment(self, news_item, fmt='markdown'):
+        """单条新闻在 fmt 格式下的渲染结果，优先取缓存"""
+        key = fragment_key(news_item)
+        with self._lock:
+            cached = self._fragments.get(key)
+            if cached is not None and fmt in cached:
+                self._fragments.move_to_end(key)
+                self.hits += 1
+                return cached[fmt]
+        
+        text = self.renderers[fmt](news_item)
+        with self._lock:
+            self.misses += 1
+            self._fragments.setdefault(key, {})[fmt] = text
+            self._fragments.move_to_end(key)
+            while len(self._fragments) > self.cache_size:
+                self._fragments.popitem(last=False)
+        return text
+    
+    def cache_stats(self):
+        """渲染缓存的命中统计"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._fragments),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0
+            }
     
     def summarize_single(self, news_item):
-        """生成单条新闻摘要"""
+        """生成单条新闻摘要（Markdown）"""
         title = news_item.get('title', '')
         url = news_item.get('url', '')
         source = news_item.get('source', '')
@@ -41,47 +171,87 @@ class AINewsSummarizer:
         # 链接
         summary_parts.append(f"🔗 链接：{url}")
         
+        # 其他来源的同一事件报道
+        for related in news_item.get('related', []):
+            summary_parts.append(f"🔗 {related.get('source')}：{related.get('url')}")
+        
         # 额外信息
-        if news_item.get('authors'):
-            authors = ', '.join(news_item['authors'][:3])
-            if len(news_item['authors']) > 3:
-                authors += f" 等{len(news_item['authors'])}人"
+        authors = self.authors_text(news_item)
+        if authors:
             summary_parts.append(f"👤 作者：{authors}")
         
-        if news_item.get('abstract'):
-            abstract = news_item['abstract'][:200]
-            if len(news_item['abstract']) > 200:
-                abstract += "..."
+        abstract = self.abstract_text(news_item)
+        if abstract:
             summary_parts.append(f"📝 摘要：{abstract}")
         
         return '\n'.join(summary_parts)
     
-    def generate_digest(self, news_list, title="AI 新闻速递"):
-        """生成新闻汇总"""
-        if not news_list:
-            return f"# {title}\n\n暂无重要新闻。\n"
-        
-        digest = f"# {title}\n"
-        digest += f"📅 {datetime.now().strftime('%Y-%m-%d %H:%M')}\n"
-        digest += f"📊 共 {len(news_list)} 条重要新闻\n\n"
-        
-        # 极重要新闻
-        critical_news = [n for n in news_list if n['category'] == '🔴 极重要']
-        if critical_news:
-            digest += "## 🔴 极重要新闻\n\n"
-            for news in critical_news:
-                digest += self.summarize_single(news)
-                digest += "\n\n---\n\n"
-        
-        # 重要新闻
-        important_news = [n for n in news_list if n['category'] == '🟡 重要']
-        if important_news:
-            digest += "## 🟡 重要新闻\n\n"
-            for news in important_news[:10]:  # 最多10条
-                digest += self.summarize_single(news)
-                digest += "\n\n"
-        
-        return digest
+    def summarize_html(self, news_item):
+        """生成单条新闻摘要（HTML 片段）"""
+        esc = html.escape
+        title = esc(news_item.get('title', ''))
+        url = esc(news_item.get('url', ''))
+        
+        parts = ['<article class="news">',
+                 f"<h3>【{esc(news_item.get('category', ''))}】<a href=\"{url}\">{title}</a></h3>",
+                 f"<p>📍 来源：{esc(news_item.get('source', ''))} · "
+                 f"⭐ 评分：{news_item.get('importance_score', 0)}/20</p>"]
+        
+        related = news_item.get('related', [])
+        if related:
+            parts.append('<ul class="related">')
+            parts.extend(f"<li><a href=\"{esc(r.get('url') or '')}\">{esc(r.get('source') or '')}</a></li>"
+                         for r in related)
+            parts.append('</ul>')
+        
+        authors = self.authors_text(news_item)
+        if authors:
+            parts.append(f"<p>👤 作者：{esc(authors)}</p>")
+        
+        abstract = self.abstract_text(news_item)
+        if abstract:
+            parts.append(f"<p>📝 摘要：{esc(abstract)}</p>")
+        
+        parts.append('</article>')
+        return '\n'.join(parts)
+    
+    def summarize_text(self, news_item):
+        """生成单条新闻摘要（IM 纯文本，不含摘要和作者）"""
+        parts = [f"【{news_item.get('category', '')}】{news_item.get('title', '')}",
+                 f"{news_item.get('source', '')} | 评分 {news_item.get('importance_score', 0)}/20",
+                 news_item.get('url', '')]
+        parts.extend(f"{related.get('source')}：{related.get('url')}"
+                     for related in news_item.get('related', []))
+        return '\n'.join(parts)
+    
+    def authors_text(self, news_item):
+        """前三位作者，超出时注明总人数"""
+        if not news_item.get('authors'):
+            return ''
+        authors = ', '.join(news_item['authors'][:3])
+        if len(news_item['authors']) > 3:
+            authors += f" 等{len(news_item['authors'])}人"
+        return authors
+    
+    def abstract_text(self, news_item):
+        """截取前 200 字的摘要"""
+        if not news_item.get('abstract'):
+            return ''
+        abstract = news_item['abstract'][:200]
+        if len(news_item['abstract']) > 200:
+            abstract += "..."
+        return abstract
+    
+    def generate_digest(self, news_list, title="AI 新闻速递", fmt='markdown'):
+        """生成新闻汇总（fmt: markdown / html / text）"""
+        critical, important = split_categories(news_list)
+        return self.assemble(critical, important, len(news_list), title, fmt)
+    
+    def assemble(self, critical, important, count, title="AI 新闻速递", fmt='markdown', time=None):
+        """按 fmt 的版式拼接各级别新闻的渲染片段，count 为汇总涵盖的新闻总数"""
+        return ''.join(digest_parts(fmt, [self.fragment(news, fmt) for news in critical],
+                                    [self.fragment(news, fmt) for news in important],
+                                    count, title, time))
     
     def generate_notification(self, news_item):
         """生成推送通知（适合 IM/邮件）"""
@@ -98,6 +268,132 @@ class AINewsSummarizer:
         return notification
 
 
+class DigestDocument:
+    """增量维护的新闻汇总文件
+    
+    按新闻标识（URL）记录当前收录的条目和各格式的渲染片段，每个级别按 (-评分, 首次收录序号)
+    有序排列，与按评分稳定排序的结果一致。update() 只删除消失或变化的条目、按序插入并渲染
+    新增或变化的条目，未变化的条目不再渲染。
+    
+    write() 与上次写出的各段逐段比较：开头相同的段不动，长度相同的段原位覆盖，
+    从第一个长度变化的段起重写文件尾部；内容没有变化时不写文件。
+    """
+    
+    def __init__(self, path, summarizer, formats=('markdown',), title="AI 新闻速递"):
+        path = Path(path)
+        self.paths = {fmt: path.with_suffix(DIGEST_SUFFIXES[fmt]) for fmt in formats}
+        self.summarizer = summarizer
+        self.title = title
+        self.sections = {CRITICAL: [], IMPORTANT: []}  # 级别 -> 有序的 (排序键, 标识)
+        self.entries = {}    # 标识 -> (缓存键, 级别, 排序键, {格式: 编码后的渲染片段})
+        self.order = {}      # 标识 -> 首次收录序号
+        self.written = {}    # 格式 -> 上次写出的各段（bytes）
+        self.count = 0
+        self.changed = True
+        self.updated_at = None
+        self.bytes_written = 0
+    
+    def update(self, news_list):
+        """与新的新闻列表对齐，返回 (新增或变化条数, 删除条数)"""
+        current = {}
+        for news in news_list:
+            if news.get('category') in self.sections:
+                current[news.get('url') or news.get('title', '')] = news
+        
+        removed = 0
+        for ident in [ident for ident, entry in self.entries.items()
+                      if ident not in current or fragment_key(current[ident]) != entry[0]]:
+            self.remove(ident)
+            removed += ident not in current
+        
+        added = 0
+        for ident, news in current.items():
+            if ident not in self.entries:
+                self.insert(ident, news)
+                added += 1
+        
+        if added or removed or self.count != len(news_list):
+            self.changed = True
+        self.count = len(news_list)
+        return added, removed
+    
+    def insert(self, ident, news):
+        """按 (-评分, 首次收录序号) 插入一条新闻并渲染各格式的片段"""
+        order = self.order.setdefault(ident, len(self.order))
+        sort_key = (-news.get('importance_score', 0), order)
+        category = news['category']
+        insort(self.sections[category], (sort_key, ident))
+        fragments = {fmt: self.summarizer.fragment(news, fmt).encode('utf-8')
+                     for fmt in self.paths}
+        self.entries[ident] = (fragment_key(news), category, sort_key, fragments)
+    
+    def remove(self, ident):
+        """删除一条新闻"""
+        key, category, sort_key, fragments = self.entries.pop(ident)
+        section = self.sections[category]
+        del section[bisect_left(section, (sort_key, ident))]
+    
+    def parts(self, fmt='markdown'):
+        """fmt 格式汇总的各段（bytes），时间取内容最近一次变化的时间"""
+        critical = [self.entries[ident][3][fmt] for sort_key, ident in self.sections[CRITICAL]]
+        important = [self.entries[ident][3][fmt]
+                     for sort_key, ident in self.sections[IMPORTANT][:MAX_IMPORTANT]]
+        # 片段已编码，版式中的标题行、分节标题和分隔在这里编码
+        return [part.encode('utf-8') if isinstance(part, str) else part
+                for part in digest_parts(fmt, critical, important, self.count,
+                                         self.title, self.updated_at)]
+    
+    def render(self, fmt='markdown'):
+        """拼接 fmt 格式的汇总"""
+        return b''.join(self.parts(fmt)).decode('utf-8')
+    
+    def patch(self, path, fmt, parts):
+        """把各段写入 path：只写从上次写出的内容起变化的部分，返回写入的字节数"""
+        old = self.written.get(fmt)
+        if old is None or not path.exists() or path.stat().st_size != sum(map(len, old)):
+            path.parent.mkdir(parents=True, exist_ok=True)
+            content = b''.join(parts)
+            with open(path, 'wb') as f:
+                f.write(content)
+            return len(content)
+        
+        written = 0
+        offset = 0
+        with open(path, 'r+b') as f:
+            for i, part in enumerate(parts):
+                if i < len(old) and len(old[i]) == len(part):
+                    if old[i] != part:
+                        f.seek(offset)
+                        f.write(part)
+                        written += len(part)
+                    offset += len(part)
+                    continue
+                # 长度变化：之后的内容整体移位，重写文件尾部
+                tail = b''.join(parts[i:])
+                f.seek(offset)
+                f.write(tail)
+                f.truncate()
+                return written + len(tail)
+            f.truncate(offset)
+        return written
+    
+    def write(self):
+        """写出各格式的汇总文件，返回是否有文件被写入"""
+        missing = [fmt for fmt, path in self.paths.items() if not path.exists()]
+        if not self.changed and not missing:
+            return False
+        
+        if self.changed or not self.updated_at:
+            self.updated_at = datetime.now().strftime('%Y-%m-%d %H:%M')
+        for fmt, path in self.paths.items():
+            if self.changed or fmt in missing:
+                parts = self.parts(fmt)
+                self.bytes_written += self.patch(path, fmt, parts)
+                self.written[fmt] = parts
+        self.changed = False
+        return True
+
+
 def main():
     """主函数"""
     import argparse
@@ -110,6 +406,9 @@ def main():
     parser.add_argument('--format', default='digest',
                        choices=['digest', 'single'],
                        help='输出格式')
+    parser.add_argument('--markup', default='markdown',
+                       choices=list(DIGEST_LAYOUTS),
+                       help='渲染格式（默认: markdown）')
     
     args = parser.parse_args()
     
@@ -126,12 +425,10 @@ def main():
     summarizer = AINewsSummarizer()
     
     if args.format == 'digest':
-        content = summarizer.generate_digest(news_list)
+        content = summarizer.generate_digest(news_list, fmt=args.markup)
     else:
-        content = ''
-        for news in news_list:
-            content += summarizer.summarize_single(news)
-            content += "\n\n---\n\n"
+        content = ''.join(summarizer.fragment(news, args.markup) + "\n\n---\n\n"
+                          for news in news_list)
     
     # 保存
     with open(args.output, 'w', encoding='utf-8') as f:
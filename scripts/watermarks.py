@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+采集高水位记录
+保存每个源已采集到的最新位置（如 arXiv 最新的提交时间），
+下次运行只请求比它更新的内容
+"""
+
+import json
+import threading
+import time
+from pathlib import Path
+
+
+class WatermarkStore:
+    """按键保存的高水位，持久化为 JSON 文件
+
+    每个键记录 value（水位值）和 updated_at（最近一次成功采集的时间戳）。
+    """
+
+    def __init__(self, path=None):
+        self.path = Path(path) if path else None
+        self.entries = self.load()
+        self._lock = threading.Lock()
+
+    def load(self):
+        """加载水位文件"""
+        if not self.path or not self.path.exists():
+            return {}
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def save(self):
+        """保存水位文件"""
+        if not self.path:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            data = json.dumps(self.entries, ensure_ascii=False, indent=2)
+        with open(self.path, 'w', encoding='utf-8') as f:
+            f.write(data)
+
+    def get(self, key, default=None):
+        """水位值，没有记录时返回 default"""
+        with self._lock:
+            return self.entries.get(key, {}).get('value', default)
+
+    def set(self, key, value, updated_at=None):
+        """更新水位值并记录采集时间（默认为当前时间）"""
+        with self._lock:
+            self.entries[key] = {'value': value, 'updated_at': updated_at or time.time()}
+
+    def age(self, key):
+        """距最近一次成功采集的秒数，没有记录时返回无穷大"""
+        with self._lock:
+            updated_at = self.entries.get(key, {}).get('updated_at')
+        return time.time() - updated_at if updated_at else float('inf')
@@ -0,0 +1,150 @@
+# -*- coding: utf-8 -*-
+
+"""
+测试公共设施：本地桩 HTTP 服务器和指向它的采集器
+"""
+
+import json
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / 'scripts'))
+
+from collect import AINewsCollector
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """按 server.routes 中登记的路径返回响应（带查询串的路径找不到时按不带查询串的路径匹配）"""
+
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        route = self.server.routes.get(self.path)
+        if route is None:
+            route = self.server.routes.get(self.path.split('?')[0])
+        self.server.enter(self.path)
+        try:
+            if route is None:
+                status, body, headers, delay = 404, b'', {}, 0
+            else:
+                status, body, headers, delay = route(self) if callable(route) else route
+            if delay:
+                time.sleep(delay)
+        finally:
+            self.server.leave()
+
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class StubServer(ThreadingHTTPServer):
+    """本地桩服务器，记录请求顺序和同时处理中的最大请求数"""
+
+    daemon_threads = True
+    # 默认 backlog 只有 5，并发建连时 SYN 被丢弃会多等 1 秒重传
+    request_queue_size = 128
+
+    def __init__(self):
+        super().__init__(('127.0.0.1', 0), StubHandler)
+        self.routes = {}
+        self.requests = []
+        self.in_flight = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    @property
+    def host(self):
+        return f"127.0.0.1:{self.server_address[1]}"
+
+    def route_handler(self, path, handler):
+        """登记一个按请求生成响应的函数 handler(request) -> (status, body, headers, delay)"""
+        self.routes[path] = handler
+
+    def route(self, path, body=b'', status=200, headers=None, delay=0):
+        """登记一个路径的响应；body 为 dict/list 时按 JSON 返回"""
+        if not isinstance(body, (bytes, str)):
+            body = json.dumps(body)
+            headers = {'Content-Type': 'application/json', **(headers or {})}
+        if isinstance(body, str):
+            body = body.encode('utf-8')
+        self.routes[path] = (status, body, headers or {}, delay)
+
+    def enter(self, path):
+        with self._lock:
+            self.requests.append(path)
+            self.in_flight += 1
+            self.peak = max(self.peak, self.in_flight)
+
+    def leave(self):
+        with self._lock:
+            self.in_flight -= 1
+
+
+@pytest.fixture
+def stub():
+    server = StubServer()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def make_collector(tmp_path, stub):
+    """按覆盖项生成配置并创建指向桩服务器的采集器（状态文件都在临时目录）"""
+    collectors = []
+
+    def make(**overrides):
+        config = {
+            'arxiv_categories': ['cs.AI'],
+            'arxiv': {'update_interval': 0, 'page_size': 100, 'max_results': 1000},
+            'blogs': [],
+            'news_sites': [],
+            'hackernews': {'mode': 'newstories', 'max_stories': 100, 'concurrency': 32},
+            'http': {'max_retries': 0},
+            'scheduler': {'max_workers': 16, 'time_budget': 30, 'adaptive': {'enabled': False}},
+            'seen_store': {'path': str(tmp_path / 'seen_urls.db')},
+            'news_store': {'enabled': False},
+            'clustering': {'path': str(tmp_path / 'clusters.db')},
+            'feed_cache': {'path': str(tmp_path / 'feed_cache.json')},
+            'watermarks': {'path': str(tmp_path / 'watermarks.json')},
+            'metrics': {'enabled': False}
+        }
+        for key, value in overrides.items():
+            if isinstance(value, dict) and isinstance(config.get(key), dict):
+                config[key] = {**config[key], **value}
+            else:
+                config[key] = value
+
+        path = tmp_path / 'sources.json'
+        path.write_text(json.dumps(config, ensure_ascii=False), encoding='utf-8')
+        collector = AINewsCollector(str(path))
+        collector.ARXIV_API_URL = f"{stub.base_url}/arxiv?"
+        collector.HN_API_BASE = f"{stub.base_url}/hn/v0"
+        collectors.append(collector)
+        return collector
+
+    yield make
+    for collector in collectors:
+        if collector.seen_store:
+            collector.seen_store.close()
+        collector.http.close()
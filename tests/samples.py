@@ -0,0 +1,168 @@
+# -*- coding: utf-8 -*-
+
+"""
+测试和基准测试共用的订阅源样本
+按真实响应的结构生成 arXiv Atom、博客 RSS 和 HN API 响应，内容由随机种子确定；
+data/feeds/ 下是按各类发布方实际响应格式整理的样本（arXiv API、WordPress、
+Jekyll Atom、Substack、RSS 1.0、HN API），可用 benchmarks/fixtures.py --record 重新录制
+
+样本目录结构（load_recording 读取，run_pipeline.py --fixture 按此回放）：
+    arxiv.xml            一次 arXiv 查询的完整 Atom 结果，回放时按 start / max_results 分页
+    blogs/<名称>.xml     各博客的 RSS / Atom
+    hn/newstories.json   HN newstories 的 id 列表
+    hn/items/<id>.json   HN item
+"""
+
+import json
+import random
+import time
+import xml.etree.ElementTree as ET
+from email.utils import formatdate
+from pathlib import Path
+from xml.sax.saxutils import escape
+
+# 提交在仓库中的样本目录
+RECORDED = Path(__file__).resolve().parent / 'data' / 'feeds'
+
+ATOM_NS = 'http://www.w3.org/2005/Atom'
+
+
+VOCABULARY = ('model training data learning language neural network agent reasoning '
+              'benchmark vision transformer diffusion alignment inference scaling robot '
+              'open source release research paper results evaluation dataset').split()
+
+ARXIV_CATEGORIES = ['cs.AI', 'cs.CL', 'cs.CV', 'cs.LG', 'cs.NE']
+
+
+def words(rng, n):
+    """n 个随机词：约三成来自 AI 词表，其余是随机生成的词，避免不相关的样本被聚为一类"""
+    return ' '.join(rng.choice(VOCABULARY) if rng.random() < 0.3 else f"w{rng.randrange(50000)}"
+                    for _ in range(n))
+
+
+def arxiv_atom(n=50, seed=1, now=None, total=None, start=0, spacing=60):
+    """arXiv API 查询结果（Atom），n 篇论文，每篇约 200 词摘要，发布时间间隔 spacing 秒"""
+    rng = random.Random(seed)
+    now = now or time.time()
+    entries = []
+    for i in range(n):
+        paper_id = f"2410.{seed:02d}{start + i:04d}"
+        published = time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(now - (start + i) * spacing))
+        authors = ''.join(f"<author><name>Author {rng.randrange(10000)}</name></author>"
+                          for _ in range(rng.randint(2, 8)))
+        category = rng.choice(ARXIV_CATEGORIES)
+        entries.append(
+            f"<entry><id>http://arxiv.org/abs/{paper_id}v1</id>"
+            f"<updated>{published}</updated><published>{published}</published>"
+            f"<title>{escape(words(rng, 12).title())}</title>"
+            f"<summary>  {escape(words(rng, 200))}\n</summary>{authors}"
+            f"<arxiv:comment>12 pages, 5 figures</arxiv:comment>"
+            f'<link href="http://arxiv.org/abs/{paper_id}v1" rel="alternate" type="text/html"/>'
+            f'<link title="pdf" href="http://arxiv.org/pdf/{paper_id}v1" rel="related" type="application/pdf"/>'
+            f'<arxiv:primary_category term="{category}" scheme="http://arxiv.org/schemas/atom"/>'
+            f'<category term="{category}" scheme="http://arxiv.org/schemas/atom"/></entry>'
+        )
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?>\n'
+        '<feed xmlns="http://www.w3.org/2005/Atom" '
+        'xmlns:opensearch="http://a9.com/-/spec/opensearch/1.1/" '
+        'xmlns:arxiv="http://arxiv.org/schemas/atom">'
+        '<title type="html">ArXiv Query</title>'
+        f'<opensearch:totalResults>{total if total is not None else n}</opensearch:totalResults>'
+        f'<opensearch:startIndex>{start}</opensearch:startIndex>'
+        f'<opensearch:itemsPerPage>{n}</opensearch:itemsPerPage>'
+        + ''.join(entries) + '</feed>'
+    ).encode('utf-8')
+
+
+def blog_rss(n=40, seed=2, now=None, body_words=1500, base_url='https://blog.example.com',
+             spacing=1800):
+    """博客 RSS，n 篇文章，每篇带 body_words 词的全文（content:encoded），间隔 spacing 秒"""
+    rng = random.Random(seed)
+    now = now or time.time()
+    items = []
+    for i in range(n):
+        body = ''.join(f"<p>{words(rng, 50)}</p>" for _ in range(body_words // 50))
+        items.append(
+            f"<item><title>{escape(words(rng, 10).title())}</title>"
+            f"<link>{base_url}/{seed}/{i}</link>"
+            f"<guid isPermaLink=\"true\">{base_url}/{seed}/{i}</guid>"
+            f"<pubDate>{formatdate(now - i * spacing, usegmt=True)}</pubDate>"
+            f"<dc:creator>Writer {rng.randrange(100)}</dc:creator>"
+            f"<category>AI</category>"
+            f"<description>{escape(words(rng, 60))}</description>"
+            f"<content:encoded><![CDATA[{body}]]></content:encoded></item>"
+        )
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?>\n'
+        '<rss version="2.0" xmlns:content="http://purl.org/rss/1.0/modules/content/" '
+        'xmlns:dc="http://purl.org/dc/elements/1.1/">'
+        f'<channel><title>Example Blog {seed}</title><link>{base_url}</link>'
+        '<description>AI news</description>'
+        + ''.join(items) + '</channel></rss>'
+    ).encode('utf-8')
+
+
+def hn_item(item_id, now=None, spacing=10, max_id=None, ai_ratio=0.5):
+    """HN item；max_id 为最新的 id，每个 id 间隔 spacing 秒
+
+    每 5 个 id 中一个是 story，其余是评论；story 中约 ai_ratio 的标题与 AI 相关。
+    """
+    rng = random.Random(item_id)
+    now = now or time.time()
+    published = int(now - ((max_id or item_id) - item_id) * spacing)
+    if item_id % 5:
+        return {'id': item_id, 'type': 'comment', 'by': 'user', 'parent': item_id - 1,
+                'text': words(rng, 40), 'time': published}
+    topic = 'LLM' if rng.random() < ai_ratio else 'Rust'
+    return {
+        'id': item_id, 'type': 'story', 'by': 'user',
+        'title': f"{topic} {words(rng, 8)}",
+        'url': f'https://news.example.com/{item_id}',
+        'score': rng.randrange(500), 'descendants': rng.randrange(300),
+        'time': published
+    }
+
+
+def slice_atom(content, start, count):
+    """Atom 结果中第 start 条起的 count 个条目（其余元素原样保留），模拟 arXiv 分页"""
+    for prefix, uri in (('', ATOM_NS), ('opensearch', 'http://a9.com/-/spec/opensearch/1.1/'),
+                        ('arxiv', 'http://arxiv.org/schemas/atom')):
+        ET.register_namespace(prefix, uri)
+    root = ET.fromstring(content)
+    entries = root.findall(f'{{{ATOM_NS}}}entry')
+    for entry in entries[:start] + entries[start + count:]:
+        root.remove(entry)
+    return b'<?xml version="1.0" encoding="UTF-8"?>\n' + ET.tostring(root, encoding='utf-8')
+
+
+def load_recording(path):
+    """读取样本目录，返回 {'arxiv': bytes, 'arxiv_total': 条目数, 'blogs': [(名称, bytes)],
+    'newstories': [...], 'items': {id: bytes}}"""
+    path = Path(path)
+    items_dir = path / 'hn' / 'items'
+    arxiv = (path / 'arxiv.xml').read_bytes()
+    return {
+        'arxiv': arxiv,
+        'arxiv_total': len(ET.fromstring(arxiv).findall(f'{{{ATOM_NS}}}entry')),
+        'blogs': [(feed.stem, feed.read_bytes()) for feed in sorted((path / 'blogs').glob('*.xml'))],
+        'newstories': json.loads((path / 'hn' / 'newstories.json').read_text(encoding='utf-8')),
+        'items': {int(item.stem): item.read_bytes() for item in items_dir.glob('*.json')}
+    }
+
+
+def write_synthetic(output, stories=50):
+    """按样本目录结构写出一份合成样本"""
+    now = time.time()
+    max_id = 1000 + stories * 5
+    (output / 'blogs').mkdir(parents=True, exist_ok=True)
+    (output / 'hn' / 'items').mkdir(parents=True, exist_ok=True)
+    (output / 'arxiv.xml').write_bytes(arxiv_atom(now=now))
+    for k in range(2):
+        (output / 'blogs' / f'blog{k}.xml').write_bytes(
+            blog_rss(seed=10 + k, now=now, base_url=f'https://blog{k}.example.com'))
+    ids = list(range(max_id, max_id - stories * 5, -5))
+    (output / 'hn' / 'newstories.json').write_text(json.dumps(ids))
+    for item_id in ids:
+        (output / 'hn' / 'items' / f'{item_id}.json').write_text(
+            json.dumps(hn_item(item_id, now=now, max_id=max_id)))
@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+
+"""
+批量评分差分测试：BatchScorer 与逐条 score_news 的结果逐项相同
+"""
+
+import random
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+pytest.importorskip('numpy')
+
+from batch_score import BatchScorer
+from score import AINewsScorer
+
+CONFIG = 'config/sources.json'
+NOW = datetime(2026, 10, 18, 12, 0, tzinfo=timezone.utc).astimezone()
+
+TITLES = [
+    'GPT-5 launch', 'New model release with 70 billion parameters', 'A novel architecture',
+    'Open source weights released', '10x faster inference', 'First emergent abilities',
+    'Better tokenizers', 'Weekly roundup', 'The magic of attention', 'Meta 开源 新模型'
+]
+SOURCES = ['arXiv', 'Hacker News', 'OpenAI Blog', 'openai.com', 'TechCrunch AI']
+URLS = ['https://openai.com/blog/x', 'https://arxiv.org/abs/1', 'https://github.com/org/repo',
+        'https://huggingface.co/m', 'https://example.com/post', '']
+
+
+def published(rng):
+    """各种写法的发布时间：带时区、Z、不带时区、只有日期、缺失、非法"""
+    moment = NOW - timedelta(minutes=rng.choice([5, 29, 30, 45, 59, 60, 200, 359, 360,
+                                                 600, 1439, 1440, 3000]))
+    return rng.choice([
+        moment.isoformat(),
+        moment.astimezone(timezone.utc).isoformat().replace('+00:00', 'Z'),
+        moment.astimezone(timezone(timedelta(hours=-7))).isoformat(),
+        moment.astimezone().replace(tzinfo=None).isoformat(),
+        moment.date().isoformat(),
+        None,
+        'yesterday',
+    ])
+
+
+def synthetic_items(n, seed=3):
+    rng = random.Random(seed)
+    items = []
+    for i in range(n):
+        news_item = {
+            'title': rng.choice(TITLES),
+            'url': f'{rng.choice(URLS)}?{i}',
+            'source': rng.choice(SOURCES),
+        }
+        if rng.random() < 0.6:
+            news_item['summary'] = ' '.join(rng.choices(TITLES, k=rng.randint(1, 4)))
+        if news_item['source'] == 'Hacker News':
+            news_item['score'] = rng.choice([0, 20, 51, 100, 101, 200, 201, 500, 501])
+            news_item['comments'] = rng.choice([0, 20, 21, 50, 51, 100, 101, 200, 201])
+        value = published(rng)
+        if value is not None:
+            news_item['published'] = value
+        items.append(news_item)
+    return items
+
+
+def test_batch_matches_single_item_scoring():
+    scorer = AINewsScorer(CONFIG)
+    items = synthetic_items(5000)
+
+    scored = BatchScorer(scorer).score_items([dict(n) for n in items], NOW)
+
+    for news_item, batch_item in zip(items, scored):
+        score, details = scorer.score_news(news_item, NOW)
+        assert batch_item['importance_score'] == score, news_item
+        assert batch_item['score_details'] == details, news_item
+        assert batch_item['category'] == scorer.classify_news(score, news_item), news_item
+
+
+def test_verify_reports_no_mismatches():
+    scorer = AINewsScorer(CONFIG)
+    mismatches, single_elapsed, batch_elapsed = BatchScorer(scorer).verify(
+        synthetic_items(500, seed=11), NOW)
+    assert mismatches == []
+
+
+def test_empty_batch():
+    scorer = AINewsScorer(CONFIG)
+    assert BatchScorer(scorer).score_items([], NOW) == []
@@ -0,0 +1,176 @@
+# -*- coding: utf-8 -*-
+
+"""
+聚类阶段：簇代表取得分最高的成员，后来的更高分成员取代代表，每个簇只告警一次
+"""
+
+import sqlite3
+
+from clustering import StoryClusterIndex, band_buckets, minhash, tokens
+from pipeline import AINewsPipeline, cluster_stage
+
+TITLE = 'OpenAI releases GPT-5 with native multimodal reasoning and tool use'
+
+
+def story(url, score, source='TechCrunch AI'):
+    """同一事件的一条报道（标题相同，已评分）"""
+    return {
+        'title': TITLE,
+        'url': url,
+        'source': source,
+        'importance_score': score,
+        'category': '🔴 极重要' if score >= 15 else '🟡 重要' if score >= 10 else '🟢 一般'
+    }
+
+
+def urls(items):
+    return [item['url'] for item in items]
+
+
+def test_bucket_ids_are_stable():
+    # 桶号持久化在 clusters.db 中，必须与 Python 版本和进程无关
+    signature = minhash(tokens('OpenAI releases GPT-5 with reasoning'))
+    assert band_buckets(signature)[:3] == [
+        23685638491124438, -2243228246019742507, 3167790102189620393]
+
+
+def test_highest_scoring_member_becomes_representative(tmp_path):
+    index = StoryClusterIndex(tmp_path / 'clusters.db')
+    low = story('https://news/low', 8)
+    high = story('https://openai.com/gpt-5', 16, source='OpenAI Blog')
+    late = story('https://news/late', 5)
+
+    passed = list(cluster_stage(iter([low, high, late]), index))
+
+    assert urls(passed) == ['https://news/low', 'https://openai.com/gpt-5']
+    assert low.get('superseded') is True
+    assert 'superseded' not in high
+    assert urls(high['related']) == ['https://news/low', 'https://news/late']
+
+
+def test_late_member_of_historical_cluster(tmp_path):
+    index = StoryClusterIndex(tmp_path / 'clusters.db')
+    list(cluster_stage(iter([story('https://news/first', 12)]), index))
+    index.commit()
+
+    # 新一轮：不高于已通知代表的成员丢弃，更高分的成员再次放行并带上全部历史成员
+    lower = story('https://news/lower', 11)
+    higher = story('https://openai.com/gpt-5', 17, source='OpenAI Blog')
+    passed = list(cluster_stage(iter([lower, higher]), index))
+
+    assert urls(passed) == ['https://openai.com/gpt-5']
+    assert urls(higher['related']) == ['https://news/first', 'https://news/lower']
+
+
+def test_unscored_members_are_not_renotified(tmp_path):
+    path = tmp_path / 'clusters.db'
+    index = StoryClusterIndex(path)
+    list(cluster_stage(iter([story('https://news/first', 12)]), index))
+    index.close()
+
+    # 成员没有评分记录（未评分就加入索引）
+    conn = sqlite3.connect(str(path))
+    conn.execute("UPDATE members SET score = NULL")
+    conn.commit()
+    conn.close()
+
+    index = StoryClusterIndex(path)
+    assert list(cluster_stage(iter([story('https://news/other', 20)]), index)) == []
+
+
+class FixedScorer:
+    """按新闻自带的 fixed 分数评分"""
+
+    def reset_stats(self):
+        pass
+
+    def write_record(self):
+        pass
+
+    def iter_score(self, news_iter):
+        for news_item in news_iter:
+            news_item.update(story(news_item['url'], news_item['fixed'],
+                                   news_item['source']))
+            yield news_item
+
+
+class RecordingDispatcher:
+    def __init__(self):
+        self.submitted = []
+        self.deferred = []
+
+    def submit(self, news_item):
+        self.submitted.append(news_item['url'])
+
+    def defer(self, news_item):
+        self.deferred.append(news_item)
+
+    def release(self):
+        self.submitted.extend(n['url'] for n in self.deferred if not n.get('superseded'))
+        self.deferred = []
+
+
+def test_pipeline_notifies_each_cluster_once_per_improvement(make_collector):
+    collector = make_collector()
+    pipeline = AINewsPipeline(collector.config_path, collector=collector,
+                              scorer=FixedScorer())
+    pipeline.dispatcher = RecordingDispatcher()
+
+    items = [
+        {'url': 'https://news/a', 'source': 'TechCrunch AI', 'fixed': 11},
+        {'url': 'https://news/b', 'source': 'The Verge', 'fixed': 15},
+        {'url': 'https://news/c', 'source': 'Hacker News', 'fixed': 15},
+        {'url': 'https://news/d', 'source': 'Wired', 'fixed': 12},
+    ]
+    scored = list(pipeline.stream(iter(items), threshold=10))
+    scored = [n for n in scored if not n.get('superseded')]
+    pipeline.dispatcher.release()
+
+    # 11 分的首条被 15 分的取代，同分和更低分的成员只附在 related 中
+    assert urls(scored) == ['https://news/b']
+    assert pipeline.dispatcher.submitted == ['https://news/b']
+    assert urls(scored[0]['related']) == ['https://news/a', 'https://news/c', 'https://news/d']
+    pipeline.clusters.close()
+
+
+def test_better_member_of_alerted_cluster_only_updates_digest(make_collector):
+    collector = make_collector()
+    pipeline = AINewsPipeline(collector.config_path, collector=collector,
+                              scorer=FixedScorer())
+    pipeline.dispatcher = RecordingDispatcher()
+
+    items = [
+        {'url': 'https://news/a', 'source': 'TechCrunch AI', 'fixed': 15},
+        {'url': 'https://openai.com/gpt-5', 'source': 'OpenAI Blog', 'fixed': 17},
+    ]
+    scored = list(pipeline.stream(iter(items), threshold=10))
+    scored = [n for n in scored if not n.get('superseded')]
+
+    # 首条 🔴 已告警；更高分的成员取代它作为摘要条目，不再单独告警
+    assert pipeline.dispatcher.submitted == ['https://news/a']
+    assert urls(scored) == ['https://openai.com/gpt-5']
+    assert urls(pipeline.dispatcher.deferred) == ['https://openai.com/gpt-5']
+    pipeline.clusters.commit()
+
+    # 之后的运行：历史簇中更高分的成员同样只进入摘要
+    pipeline.dispatcher = RecordingDispatcher()
+    later = [{'url': 'https://news/z', 'source': 'Wired', 'fixed': 19}]
+    scored = list(pipeline.stream(iter(later), threshold=10))
+
+    assert pipeline.dispatcher.submitted == []
+    assert urls(scored) == ['https://news/z']
+    assert scored[0]['cluster_update'] is True
+    assert urls(pipeline.dispatcher.deferred) == ['https://news/z']
+    pipeline.clusters.close()
+
+
+def test_first_critical_member_of_digest_cluster_alerts(tmp_path):
+    index = StoryClusterIndex(tmp_path / 'clusters.db')
+    important = story('https://news/first', 12)
+    critical = story('https://openai.com/gpt-5', 16, source='OpenAI Blog')
+
+    passed = list(cluster_stage(iter([important, critical]), index))
+
+    # 簇此前只出现在摘要中，首条 🔴 成员照常告警
+    assert urls(passed) == ['https://news/first', 'https://openai.com/gpt-5']
+    assert 'cluster_update' not in critical
@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+
+"""
+HN 并发抓取和并发采集调度：顺序、单主机并发上限、错误隔离、时间预算
+"""
+
+import json
+import threading
+import time
+
+DELAY = 0.2
+
+
+def hn_story(item_id, title=None, url=None):
+    return {'id': item_id, 'type': 'story', 'time': int(time.time()) - 60,
+            'title': title or f'New model release {item_id}',
+            'url': url or f'https://example.com/story/{item_id}',
+            'score': 10, 'descendants': 2}
+
+
+def route_stories(stub, ids, delay=DELAY, **stories):
+    stub.route('/hn/v0/newstories.json', ids)
+    for item_id in ids:
+        stub.route(f'/hn/v0/item/{item_id}.json', stories.get(str(item_id), hn_story(item_id)),
+                   delay=delay)
+
+
+def test_hn_pass_takes_about_one_round_trip(stub, make_collector):
+    ids = list(range(120, 100, -1))
+    route_stories(stub, ids)
+    # 与线上配置一样放开 HN 主机的并发上限（默认每主机 4）
+    collector = make_collector(scheduler={'host_limits': {stub.host: 32}})
+
+    start = time.monotonic()
+    collector.collect_hackernews()
+    elapsed = time.monotonic() - start
+
+    # 顺序抓取需要 20 × 0.2s = 4s，并发一批只需约一个往返
+    assert elapsed < DELAY * 4
+    assert len(collector.collected_news) == len(ids)
+
+
+def test_hn_preserves_order_and_dedup(stub, make_collector):
+    ids = list(range(110, 100, -1))
+    duplicate = hn_story(105, url='https://example.com/story/106')
+    route_stories(stub, ids, delay=0, **{'105': duplicate})
+    # 越新的 story 响应越慢，完成顺序与 newstories 顺序相反
+    for rank, item_id in enumerate(ids):
+        stub.route(f'/hn/v0/item/{item_id}.json',
+                   duplicate if item_id == 105 else hn_story(item_id),
+                   delay=0.02 * (len(ids) - rank))
+    collector = make_collector()
+
+    collector.collect_hackernews()
+
+    urls = [news['url'] for news in collector.collected_news]
+    expected = [f'https://example.com/story/{i}' for i in ids if i != 105]
+    # 105 与 106 同一 URL：先出现的 106 保留，105 去重
+    assert urls == expected
+
+
+def test_hn_respects_per_host_limit(stub, make_collector):
+    ids = list(range(130, 100, -1))
+    route_stories(stub, ids, delay=0.05)
+    collector = make_collector(scheduler={'host_limits': {stub.host: 3}})
+
+    collector.collect_hackernews()
+
+    assert stub.peak <= 3
+    assert len(collector.collected_news) == len(ids)
+
+
+def test_hn_failed_item_is_isolated(stub, make_collector):
+    ids = list(range(110, 100, -1))
+    route_stories(stub, ids, delay=0)
+    stub.route('/hn/v0/item/104.json', b'boom', status=500)
+    collector = make_collector()
+
+    collector.collect_hackernews()
+
+    urls = {news['url'] for news in collector.collected_news}
+    assert len(urls) == len(ids) - 1
+    assert 'https://example.com/story/104' not in urls
+    # 水位停在失败的 id 之前，下次运行重试
+    assert collector.watermarks.get('hackernews') == 103
+
+
+def test_failing_source_does_not_block_others(stub, make_collector):
+    route_stories(stub, [101], delay=0)
+    stub.route('/blog/broken.xml', b'down', status=503)
+    collector = make_collector(blogs=[
+        {'name': 'Broken Blog', 'url': f'{stub.base_url}/blog/broken.xml'}
+    ])
+    tasks = [task for task in collector.build_tasks()
+             if task[0] in ('Broken Blog', 'Hacker News')]
+
+    news = collector.run_tasks(tasks)
+
+    assert [n['url'] for n in news] == ['https://example.com/story/101']
+    assert collector.source_stats['Broken Blog']['errors'] == 1
+
+
+def test_time_budget_applies_while_items_keep_arriving(make_collector):
+    collector = make_collector(scheduler={'time_budget': 0.5})
+
+    def flood():
+        # 持续产出新闻，结果队列从不为空
+        end = time.monotonic() + 3
+        i = 0
+        while time.monotonic() < end and collector.add_news(
+                {'source': 'Flood', 'title': f'item {i}', 'url': f'https://flood/{i}'}):
+            i += 1
+            time.sleep(0.01)
+
+    start = time.monotonic()
+    for _ in collector.iter_collect([('Flood', 0, flood)]):
+        pass
+
+    assert time.monotonic() - start < 1.5
+    assert collector.source_stats['Flood']['errors'] == 1
+
+
+def test_running_tasks_finish_before_state_is_saved(make_collector):
+    collector = make_collector(scheduler={'time_budget': 0.2})
+    finished = threading.Event()
+
+    def slow():
+        # 超出预算后才退出，退出前更新水位
+        while collector._accepting:
+            time.sleep(0.01)
+        time.sleep(0.2)
+        collector.watermarks.set('slow', 'done')
+        finished.set()
+
+    collector.run_tasks([('Slow', 0, slow)])
+
+    # 采集返回时任务已退出，水位文件包含它最后写入的值
+    assert finished.is_set()
+    saved = json.loads(open(collector.config['watermarks']['path'], encoding='utf-8').read())
+    assert 'slow' in saved
+
+
+def test_http_retries_stop_with_the_collection(stub, make_collector):
+    stub.route('/blog/flaky.xml', b'down', status=503)
+    collector = make_collector(http={'max_retries': 5, 'backoff': 5, 'max_backoff': 5})
+
+    collector.http.stopped.set()
+    start = time.monotonic()
+    response = collector.http.get(f'{stub.base_url}/blog/flaky.xml')
+
+    # 停止后不再退避重试，直接返回这次的响应
+    assert response.status_code == 503
+    assert time.monotonic() - start < 1
+    assert len(stub.requests) == 1
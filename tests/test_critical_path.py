@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+
+"""
+极重要新闻快速通道：评分、聚类后立即交给通知分发器，不等本轮其余新闻和较慢的源；
+普通新闻在本轮结束后作为一批摘要发送
+"""
+
+import time
+
+from metrics import load_records
+from pipeline import AINewsPipeline
+from samples import blog_rss
+
+NOW = int(time.time()) - 60
+
+CRITICAL = 'OpenAI releases GPT-5, a breakthrough model with open source weights'
+IMPORTANT = 'New LLM runs faster'
+MINOR = 'New LLM benchmark results'
+
+
+class RecordingDispatcher:
+    """记录每次入队时上游已经产出了多少条新闻"""
+
+    def __init__(self, pulled):
+        self.pulled = pulled
+        self.submitted = []
+        self.deferred = []
+
+    def submit(self, news_item):
+        self.submitted.append((news_item['title'], len(self.pulled)))
+
+    def defer(self, news_item):
+        self.deferred.append(news_item)
+
+    def release(self):
+        self.submitted.extend((n['title'], len(self.pulled)) for n in self.deferred)
+        self.deferred = []
+
+
+def story(i, title):
+    return {'source': 'Hacker News', 'title': title, 'url': f'https://example.com/{i}',
+            'score': 500, 'comments': 300,
+            'published': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(NOW))}
+
+
+def test_critical_news_is_submitted_before_the_rest_is_collected(make_collector):
+    collector = make_collector()
+    pipeline = AINewsPipeline(collector.config_path, collector=collector)
+    pulled = []
+    pipeline.dispatcher = RecordingDispatcher(pulled)
+
+    def source():
+        for i, title in enumerate([IMPORTANT, CRITICAL, MINOR]):
+            pulled.append(title)
+            yield story(i, title)
+
+    scored = list(pipeline.stream(source(), threshold=10))
+    pipeline.clusters.close()
+    categories = {n['title']: n['category'] for n in scored}
+    assert categories[CRITICAL] == '🔴 极重要'
+    assert categories[IMPORTANT] == '🟡 重要'
+
+    # 极重要新闻在上游产出下一条之前入队；重要新闻暂存，未达阈值的不通知
+    assert pipeline.dispatcher.submitted == [(CRITICAL, 2)]
+    pipeline.dispatcher.release()
+    assert pipeline.dispatcher.submitted == [(CRITICAL, 2), (IMPORTANT, 3)]
+
+
+def test_alert_is_delivered_while_slow_source_is_in_flight(stub, make_collector, tmp_path):
+    stub.route('/hn/v0/newstories.json', [101])
+    stub.route('/hn/v0/item/101.json', {
+        'id': 101, 'type': 'story', 'time': NOW, 'title': CRITICAL,
+        'url': 'https://example.com/critical', 'score': 500, 'descendants': 300})
+    stub.route('/slow.xml', blog_rss(3, now=NOW, spacing=60), delay=1.5,
+               headers={'Content-Type': 'application/rss+xml'})
+    records = tmp_path / 'metrics.jsonl'
+    log = tmp_path / 'notifications.log'
+    collector = make_collector(
+        blogs=[{'name': 'Slow Blog', 'url': f'{stub.base_url}/slow.xml'}],
+        metrics={'enabled': True, 'path': str(records)},
+        news_store={'enabled': True, 'path': str(tmp_path / 'news.db')},
+        notification_channels=[{'type': 'log', 'name': 'log', 'path': str(log)}])
+    pipeline = AINewsPipeline(collector.config_path, collector=collector)
+    pipeline.enable_dispatcher()
+    tasks = [task for task in collector.build_tasks() if task[0] in ('Hacker News', 'Slow Blog')]
+
+    delivered = []
+    pipeline.run_stream(tasks, on_item=lambda news: delivered.append(
+        pipeline.dispatcher.flush(1) and log.exists()))
+    pipeline.dispatcher.close()
+    pipeline.clusters.close()
+
+    # 慢源响应之前告警已写入日志渠道，并记入该渠道的通知台账
+    [alert] = load_records(records, kind='alert')
+    assert alert['url'] == 'https://example.com/critical'
+    assert alert['channel'] == 'log'
+    assert alert['latency_s'] < 1.0
+    assert delivered[0]
+    assert CRITICAL in log.read_text(encoding='utf-8')
+    assert collector.news_store.last_delivered_at('log') is not None
+    assert collector.news_store.pending('log') == []
@@ -0,0 +1,39 @@
+# -*- coding: utf-8 -*-
+
+"""
+常驻进程：近期新闻按发布时间滚动保留
+"""
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from daemon import AINewsDaemon
+
+
+@pytest.fixture
+def daemon(tmp_path, make_collector):
+    # 借用 make_collector 生成的测试配置
+    config_path = make_collector(daemon={'retention_hours': 24}).config_path
+    tracker = AINewsDaemon(config_path, data_dir=tmp_path / 'data', logs_dir=tmp_path / 'logs')
+    yield tracker
+    tracker.close()
+
+
+def published(hours_ago, tz):
+    return (datetime.now(timezone.utc) - timedelta(hours=hours_ago)).astimezone(tz).isoformat()
+
+
+@pytest.mark.parametrize('offset', [-8, 0, 9])
+def test_prune_recent_compares_instants(daemon, offset):
+    tz = timezone(timedelta(hours=offset))
+    daemon.recent = {
+        'fresh': {'published': published(23, tz)},
+        'fresh-utc-z': {'published': published(1, timezone.utc).replace('+00:00', 'Z')},
+        'stale': {'published': published(25, tz)},
+        'undated': {}
+    }
+
+    daemon.prune_recent()
+
+    assert set(daemon.recent) == {'fresh', 'fresh-utc-z'}
@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+
+"""
+通知分发：渠道基类必须实现 send，极重要新闻的队列同样有界，失败计数准确
+"""
+
+import threading
+
+import pytest
+
+from dispatcher import CRITICAL_PRIORITY, DIGEST_PRIORITY, Channel, ChannelWorker
+
+
+class BlockingChannel(Channel):
+    """第一次发送阻塞到 release 被设置，用于让队列堆积"""
+
+    def __init__(self):
+        super().__init__('blocking', {})
+        self.release = threading.Event()
+        self.started = threading.Event()
+        self.sent = []
+
+    def send(self, news_list):
+        self.started.set()
+        self.release.wait(5)
+        self.sent.extend(news_list)
+
+
+class FailingChannel(Channel):
+    def __init__(self):
+        super().__init__('failing', {})
+
+    def send(self, news_list):
+        raise RuntimeError('down')
+
+
+def make_worker(channel, **options):
+    settings = {'queue_size': 5, 'batch_size': 1, 'max_retries': 0, 'backoff': 0,
+                'on_sent': lambda channel, batch: None, 'put_timeout': 0.01,
+                **options}
+    return ChannelWorker(channel, **settings)
+
+
+def entry(priority, seq):
+    return (priority, seq, 0, {'url': f'https://news/{seq}'})
+
+
+def test_channel_without_send_cannot_be_instantiated():
+    class Incomplete(Channel):
+        pass
+
+    with pytest.raises(TypeError):
+        Incomplete('incomplete', {})
+
+
+def test_critical_entries_are_bounded_by_reserve():
+    channel = BlockingChannel()
+    worker = make_worker(channel, critical_reserve=3)
+    worker.offer(entry(DIGEST_PRIORITY, 0))
+    assert channel.started.wait(5)
+
+    # 渠道阻塞期间：普通新闻最多排 5 条，极重要新闻再多排 3 条，其余丢弃
+    digest = [worker.offer(entry(DIGEST_PRIORITY, i)) for i in range(1, 8)]
+    critical = [worker.offer(entry(CRITICAL_PRIORITY, i)) for i in range(8, 13)]
+
+    assert digest == [True] * 5 + [False] * 2
+    assert critical == [True] * 3 + [False] * 2
+    assert worker.stats()['dropped'] == 4
+    assert worker.stats()['queued'] == 8
+
+    channel.release.set()
+    assert worker.flush(5)
+    worker.stop()
+    # 极重要新闻先于排队中的普通新闻送出
+    assert [n['url'] for n in channel.sent[1:4]] == [f'https://news/{i}' for i in (8, 9, 10)]
+
+
+def test_failed_batches_are_counted():
+    worker = make_worker(FailingChannel(), batch_size=20)
+    for i in range(10):
+        worker.offer(entry(DIGEST_PRIORITY, i))
+
+    assert worker.flush(5)
+    worker.stop()
+    assert worker.stats()['errors'] == 10
+    assert worker.stats()['sent'] == 0
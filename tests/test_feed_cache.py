@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+
+"""
+订阅源条件请求：内容未变化时服务器返回 304，不解析、不产出新闻；
+校验值跨运行保存，update_interval 内不发请求
+"""
+
+import time
+
+from samples import blog_rss
+
+NOW = int(time.time()) - 60
+ETAG = '"v1"'
+LAST_MODIFIED = 'Mon, 01 Jan 2024 00:00:00 GMT'
+
+
+def route_conditional(stub, path, body, etag=ETAG, last_modified=LAST_MODIFIED):
+    """带 ETag / Last-Modified 的订阅源，校验值匹配时返回 304，记录每次请求的条件头"""
+    seen = []
+
+    def handler(request):
+        conditions = (request.headers.get('If-None-Match'),
+                      request.headers.get('If-Modified-Since'))
+        seen.append(conditions)
+        if (etag and conditions[0] == etag) or (not conditions[0] and conditions[1] == last_modified):
+            return 304, b'', {}, 0
+        headers = {'Content-Type': 'application/rss+xml', 'Last-Modified': last_modified}
+        if etag:
+            headers['ETag'] = etag
+        return 200, body, headers, 0
+    stub.route_handler(path, handler)
+    return seen
+
+
+def blog_collector(stub, make_collector, **blog):
+    url = f'{stub.base_url}/blog.xml'
+    collector = make_collector(blogs=[{'name': 'Example Blog', 'url': url, **blog}])
+    return collector, collector.config['blogs'][0]
+
+
+def test_unchanged_feed_is_not_parsed(stub, make_collector, monkeypatch):
+    seen = route_conditional(stub, '/blog.xml', blog_rss(5, now=NOW, spacing=60))
+    collector, blog = blog_collector(stub, make_collector)
+    collector.collect_blog(blog)
+    assert len(collector.collected_news) == 5
+
+    parsed = []
+    monkeypatch.setattr('collect.parse_feed', lambda *args: parsed.append(args))
+    collector.collect_blog(blog)
+
+    assert seen == [(None, None), (ETAG, LAST_MODIFIED)]
+    assert parsed == []
+    assert len(collector.collected_news) == 5
+    assert collector.feed_cache.stats()['hits'] == 1
+
+
+def test_validators_persist_across_runs(stub, make_collector):
+    seen = route_conditional(stub, '/blog.xml', blog_rss(5, now=NOW, spacing=60))
+    first, blog = blog_collector(stub, make_collector)
+    first.collect_blog(blog)
+    first.report_stats()
+
+    second, blog = blog_collector(stub, make_collector)
+    second.collect_blog(blog)
+
+    assert seen[-1] == (ETAG, LAST_MODIFIED)
+    assert second.collected_news == []
+    assert second.feed_cache.stats() == {'hits': 1, 'misses': 0, 'skipped': 0, 'hit_rate': 1.0}
+
+
+def test_last_modified_alone_is_used(stub, make_collector):
+    seen = route_conditional(stub, '/blog.xml', blog_rss(5, now=NOW, spacing=60), etag=None)
+    collector, blog = blog_collector(stub, make_collector)
+    collector.collect_blog(blog)
+    collector.collect_blog(blog)
+
+    assert seen == [(None, None), (None, LAST_MODIFIED)]
+    assert collector.feed_cache.stats()['hits'] == 1
+
+
+def test_changed_feed_is_fetched_again(stub, make_collector):
+    route_conditional(stub, '/blog.xml', blog_rss(5, now=NOW, spacing=60))
+    collector, blog = blog_collector(stub, make_collector)
+    collector.collect_blog(blog)
+
+    # 内容变化，ETag 随之变化
+    route_conditional(stub, '/blog.xml', blog_rss(3, seed=3, now=NOW + 180, spacing=60), etag='"v2"')
+    collector.collect_blog(blog)
+
+    assert len(collector.collected_news) == 8
+    assert collector.feed_cache.entries[blog['url']]['etag'] == '"v2"'
+    assert collector.feed_cache.stats()['misses'] == 2
+
+
+def test_update_interval_skips_request(stub, make_collector):
+    seen = route_conditional(stub, '/blog.xml', blog_rss(5, now=NOW, spacing=60))
+    collector, blog = blog_collector(stub, make_collector, update_interval=3600)
+    collector.collect_blog(blog)
+    collector.collect_blog(blog)
+
+    assert len(seen) == 1
+    assert collector.feed_cache.stats()['skipped'] == 1
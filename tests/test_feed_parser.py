@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+
+"""
+快速解析与 feedparser 的一致性：命名空间、正文回退、HTML 清洗、条数上限
+"""
+
+import feedparser
+import pytest
+
+import feed_parser
+from feed_parser import parse_fast, parse_feed
+from samples import RECORDED, arxiv_atom, blog_rss
+
+RSS = b'''<?xml version="1.0"?>
+<rss version="2.0" xmlns:media="http://search.yahoo.com/mrss/"
+     xmlns:content="http://purl.org/rss/1.0/modules/content/"
+     xmlns:dc="http://purl.org/dc/elements/1.1/">
+<channel><title>Example</title>
+<item>
+  <title>Real &lt;b&gt;title&lt;/b&gt;</title>
+  <media:title>Media title</media:title>
+  <link>https://example.com/1</link>
+  <description>&lt;p onclick="x()"&gt;Hi&lt;script&gt;alert(1)&lt;/script&gt;
+    &lt;a href="javascript:evil()"&gt;link&lt;/a&gt;&lt;style&gt;p {}&lt;/style&gt;&lt;/p&gt;</description>
+  <media:description>Media description</media:description>
+  <dc:creator>Alice</dc:creator>
+  <pubDate>Mon, 12 Oct 2026 10:00:00 GMT</pubDate>
+</item>
+<item>
+  <media:title>Media first</media:title>
+  <title>Second</title>
+  <link>https://example.com/2</link>
+  <content:encoded><![CDATA[<p>Body <script>bad()</script>text</p>]]></content:encoded>
+</item>
+<item>
+  <title><![CDATA[CDATA <i>title</i>]]></title>
+  <link>https://example.com/3</link>
+  <description>plain &amp; text</description>
+</item>
+</channel></rss>'''
+
+ATOM = b'''<?xml version="1.0"?>
+<feed xmlns="http://www.w3.org/2005/Atom" xmlns:media="http://search.yahoo.com/mrss/">
+<title>Example</title>
+<entry>
+  <title type="html">A &lt;em&gt;b&lt;/em&gt;&lt;script&gt;x()&lt;/script&gt;</title>
+  <link href="https://example.com/a"/>
+  <updated>2026-10-12T10:00:00Z</updated>
+  <content type="html">&lt;p&gt;Content &lt;script&gt;x&lt;/script&gt;only&lt;/p&gt;</content>
+  <media:title>Media title</media:title>
+</entry>
+<entry>
+  <title type="xhtml"><div xmlns="http://www.w3.org/1999/xhtml">X <b>bold</b></div></title>
+  <link href="https://example.com/b"/>
+  <summary type="text">a &lt;b&gt; text</summary>
+  <content type="xhtml"><div xmlns="http://www.w3.org/1999/xhtml"><p>ignored</p></div></content>
+</entry>
+<entry>
+  <title>plain</title>
+  <link rel="enclosure" href="https://example.com/enclosure"/>
+  <link href="https://example.com/c"/>
+  <author><name>Bob</name></author>
+  <content type="xhtml"><div xmlns="http://www.w3.org/1999/xhtml"><p>xhtml <script>s()</script>body</p></div></content>
+</entry>
+</feed>'''
+
+
+def fields(entry):
+    """参与比较的字段；Atom 没有发布时间时快速解析用更新时间代替"""
+    published = entry.get('published_parsed') or entry.get('updated_parsed')
+    return (entry.get('title', '').strip(), entry.get('link'),
+            tuple(published or ())[:6],
+            entry.get('summary', '').strip(),
+            [author.get('name') for author in entry.get('authors', [])])
+
+
+@pytest.mark.parametrize('content', [RSS, ATOM, arxiv_atom(20), blog_rss(20, body_words=200)],
+                         ids=['rss', 'atom', 'arxiv', 'blog'])
+def test_fields_match_feedparser(content):
+    reference = feedparser.parse(content).entries
+    fast = parse_fast(content).entries
+    assert [fields(entry) for entry in fast] == [fields(entry) for entry in reference]
+
+
+@pytest.mark.parametrize('path', [RECORDED / 'arxiv.xml',
+                                  *sorted((RECORDED / 'blogs').glob('*.xml'))],
+                         ids=lambda path: path.name)
+def test_recorded_feeds_match_feedparser(path):
+    content = path.read_bytes()
+    reference = feedparser.parse(content).entries
+    fast = parse_fast(content).entries
+    assert len(fast) == len(reference) > 0
+    assert [fields(entry) for entry in fast] == [fields(entry) for entry in reference]
+
+
+def test_falls_back_to_feedparser_without_its_internals(monkeypatch):
+    monkeypatch.setattr(feed_parser, '_sanitize_html', None)
+    monkeypatch.setattr(feed_parser, 'parse_fast', None)
+
+    feed = parse_feed(RSS, 'fast', limit=2)
+
+    assert len(feed.entries) == 2
+    assert feed.entries[0].title == 'Real <b>title</b>'
+
+
+def test_namespaced_elements_do_not_override_fields():
+    entries = parse_fast(RSS).entries
+    assert entries[0].title == 'Real <b>title</b>'
+    assert entries[1].title == 'Second'
+    assert 'Media' not in entries[0].summary
+
+
+def test_html_is_sanitized_and_content_is_fallback_summary():
+    rss, atom = parse_fast(RSS).entries, parse_fast(ATOM).entries
+    assert rss[0].summary == '<p>Hi\n    <a href="">link</a></p>'
+    assert rss[1].summary == '<p>Body text</p>'
+    assert atom[0].title == 'A <em>b</em>'
+    assert atom[0].summary == '<p>Content only</p>'
+    assert atom[2].summary == '<p>xhtml body</p>'
+
+
+def test_blog_default_entry_cap(stub, make_collector):
+    stub.route('/blog.xml', blog_rss(30, base_url='https://blog.example.com', spacing=60),
+               headers={'Content-Type': 'application/rss+xml'})
+    collector = make_collector(blogs=[{'name': 'Example Blog',
+                                       'url': f'{stub.base_url}/blog.xml'}])
+
+    collector.collect_blog(collector.config['blogs'][0])
+
+    assert len(collector.collected_news) == 20
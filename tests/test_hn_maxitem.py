@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+
+"""
+HN maxitem 模式：从 maxitem 向下按批扫描，整批都早于采集起点时停止，
+请求数只与上次运行以来新增的 item 数有关
+"""
+
+import time
+
+from samples import hn_item
+
+NOW = time.time()
+# 每个 id 间隔 4 分钟：最新的 15 个 id 在首次采集回看的 1 小时之内
+SPACING = 240
+
+
+def route_items(stub, max_id, count):
+    stub.route('/hn/v0/maxitem.json', max_id)
+    for item_id in range(max_id, max_id - count, -1):
+        stub.route(f'/hn/v0/item/{item_id}.json',
+                   hn_item(item_id, now=NOW, spacing=SPACING, max_id=max_id, ai_ratio=1.0))
+
+
+def item_requests(stub):
+    return sorted(int(path.rsplit('/', 1)[1].split('.')[0])
+                  for path in stub.requests if '/item/' in path)
+
+
+def maxitem_collector(make_collector, **hackernews):
+    return make_collector(hackernews={'mode': 'maxitem', 'concurrency': 10, **hackernews})
+
+
+def test_scan_stops_after_first_batch_older_than_window(stub, make_collector):
+    route_items(stub, 200, 100)
+    collector = maxitem_collector(make_collector)
+
+    collector.collect_hackernews()
+
+    # 191-200、181-190 有窗口内的 item，171-180 整批过期后停止
+    assert item_requests(stub) == list(range(171, 201))
+    assert sorted(news['url'] for news in collector.collected_news) == [
+        f'https://news.example.com/{i}' for i in (190, 195, 200)]
+    assert collector.watermarks.get('hackernews') == 200
+
+
+def test_scan_stops_at_watermark(stub, make_collector):
+    route_items(stub, 200, 100)
+    collector = maxitem_collector(make_collector)
+    collector.watermarks.set('hackernews', 193)
+
+    collector.collect_hackernews()
+
+    assert item_requests(stub) == list(range(194, 201))
+    assert [news['url'] for news in collector.collected_news] == [
+        'https://news.example.com/200', 'https://news.example.com/195']
+    assert collector.watermarks.get('hackernews') == 200
+
+
+def test_scan_is_capped_by_max_scan(stub, make_collector):
+    route_items(stub, 5000, 40)
+    collector = maxitem_collector(make_collector, max_scan=25)
+    # 水位之上的 item 都在窗口内，只受 max_scan 限制
+    collector.watermarks.set('hackernews', 1)
+
+    collector.collect_hackernews()
+
+    assert item_requests(stub) == list(range(4976, 5001))
+
+
+def test_failed_item_holds_back_the_watermark(stub, make_collector):
+    route_items(stub, 200, 100)
+    stub.route('/hn/v0/item/195.json', b'', status=500)
+    collector = maxitem_collector(make_collector)
+    collector.watermarks.set('hackernews', 190)
+
+    collector.collect_hackernews()
+
+    assert collector.watermarks.get('hackernews') == 194
+    assert [news['url'] for news in collector.collected_news] == ['https://news.example.com/200']
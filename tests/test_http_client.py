@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+
+"""
+共享 HTTP 客户端：429/5xx 退避重试、按主机限速、keep-alive 连接复用
+"""
+
+import time
+
+import pytest
+import requests
+
+from http_client import HTTPClient
+
+
+def flaky(failures, status=503, headers=None):
+    """前 failures 次返回 status，之后返回 200"""
+    calls = []
+
+    def handler(request):
+        calls.append(request.path)
+        if len(calls) <= failures:
+            return status, b'busy', headers or {}, 0
+        return 200, b'ok', {}, 0
+    return handler, calls
+
+
+@pytest.fixture
+def client():
+    http = HTTPClient(max_retries=3, backoff=0.01, max_backoff=0.05)
+    yield http
+    http.close()
+
+
+@pytest.mark.parametrize('status', [429, 503])
+def test_retryable_status_is_retried(stub, client, status):
+    handler, calls = flaky(2, status)
+    stub.route_handler('/feed', handler)
+
+    response = client.get(f'{stub.base_url}/feed')
+
+    assert response.status_code == 200
+    assert len(calls) == 3
+    assert client.stats()['retries'] == 2
+
+
+def test_retries_are_bounded(stub, client):
+    handler, calls = flaky(10)
+    stub.route_handler('/feed', handler)
+
+    response = client.get(f'{stub.base_url}/feed')
+
+    assert response.status_code == 503
+    assert len(calls) == client.max_retries + 1
+
+
+def test_client_errors_are_not_retried(stub, client):
+    stub.route('/missing', b'', status=404)
+
+    assert client.get(f'{stub.base_url}/missing').status_code == 404
+    assert stub.requests == ['/missing']
+
+
+def test_retry_after_is_honoured(stub, client):
+    handler, calls = flaky(1, 429, {'Retry-After': '1'})
+    stub.route_handler('/feed', handler)
+    client.max_backoff = 0.3
+
+    start = time.monotonic()
+    assert client.get(f'{stub.base_url}/feed').status_code == 200
+
+    # Retry-After 也受 max_backoff 限制
+    assert 0.3 <= time.monotonic() - start < 1
+
+
+def test_connection_errors_are_retried_then_raised(client):
+    with pytest.raises(requests.ConnectionError):
+        client.get('http://127.0.0.1:9/unreachable', timeout=1)
+
+    assert client.stats()['requests'] == client.max_retries + 1
+
+
+def test_per_host_rate_limit(stub, client):
+    stub.route('/api', b'ok')
+    client.rate_limits = {stub.host: 0.1}
+
+    start = time.monotonic()
+    for _ in range(4):
+        client.get(f'{stub.base_url}/api')
+
+    # 第一个请求立即发出，之后每个间隔 0.1 秒
+    assert time.monotonic() - start >= 0.3
+
+
+def test_connections_are_reused(stub, client):
+    stub.route('/api', b'ok')
+
+    for _ in range(10):
+        client.get(f'{stub.base_url}/api')
+
+    assert client.stats()['requests'] == 10
+    assert client.stats()['connections'] == 1
+
+
+def test_collector_applies_http_config(stub, make_collector):
+    collector = make_collector(http={'max_retries': 2, 'backoff': 0.01,
+                                     'rate_limits': {stub.host: 0.1}})
+
+    assert collector.http.max_retries == 2
+    assert collector.http.backoff == 0.01
+    assert collector.http.rate_limits[stub.host] == 0.1
+    # arXiv 默认限速保留
+    assert collector.http.rate_limits['export.arxiv.org'] == collector.ARXIV_RATE_LIMIT
@@ -0,0 +1,171 @@
+# -*- coding: utf-8 -*-
+
+"""
+关键词评分：KeywordMatcher 与原先逐关键词子串查找的结果完全一致
+"""
+
+import random
+
+import pytest
+
+from keyword_matcher import KeywordMatcher, automaton_available
+from score import AINewsScorer
+
+CONFIG = 'config/sources.json'
+
+# 容易因按词匹配、词尾变化、连字符处理而产生差异的文本
+TRICKY_TITLES = [
+    'Open-source weights released for Llama 4',
+    'The magic of scaling laws',
+    'GPT-50 rumours',
+    'GPT-5 is here',
+    'Claude-4 and Gemini 2.0 compared',
+    'Researchers improved the optimizer',
+    'An open source model release with 7 billion parameters',
+    'A 10x faster kernel',
+    'First emergent behaviour observed',
+    'Meta 开源 新模型',
+    'state-of-the-art results on ImageNet',
+    'Launching a new arXiv mirror',
+    'Novelty detection',
+    'papers with code',
+    'SOTA',
+    '',
+]
+
+
+def legacy_innovation(scorer, text, news_item):
+    """原实现：逐关键词子串查找"""
+    score = 0
+    for kw in scorer.BREAKTHROUGH_KEYWORDS:
+        if kw.lower() in text:
+            return 5
+    for kw in scorer.MODEL_KEYWORDS:
+        if kw in text:
+            score = 4
+            break
+    for kw in scorer.RESEARCH_KEYWORDS:
+        if kw in text:
+            score = max(score, 3)
+            break
+    if news_item.get('source') == 'arXiv':
+        score = max(score, 2)
+    return min(score, 5)
+
+
+def legacy_impact(text):
+    """原实现：逐关键词子串查找"""
+    if any(kw in text for kw in ['open source', '开源', 'weights released']):
+        return 5
+    if any(kw in text for kw in ['10x', '100x', 'order of magnitude']):
+        return 4
+    if any(kw in text for kw in ['emergent', 'new capability', 'first']):
+        return 3
+    if any(kw in text for kw in ['improve', 'better', 'faster']):
+        return 2
+    return 0
+
+
+def synthetic_items(n, seed=7):
+    """在随机文本中插入关键词及其变形（大小写、连字符、词尾、拼接）"""
+    rng = random.Random(seed)
+    scorer = AINewsScorer(CONFIG)
+    keywords = (scorer.BREAKTHROUGH_KEYWORDS + scorer.MODEL_KEYWORDS
+                + scorer.RESEARCH_KEYWORDS + scorer.OPEN_SOURCE_KEYWORDS
+                + scorer.SCALE_KEYWORDS + scorer.EMERGENT_KEYWORDS
+                + scorer.IMPROVEMENT_KEYWORDS + scorer.config.get('keywords', []))
+    variants = [
+        lambda kw: kw,
+        lambda kw: kw.upper(),
+        lambda kw: kw.replace(' ', '-'),
+        lambda kw: kw.replace('-', ' '),
+        lambda kw: kw + 'ed',
+        lambda kw: 'x' + kw,
+        lambda kw: kw + '0',
+    ]
+    filler = ('we study a method for training networks on tasks with data and '
+              'report results across settings').split()
+
+    items = []
+    for i in range(n):
+        words = rng.choices(filler, k=rng.randint(3, 40))
+        for _ in range(rng.randint(0, 3)):
+            words.insert(rng.randrange(len(words) + 1), rng.choice(variants)(rng.choice(keywords)))
+        split = rng.randrange(len(words) + 1)
+        items.append({
+            'title': ' '.join(words[:split]),
+            'summary': ' '.join(words[split:]),
+            'source': rng.choice(['arXiv', 'Hacker News', 'OpenAI Blog']),
+            'url': f'https://example.com/{i}'
+        })
+    return items
+
+
+def corpus():
+    return [{'title': title, 'source': 'Hacker News', 'url': f'https://news/{i}'}
+            for i, title in enumerate(TRICKY_TITLES)] + synthetic_items(3000)
+
+
+def test_keyword_dimensions_match_legacy_substring_scoring():
+    scorer = AINewsScorer(CONFIG)
+    for news_item in corpus():
+        text = scorer.keyword_text(news_item)
+        expected = (legacy_innovation(scorer, text, news_item), legacy_impact(text))
+        assert scorer.static_scores(news_item)[:2] == expected, news_item
+
+
+def test_config_keywords_do_not_change_scores():
+    with_keywords = AINewsScorer(CONFIG)
+    without_keywords = AINewsScorer(CONFIG)
+    without_keywords.apply_config({**without_keywords.config, 'keywords': []})
+
+    for news_item in corpus():
+        assert (with_keywords.static_scores(news_item)[:3]
+                == without_keywords.static_scores(news_item)[:3])
+
+
+def test_config_keywords_are_recorded_in_details():
+    scorer = AINewsScorer(CONFIG)
+    _, details = scorer.score_news({'title': 'Llama 4 and DeepSeek benchmarks',
+                                    'source': 'Hacker News', 'url': 'https://news/1'})
+    assert details['keywords'] == ['deepseek', 'llama 4']
+
+    _, details = scorer.score_news({'title': 'Nothing to see', 'url': 'https://news/2'})
+    assert details['keywords'] == []
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('the magic number', {'breakthrough'}),          # 'agi' 按子串命中，与原实现一致
+    ('open-source weights released', {'open_source'}),
+    ('improved results', {'improvement'}),
+    ('', set()),
+])
+@pytest.mark.parametrize('backend', ['automaton', 'substring'])
+def test_matcher_uses_substring_semantics(backend, text, expected):
+    if backend == 'automaton' and not automaton_available():
+        pytest.skip('未安装 pyahocorasick')
+    matcher = KeywordMatcher({
+        'breakthrough': AINewsScorer.BREAKTHROUGH_KEYWORDS,
+        'open_source': AINewsScorer.OPEN_SOURCE_KEYWORDS,
+        'improvement': AINewsScorer.IMPROVEMENT_KEYWORDS,
+    }, backend=backend)
+    assert matcher.categories(text) == expected
+    hits = matcher.scan(text)
+    assert {category for category in matcher.keywords if category in hits} == expected
+
+
+@pytest.mark.parametrize('backend', ['automaton', 'substring'])
+def test_find_returns_every_overlapping_hit(backend):
+    if backend == 'automaton' and not automaton_available():
+        pytest.skip('未安装 pyahocorasick')
+    scorer = AINewsScorer(CONFIG)
+    matcher = KeywordMatcher(scorer.matcher.keywords, backend=backend)
+
+    for news_item in corpus():
+        text = scorer.keyword_text(news_item)
+        expected = {}
+        for category, words in matcher.keywords.items():
+            found = {word for word in words if word in text}
+            if found:
+                expected[category] = found
+        assert matcher.find(text) == expected, text
@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+
+"""
+运行指标：Prometheus 文本格式导出，采集器按来源累计请求、字节、条数和错误，
+每轮追加一条运行记录
+"""
+
+import time
+
+from metrics import Metrics, append_record, load_records, percentile
+
+NOW = int(time.time()) - 60
+
+
+def test_render_counters_and_histograms():
+    metrics = Metrics()
+    metrics.describe('items_total', '新闻条数')
+    metrics.inc('items_total', source='arXiv')
+    metrics.inc('items_total', 2, source='arXiv')
+    metrics.inc('items_total', source='Say "hi"\n')
+    for value in (0.01, 0.3, 0.3, 100):
+        metrics.observe('fetch_seconds', value, buckets=(0.1, 1), source='arXiv')
+
+    lines = metrics.render().splitlines()
+
+    assert lines[:4] == [
+        '# HELP ainews_items_total 新闻条数',
+        '# TYPE ainews_items_total counter',
+        'ainews_items_total{source="Say \\"hi\\"\\n"} 1',
+        'ainews_items_total{source="arXiv"} 3',
+    ]
+    assert lines[4:] == [
+        '# TYPE ainews_fetch_seconds histogram',
+        'ainews_fetch_seconds_bucket{source="arXiv",le="0.1"} 1',
+        'ainews_fetch_seconds_bucket{source="arXiv",le="1"} 3',
+        'ainews_fetch_seconds_bucket{source="arXiv",le="+Inf"} 4',
+        'ainews_fetch_seconds_sum{source="arXiv"} 100.61',
+        'ainews_fetch_seconds_count{source="arXiv"} 4',
+    ]
+
+
+def test_percentile_nearest_rank():
+    values = [5, 1, 4, 2, 3]
+    assert [percentile(values, q) for q in (0, 50, 90, 100)] == [1, 3, 5, 5]
+    assert percentile([], 50) is None
+
+
+def test_records_rotate_and_filter(tmp_path):
+    path = tmp_path / 'metrics.jsonl'
+    append_record(path, 'collect', collected=1)
+    append_record(path, 'score', scored=2)
+    append_record(path, 'collect', max_bytes=10, collected=3)
+
+    assert (tmp_path / 'metrics.jsonl.1').exists()
+    assert [r['collected'] for r in load_records(path, kind='collect')] == [3]
+    assert load_records(path, since=time.time() + 60) == []
+
+
+def test_collector_records_per_source_stats(stub, make_collector, tmp_path):
+    stub.route('/hn/v0/newstories.json', [102, 101])
+    for item_id in (102, 101):
+        stub.route(f'/hn/v0/item/{item_id}.json', {
+            'id': item_id, 'type': 'story', 'time': NOW, 'title': f'New model {item_id}',
+            'url': f'https://example.com/{item_id}'})
+    stub.route('/down.xml', b'', status=503)
+    path = tmp_path / 'metrics.jsonl'
+    collector = make_collector(metrics={'enabled': True, 'path': str(path)},
+                               blogs=[{'name': 'Down Blog', 'url': f'{stub.base_url}/down.xml'}])
+    tasks = [task for task in collector.build_tasks()
+             if task[0] in ('Hacker News', 'Down Blog')]
+
+    collector.run_tasks(tasks)
+
+    [record] = load_records(path, kind='collect')
+    assert record['collected'] == 2
+    assert {name: (entry['requests'], entry['items'], entry['errors'])
+            for name, entry in record['sources'].items()} == {
+        'Hacker News': (3, 2, 0), 'Down Blog': (1, 0, 1)}
+    assert record['sources']['Hacker News']['bytes'] > 0
+
+    text = collector.metrics.render()
+    assert 'ainews_items_total{source="Hacker News"} 2' in text
+    assert 'ainews_fetch_errors_total{source="Down Blog"} 1' in text
+    assert 'ainews_source_errors_total{source="Down Blog"} 1' in text
+    assert 'ainews_source_duration_seconds_count{source="Hacker News"} 1' in text
@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+
+"""
+流式处理：每条新闻在其源响应后立即产出、评分并写出一行 NDJSON，
+不等其他源，也不在内存中累积
+"""
+
+import json
+import time
+
+from news_io import NDJSONWriter, iter_news
+from pipeline import AINewsPipeline
+from samples import blog_rss
+from score import AINewsScorer
+
+CONFIG = 'config/sources.json'
+NOW = int(time.time()) - 60
+
+CRITICAL = 'OpenAI releases GPT-5, a breakthrough model with open source weights'
+
+
+def route_hn(stub, titles):
+    ids = list(range(100 + len(titles), 100, -1))
+    stub.route('/hn/v0/newstories.json', ids)
+    for item_id, title in zip(ids, titles):
+        stub.route(f'/hn/v0/item/{item_id}.json', {
+            'id': item_id, 'type': 'story', 'time': NOW, 'title': title,
+            'url': f'https://example.com/story/{item_id}', 'score': 500, 'descendants': 300})
+
+
+def test_items_are_yielded_before_slow_sources_finish(stub, make_collector):
+    route_hn(stub, [CRITICAL])
+    stub.route('/slow.xml', blog_rss(3, now=NOW, spacing=60), delay=1.0,
+               headers={'Content-Type': 'application/rss+xml'})
+    collector = make_collector(blogs=[{'name': 'Slow Blog', 'url': f'{stub.base_url}/slow.xml'}])
+    tasks = [task for task in collector.build_tasks() if task[0] in ('Hacker News', 'Slow Blog')]
+
+    start = time.monotonic()
+    arrivals = [(news['source'], time.monotonic() - start)
+                for news in collector.iter_collect(tasks)]
+
+    assert arrivals[0][0] == 'Hacker News' and arrivals[0][1] < 0.5
+    assert [source for source, _ in arrivals].count('Slow Blog') == 3
+
+
+def test_run_stream_writes_each_item_as_it_is_scored(stub, make_collector, tmp_path):
+    route_hn(stub, [CRITICAL, 'Anthropic ships a new Claude model', 'New LLM benchmark results'])
+    collector = make_collector()
+    pipeline = AINewsPipeline(collector.config_path, collector=collector)
+    tasks = [task for task in collector.build_tasks() if task[0] == 'Hacker News']
+    output = tmp_path / 'stream.ndjson'
+    written = []
+
+    # 每条新闻交给 on_item 时已经落盘
+    count = pipeline.run_stream(tasks, output_path=output,
+                                on_item=lambda news: written.append(
+                                    len(output.read_text(encoding='utf-8').splitlines())))
+    pipeline.clusters.close()
+
+    assert written == list(range(1, count + 1))
+    assert [news['title'] for news in iter_news(output)][0] == CRITICAL
+    assert all(news['importance_score'] >= 10 for news in iter_news(output))
+    # 流式运行不在采集器中累积结果
+    assert collector.collected_news == []
+
+
+def test_stream_score_reads_ndjson_and_json_alike(tmp_path):
+    news_list = [{'source': 'Hacker News', 'title': title, 'url': f'https://example.com/{i}',
+                  'score': 500, 'comments': 300,
+                  'published': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(NOW))}
+                 for i, title in enumerate([CRITICAL, 'New LLM benchmark results'])]
+    with NDJSONWriter(tmp_path / 'raw.ndjson') as writer:
+        for news_item in news_list:
+            writer.write(news_item)
+    (tmp_path / 'raw.json').write_text(json.dumps({'news': news_list}), encoding='utf-8')
+
+    scorer = AINewsScorer(CONFIG)
+    counts = [scorer.stream_score(tmp_path / f'raw.{suffix}', tmp_path / f'scored_{suffix}.ndjson')
+              for suffix in ('ndjson', 'json')]
+
+    assert counts == [1, 1]
+    assert (tmp_path / 'scored_ndjson.ndjson').read_text(encoding='utf-8') == \
+        (tmp_path / 'scored_json.ndjson').read_text(encoding='utf-8')
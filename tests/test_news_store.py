@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+
+"""
+新闻库：原始采集结果不覆盖评分列，流式运行时未达阈值的新闻也带评分入库，
+库中的评分明细跨运行复用为静态维度缓存
+"""
+
+import json
+import time
+from datetime import datetime, timezone
+
+import pytest
+
+from news_store import NewsStore
+from pipeline import AINewsPipeline
+from score import AINewsScorer
+
+
+def raw_arxiv(url='https://arxiv.org/abs/2601.00001'):
+    """采集器产出的原始 arXiv 新闻：占位评分 0，category 为学科分类"""
+    return {'source': 'arXiv', 'title': 'A paper', 'url': url,
+            'published': datetime.now(timezone.utc).isoformat(),
+            'category': 'cs.AI', 'importance_score': 0}
+
+
+def scored(news_item, score=18.0, category='🔴 极重要'):
+    return {**news_item, 'importance_score': score, 'category': category,
+            'score_details': {'innovation': 5}}
+
+
+@pytest.fixture
+def store(tmp_path):
+    news_store = NewsStore(tmp_path / 'news.db')
+    yield news_store
+    news_store.close()
+
+
+def test_raw_upsert_keeps_existing_score(store):
+    store.upsert(scored(raw_arxiv()))
+    store.commit()
+    scored_at = store.last_scored_at()
+
+    time.sleep(0.01)
+    store.upsert(raw_arxiv())
+    store.commit()
+
+    [news_item] = store.top(since_hours=1)
+    assert news_item['importance_score'] == 18.0
+    assert news_item['category'] == '🔴 极重要'
+    assert store.counts(since_hours=1) == {'🔴 极重要': 1}
+    assert store.last_scored_at() == scored_at
+
+
+def test_raw_item_is_stored_unscored(store):
+    store.upsert(raw_arxiv())
+    store.commit()
+
+    assert store.size() == 1
+    assert store.top(since_hours=1) == []
+    assert store.counts(since_hours=1) == {}
+    assert store.last_scored_at() is None
+
+
+def test_run_stream_stores_items_below_threshold(stub, make_collector, tmp_path):
+    stub.route('/hn/v0/newstories.json', [101])
+    stub.route('/hn/v0/item/101.json', {
+        'id': 101, 'type': 'story', 'time': int(time.time()) - 60,
+        'title': 'A small model tweak', 'url': 'https://example.com/tweak'})
+    collector = make_collector(news_store={'enabled': True, 'path': str(tmp_path / 'news.db')},
+                               importance_threshold=100)
+    pipeline = AINewsPipeline(collector.config_path, collector=collector)
+    tasks = [task for task in collector.build_tasks() if task[0] == 'Hacker News']
+
+    assert pipeline.run_stream(tasks) == 0
+
+    row = collector.news_store.conn.execute(
+        "SELECT importance_score, category, score_details FROM news").fetchone()
+    assert row[0] > 0 and row[1] in ('🟢 一般', '🟡 重要', '🔴 极重要')
+    assert json.loads(row[2])
+
+
+def test_static_scores_are_reused_across_scorer_instances(store):
+    news_item = {'source': 'OpenAI Blog', 'title': 'Open source GPT-5 weights released',
+                 'summary': 'A new model', 'url': 'https://openai.com/gpt-5'}
+
+    first = AINewsScorer('config/sources.json', store=store)
+    store.upsert(first.score_item(dict(news_item)))
+    store.commit()
+
+    # 新进程（新的评分器实例）：进程内缓存为空，静态维度取自新闻库
+    second = AINewsScorer('config/sources.json', store=store)
+    rescored = second.score_item(dict(news_item))
+    assert second.cache_stats()['store_hits'] == 1
+    assert second.cache_stats()['full_scores'] == 0
+    assert rescored['score_details'] == first.score_news(dict(news_item))[1]
+
+    # 内容或关注词变化后摘要不同，重新完整评分
+    third = AINewsScorer('config/sources.json', store=store)
+    third.score_item({**news_item, 'title': 'Open source GPT-5 weights released today'})
+    third.apply_config({**third.config, 'keywords': ['weights']})
+    third.score_item(dict(news_item))
+    assert third.cache_stats()['store_hits'] == 0
+    assert third.cache_stats()['full_scores'] == 2
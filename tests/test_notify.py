@@ -0,0 +1,153 @@
+# -*- coding: utf-8 -*-
+
+"""
+通知：待推送与合并推送依赖新闻库中的通知台账；每个渠道只收到尚未送达的、
+或送达后升级为极重要的新闻，短时间内的重要新闻合并到下一次推送
+"""
+
+import sqlite3
+import sys
+import time
+from datetime import datetime, timezone
+
+import pytest
+
+import notify
+from news_store import NewsStore
+from notify import NOTIFICATION_DEFAULTS, take_pending
+
+
+def news(i, score=12.0, hours_ago=1):
+    return {'url': f'https://news/{i}', 'title': f'Story {i}', 'source': 'Hacker News',
+            'published': datetime.fromtimestamp(time.time() - hours_ago * 3600,
+                                                 timezone.utc).isoformat(),
+            'importance_score': score, 'category': '🔴 极重要' if score >= 15 else '🟡 重要',
+            'score_details': {'innovation': 3}}
+
+
+@pytest.fixture
+def store(tmp_path):
+    news_store = NewsStore(tmp_path / 'news.db')
+    yield news_store
+    news_store.close()
+
+
+def urls(news_list):
+    return [news_item['url'] for news_item in news_list]
+
+
+def settings(**overrides):
+    return {**NOTIFICATION_DEFAULTS, **overrides}
+
+
+def age_deliveries(store, minutes):
+    """把全部送达记录提前 minutes 分钟"""
+    store.conn.execute("UPDATE deliveries SET delivered_at = delivered_at - ?", (minutes * 60,))
+
+
+def test_pending_excludes_delivered_news_per_channel(store):
+    store.upsert_many([news(1, 12), news(2, 14), news(3, 11)])
+    store.mark_delivered('notify', [news(2, 14)])
+
+    assert urls(store.pending('notify')) == ['https://news/1', 'https://news/3']
+    # 其他渠道各自记账
+    assert urls(store.pending('auto_push')) == ['https://news/2', 'https://news/1',
+                                                'https://news/3']
+
+
+def test_pending_filters_by_score_age_and_limit(store):
+    store.upsert_many([news(1, 12), news(2, 9), news(3, 13, hours_ago=30), news(4, 11)])
+
+    assert urls(store.pending('notify', min_score=10, since_hours=24)) == [
+        'https://news/1', 'https://news/4']
+    assert urls(store.pending('notify', limit=1)) == ['https://news/1']
+
+
+def test_upgrade_to_critical_is_delivered_again(store):
+    store.upsert(news(1, 12))
+    store.commit()
+    store.mark_delivered('notify', store.pending('notify'))
+    assert store.pending('notify') == []
+
+    # 评分升级为极重要后再推送一次，之后不再重复
+    store.upsert(news(1, 16))
+    store.commit()
+    assert urls(store.pending('notify')) == ['https://news/1']
+    store.mark_delivered('notify', store.pending('notify'))
+    assert store.pending('notify') == []
+
+
+def test_important_news_is_coalesced_after_a_recent_delivery(store):
+    store.upsert_many([news(1, 12)])
+    store.mark_delivered('notify', store.pending('notify'))
+    store.upsert_many([news(2, 12), news(3, 11)])
+
+    assert take_pending(store, 'notify', settings(coalesce_minutes=30)) == []
+
+    age_deliveries(store, 31)
+    assert urls(take_pending(store, 'notify', settings(coalesce_minutes=30))) == [
+        'https://news/2', 'https://news/3']
+
+
+def test_critical_news_is_not_coalesced(store):
+    store.upsert_many([news(1, 12)])
+    store.mark_delivered('notify', store.pending('notify'))
+    store.upsert_many([news(2, 12), news(3, 17)])
+
+    # 有极重要新闻时立即推送，同批的重要新闻一起带上
+    assert urls(take_pending(store, 'notify', settings(coalesce_minutes=30))) == [
+        'https://news/3', 'https://news/2']
+
+
+def test_first_delivery_is_not_coalesced(store):
+    store.upsert_many([news(1, 12)])
+
+    assert urls(take_pending(store, 'notify', settings())) == ['https://news/1']
+
+
+def run_notify(monkeypatch, tmp_path, *args):
+    monkeypatch.setattr(sys, 'argv', ['notify.py', '--db', str(tmp_path / 'news.db'),
+                                      '--config', str(tmp_path / 'sources.json'),
+                                      '--output', str(tmp_path / 'message.txt'),
+                                      '--metrics', str(tmp_path / 'metrics.jsonl'), *args])
+    return notify.main()
+
+
+def test_notify_requires_the_ledger(monkeypatch, tmp_path, capsys):
+    # 评分文件只有最近一轮的结果，不能代替台账
+    (tmp_path / 'news_scored.json').write_text('{"news": []}', encoding='utf-8')
+
+    assert run_notify(monkeypatch, tmp_path) == 1
+    assert 'news_store' in capsys.readouterr().err
+    assert not (tmp_path / 'news.db').exists()
+
+
+def test_notify_closes_the_ledger_when_nothing_is_pending(monkeypatch, tmp_path):
+    NewsStore(tmp_path / 'news.db').close()
+    opened = []
+
+    def open_store(path):
+        opened.append(NewsStore(path))
+        return opened[-1]
+
+    monkeypatch.setattr(notify, 'NewsStore', open_store)
+
+    assert run_notify(monkeypatch, tmp_path) == 0
+    assert not (tmp_path / 'message.txt').exists()
+    with pytest.raises(sqlite3.ProgrammingError):
+        opened[0].conn.execute('SELECT 1')
+
+
+def test_notify_sends_each_news_once(monkeypatch, tmp_path, capsys):
+    store = NewsStore(tmp_path / 'news.db')
+    store.upsert_many([news(1, 17), news(2, 12)])
+    store.close()
+
+    assert run_notify(monkeypatch, tmp_path) == 0
+    message = (tmp_path / 'message.txt').read_text(encoding='utf-8')
+    assert 'Story 1' in message and 'Story 2' in message
+
+    (tmp_path / 'message.txt').unlink()
+    assert run_notify(monkeypatch, tmp_path) == 0
+    assert not (tmp_path / 'message.txt').exists()
+    assert '无需推送' in capsys.readouterr().out
@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+
+"""
+单进程流水线：新闻对象在采集、评分、聚类、过滤各阶段之间直接传递，
+各阶段逐条拉取，文件只由 sink 按需写出
+"""
+
+import json
+import time
+
+from pipeline import AINewsPipeline, ScoredFileSink, TextFileSink
+
+NOW = int(time.time()) - 60
+
+CRITICAL = 'OpenAI releases GPT-5, a breakthrough model with open source weights'
+MINOR = 'New LLM benchmark results'
+
+
+def hn_story(item_id, title):
+    return {'id': item_id, 'type': 'story', 'time': NOW, 'title': title,
+            'url': f'https://example.com/story/{item_id}', 'score': 500, 'descendants': 300}
+
+
+def route_stories(stub, titles):
+    ids = list(range(100 + len(titles), 100, -1))
+    stub.route('/hn/v0/newstories.json', ids)
+    for item_id, title in zip(ids, titles):
+        stub.route(f'/hn/v0/item/{item_id}.json', hn_story(item_id, title))
+
+
+def hn_pipeline(make_collector, **overrides):
+    collector = make_collector(**overrides)
+    pipeline = AINewsPipeline(collector.config_path, collector=collector)
+    tasks = [task for task in collector.build_tasks() if task[0] == 'Hacker News']
+    return pipeline, tasks
+
+
+def test_run_passes_items_between_stages_in_memory(stub, make_collector, tmp_path):
+    route_stories(stub, [CRITICAL, MINOR])
+    pipeline, tasks = hn_pipeline(make_collector)
+    before = set(tmp_path.iterdir())
+
+    result = pipeline.run(tasks)
+    pipeline.clusters.close()
+
+    assert [n['title'] for n in result['raw']] == [CRITICAL, MINOR]
+    assert [n['title'] for n in result['scored']] == [CRITICAL]
+    # 评分在采集产出的对象上进行，不经过文件往返
+    assert result['scored'][0] is result['raw'][0]
+    assert result['raw'][1]['importance_score'] < result['threshold']
+    assert CRITICAL in result['digest'] and CRITICAL in result['message']
+    assert not {p.name for p in set(tmp_path.iterdir()) - before} & {
+        'news_raw.json', 'news_scored.json', 'digest.md', 'message.txt'}
+
+
+def test_sinks_write_requested_outputs(stub, make_collector, tmp_path):
+    route_stories(stub, [CRITICAL, MINOR])
+    pipeline, tasks = hn_pipeline(make_collector)
+
+    result = pipeline.run(tasks, sinks=[ScoredFileSink(tmp_path / 'news_scored.json'),
+                                        TextFileSink(tmp_path / 'digest.md', 'digest')])
+    pipeline.clusters.close()
+
+    scored = json.loads((tmp_path / 'news_scored.json').read_text(encoding='utf-8'))
+    assert [n['url'] for n in scored['news']] == [n['url'] for n in result['scored']]
+    assert (tmp_path / 'digest.md').read_text(encoding='utf-8') == result['digest']
+
+
+def test_stream_pulls_one_item_at_a_time(make_collector):
+    collector = make_collector()
+    pipeline = AINewsPipeline(collector.config_path, collector=collector)
+    pulled = []
+
+    def source():
+        for i, title in enumerate([CRITICAL, 'Anthropic ships a new model', MINOR]):
+            pulled.append(title)
+            yield {'source': 'Hacker News', 'title': title,
+                   'url': f'https://example.com/{i}', 'score': 500, 'comments': 300,
+                   'published': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(NOW))}
+
+    stream = pipeline.stream(source(), threshold=10)
+    first = next(stream)
+
+    # 第一条通过全部阶段时，后面的新闻还没有被采集
+    assert first['url'] == 'https://example.com/0'
+    assert len(pulled) == 1
+    pipeline.clusters.close()
@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+
+"""
+自适应轮询：从不比 update_interval 更频繁，活跃时段与固定间隔同一时刻轮询，
+冷门源和非活跃时段最多放长到 max_factor 倍
+"""
+
+import random
+from bisect import bisect_right
+from datetime import datetime, timezone
+
+from scheduler import AdaptiveScheduler
+
+# 周一 00:00 UTC
+START = datetime(2026, 1, 5, tzinfo=timezone.utc).timestamp()
+DAY = 86400
+BASE = 1800
+
+
+def test_interval_stays_within_configured_bounds():
+    scheduler = AdaptiveScheduler(None, {'min_factor': 0.25, 'max_factor': 2})
+    now = START
+    for _ in range(10):
+        now = scheduler.observe('blog', BASE, 5, now=now)
+        assert scheduler.interval('blog', BASE) >= BASE
+    for _ in range(10):
+        previous, now = now, scheduler.observe('blog', BASE, 0, now=now)
+        assert BASE <= now - previous <= 2 * BASE
+
+
+def publish_times(rng, weeks, hours=range(13, 19)):
+    """工作日 hours 内每小时平均 1 条的发布时间"""
+    times = []
+    for day in range(weeks * 7):
+        if day % 7 >= 5:
+            continue
+        for hour in hours:
+            start = START + day * DAY + hour * 3600
+            times.extend(start + rng.uniform(0, 3600) for _ in range(rng.randint(0, 2)))
+    return sorted(times)
+
+
+def poll(times, scheduler=None, weeks=3):
+    """按固定间隔或自适应调度轮询，返回最后一周的 (请求数, 各条的发现延迟)"""
+    end = START + weeks * 7 * DAY
+    measure_from = end - 7 * DAY
+    now, last, requests, delays = START, START, 0, []
+    while now < end:
+        lo, hi = bisect_right(times, last), bisect_right(times, now)
+        if now >= measure_from:
+            requests += 1
+            delays.extend(now - t for t in times[lo:hi] if t >= measure_from)
+        last = now
+        now = scheduler.observe('blog', BASE, hi - lo, now=now) if scheduler else now + BASE
+    return requests, delays
+
+
+def test_adaptive_saves_requests_without_delaying_active_hours():
+    times = publish_times(random.Random(1), weeks=3)
+
+    fixed_requests, fixed_delays = poll(times)
+    adaptive_requests, adaptive_delays = poll(times, AdaptiveScheduler(None, {'max_factor': 2}))
+
+    # 活跃时段与固定间隔在同一时刻轮询，每条的发现延迟都相同；其余时段间隔放长
+    assert adaptive_delays == fixed_delays
+    assert adaptive_requests < 0.7 * fixed_requests
+
+
+def test_idle_source_delay_is_bounded():
+    scheduler = AdaptiveScheduler(None, {'max_factor': 2})
+    times = [START + 5 * DAY + 15 * 3600, START + 16 * DAY + 16 * 3600 + 60]
+
+    requests, delays = poll(times, scheduler)
+
+    assert len(delays) == 1
+    assert delays[0] <= 2 * BASE
+    assert requests <= 7 * DAY / (2 * BASE) + 1
+
+
+def test_active_hour_starts_on_configured_grid():
+    scheduler = AdaptiveScheduler(None, {'max_factor': 2})
+    poll(publish_times(random.Random(2), weeks=2), scheduler, weeks=2)
+    monday = START + 14 * DAY
+
+    # 11:40 不活跃，间隔放长到 1 小时；12:00 起活跃，提前到 12:00 后
+    # 第一个对齐且距本次不少于 update_interval 的时刻
+    assert scheduler.observe('blog', BASE, 0, now=monday + 11 * 3600 + 2400) == \
+        monday + 12 * 3600 + 1800
+    assert scheduler.observe('blog', BASE, 0, now=monday + 12 * 3600 + 1800) == \
+        monday + 13 * 3600
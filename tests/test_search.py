@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+
+"""
+全文检索：标题、正文、作者按权重排序，可按来源、分类和发布时间过滤，
+更新已收录的新闻时原位更新索引
+"""
+
+import time
+from datetime import datetime, timezone
+
+import pytest
+
+from news_store import NewsStore
+from search import parse_time
+
+NOW = time.time()
+
+
+def news(i, title, summary='', source='arXiv', hours_ago=1, score=None, **fields):
+    news_item = {'url': f'https://news/{i}', 'title': title, 'summary': summary,
+                 'source': source,
+                 'published': datetime.fromtimestamp(NOW - hours_ago * 3600,
+                                                     timezone.utc).isoformat(), **fields}
+    if score is not None:
+        news_item.update(importance_score=score,
+                         category='🔴 极重要' if score >= 15 else '🟡 重要',
+                         score_details={'innovation': 5})
+    return news_item
+
+
+@pytest.fixture
+def store(tmp_path):
+    news_store = NewsStore(tmp_path / 'news.db')
+    if not news_store.fts:
+        news_store.close()
+        pytest.skip('SQLite 未编译 FTS5')
+    yield news_store
+    news_store.close()
+
+
+def urls(results):
+    return [news_item['url'] for news_item in results]
+
+
+def test_title_matches_rank_above_body_and_author_matches(store):
+    store.upsert_many([
+        news(1, 'Efficient training', summary='we study diffusion models'),
+        news(2, 'Diffusion models at scale'),
+        news(3, 'Scaling laws', authors=['Ada Diffusion']),
+    ])
+
+    assert urls(store.search('diffusion')) == ['https://news/2', 'https://news/3',
+                                               'https://news/1']
+
+
+def test_all_words_must_match_and_punctuation_is_safe(store):
+    store.upsert_many([
+        news(1, 'GPT-5 reasoning benchmark'),
+        news(2, 'GPT-5 release notes'),
+    ])
+
+    assert urls(store.search('gpt-5 reasoning')) == ['https://news/1']
+    assert urls(store.search('"gpt-5" (')) == urls(store.search('gpt 5'))
+    assert store.search('!!!') == []
+
+
+def test_filters(store):
+    store.upsert_many([
+        news(1, 'Agent benchmark', source='arXiv', hours_ago=2, score=18),
+        news(2, 'Agent framework', source='Hacker News', hours_ago=2, score=12),
+        news(3, 'Agent survey', source='arXiv', hours_ago=24 * 40, score=12),
+    ])
+
+    assert urls(store.search('agent', source='Hacker News')) == ['https://news/2']
+    assert urls(store.search('agent', category='🔴 极重要')) == ['https://news/1']
+    assert sorted(urls(store.search('agent', since=parse_time('30d')))) == [
+        'https://news/1', 'https://news/2']
+    assert urls(store.search('agent', until=parse_time('30d'))) == ['https://news/3']
+
+
+def test_update_reindexes_in_place(store):
+    store.upsert(news(1, 'Old headline about robots'))
+    store.commit()
+    rowid = store.conn.execute("SELECT fts_rowid FROM news").fetchone()[0]
+
+    store.upsert(news(1, 'New headline about transformers', score=16))
+    store.commit()
+
+    assert store.search('robots') == []
+    [result] = store.search('transformers')
+    assert result['importance_score'] == 16
+    assert store.conn.execute("SELECT fts_rowid FROM news").fetchone()[0] == rowid
+    assert store.conn.execute("SELECT COUNT(*) FROM news_fts").fetchone()[0] == 1
+
+
+def test_filtered_search_widens_the_candidate_window(store, monkeypatch):
+    # 只有最早收录的一条来自 Wired，最近的匹配都被来源过滤掉
+    store.upsert_many([news(0, 'Robot learning', source='Wired')]
+                      + [news(i, f'Robot learning {i}', source='arXiv') for i in range(1, 20)])
+    monkeypatch.setattr(NewsStore, 'SEARCH_WINDOW', 4)
+
+    assert urls(store.search('robot', source='Wired')) == ['https://news/0']
+    assert len(store.search('robot', limit=50)) == 20
+
+
+def test_parse_time():
+    assert abs(parse_time('24h') - (time.time() - 86400)) < 5
+    assert parse_time('2026-01-01T00:00:00+00:00') == datetime(2026, 1, 1,
+                                                               tzinfo=timezone.utc).timestamp()
+    with pytest.raises(ValueError):
+        parse_time('yesterday')
@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+
+"""
+已见 URL 索引：之前的运行采集过的新闻跨进程去重，水位丢失时也不重复采集
+"""
+
+import time
+
+from samples import blog_rss
+from seen_store import SeenURLStore, normalize_url, url_hash
+
+NOW = int(time.time()) - 60
+
+
+def hn_story(item_id):
+    return {'id': item_id, 'type': 'story', 'time': NOW,
+            'title': f'New model release {item_id}',
+            'url': f'https://example.com/story/{item_id}',
+            'score': 10, 'descendants': 2}
+
+
+def route_hn(stub, ids):
+    stub.route('/hn/v0/newstories.json', ids)
+    for item_id in ids:
+        stub.route(f'/hn/v0/item/{item_id}.json', hn_story(item_id))
+
+
+def finish_run(collector):
+    """一轮运行结束：已见索引提交"""
+    collector.seen_store.commit()
+
+
+def item_requests(stub):
+    return [path for path in stub.requests if '/item/' in path]
+
+
+def test_hn_stories_seen_in_earlier_run_are_not_refetched(stub, make_collector):
+    ids = list(range(110, 100, -1))
+    route_hn(stub, ids)
+    first = make_collector()
+    first.collect_hackernews()
+    finish_run(first)
+    assert len(first.collected_news) == 10
+
+    # 新进程、水位丢失：已见索引命中，不再请求 story 详情
+    stub.requests.clear()
+    second = make_collector()
+    second.watermarks.set('hackernews', 0)
+    second.collect_hackernews()
+
+    assert second.collected_news == []
+    assert item_requests(stub) == []
+    assert second.seen_store.stats()['hits'] == 10
+
+
+def test_only_unseen_hn_stories_are_fetched(stub, make_collector):
+    route_hn(stub, list(range(105, 100, -1)))
+    first = make_collector()
+    first.collect_hackernews()
+    finish_run(first)
+
+    ids = list(range(108, 100, -1))
+    route_hn(stub, ids)
+    stub.requests.clear()
+    second = make_collector()
+    second.watermarks.set('hackernews', 0)
+    second.collect_hackernews()
+
+    assert sorted(item_requests(stub)) == [f'/hn/v0/item/{i}.json' for i in (106, 107, 108)]
+    assert [news['url'] for news in second.collected_news] == [
+        f'https://example.com/story/{i}' for i in (108, 107, 106)]
+
+
+def test_blog_entries_match_across_runs_after_normalization(stub, make_collector):
+    stub.route('/blog.xml', blog_rss(5, now=NOW, base_url='https://blog.example.com', spacing=60),
+               headers={'Content-Type': 'application/rss+xml'})
+    blogs = [{'name': 'Example Blog', 'url': f'{stub.base_url}/blog.xml'}]
+    first = make_collector(blogs=blogs)
+    first.collect_blog(blogs[0])
+    finish_run(first)
+    assert len(first.collected_news) == 5
+
+    # 同一批文章换成 www、带跟踪参数和结尾斜杠的链接
+    stub.route('/blog.xml', blog_rss(5, now=NOW, base_url='http://www.blog.example.com',
+                                     spacing=60).replace(b'</link>', b'/?utm_source=rss</link>'),
+               headers={'Content-Type': 'application/rss+xml'})
+    second = make_collector(blogs=blogs)
+    second.watermarks.set(f"blog:{blogs[0]['url']}", '2000-01-01T00:00:00+00:00')
+    second.collect_blog(blogs[0])
+
+    assert second.collected_news == []
+
+
+def test_expired_urls_are_compacted(tmp_path):
+    store = SeenURLStore(tmp_path / 'seen.db', ttl_days=7)
+    store.add('https://example.com/old')
+    store.add('https://example.com/new')
+    store.conn.execute("UPDATE seen SET last_seen = ? WHERE url_hash = ?",
+                       (time.time() - 8 * 86400, url_hash('https://example.com/old')))
+    store.commit()
+
+    assert store.compact() == 1
+    assert store.size() == 1
+    assert store.contains('https://example.com/new')
+    store.close()
+
+
+def test_normalize_url_ignores_presentation_differences():
+    assert normalize_url('https://www.Example.com/a/?utm_source=x&b=2&a=1#top') == \
+        normalize_url('http://example.com/a?a=1&b=2')
+    assert normalize_url('https://example.com/a?id=1') != normalize_url('https://example.com/a?id=2')
@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+
+"""
+摘要：渲染缓存键覆盖全部渲染字段，汇总文件只写出变化的部分
+"""
+
+import pytest
+
+from summarize import AINewsSummarizer, DigestDocument, split_categories
+
+
+def news(i, score=12.0, category='🟡 重要', **fields):
+    return {'url': f'https://news/{i}', 'title': f'Story {i}', 'source': 'Hacker News',
+            'importance_score': score, 'category': category, **fields}
+
+
+@pytest.mark.parametrize('field, value', [
+    ('source', 'OpenAI Blog'),
+    ('authors', ['Ada Lovelace']),
+    ('abstract', 'A new abstract'),
+    ('related', [{'source': 'Wired', 'url': 'https://wired/1'}]),
+])
+def test_fragment_is_rerendered_when_any_rendered_field_changes(field, value):
+    summarizer = AINewsSummarizer()
+    original = news(1, authors=['Alan Turing'], abstract='Old abstract')
+    summarizer.fragment(original)
+
+    changed = {**original, field: value}
+    text = summarizer.fragment(changed)
+
+    assert text == summarizer.summarize_single(changed)
+    assert summarizer.cache_stats()['misses'] == 2
+
+
+def expected_digest(doc, news_list, fmt='markdown'):
+    """同一批新闻从头生成的汇总"""
+    ranked = sorted(news_list, key=lambda n: n['importance_score'], reverse=True)
+    critical, important = split_categories(ranked)
+    return AINewsSummarizer().assemble(critical, important, len(news_list), doc.title,
+                                       fmt, doc.updated_at)
+
+
+def test_digest_update_only_renders_and_writes_changes(tmp_path):
+    summarizer = AINewsSummarizer()
+    doc = DigestDocument(tmp_path / 'digest.md', summarizer, formats=('markdown', 'html'))
+    news_list = [news(i, score=20 - i) for i in range(9)] + [news(9, 18, '🔴 极重要')]
+    doc.update(news_list)
+    doc.write()
+    size = sum(path.stat().st_size for path in doc.paths.values())
+    rendered = summarizer.cache_stats()['misses']
+
+    # 新增一条得分最低的新闻（总数位数不变）：只渲染这一条，只写标题行和文件末尾
+    news_list.append(news(10, score=11))
+    doc.bytes_written = 0
+    doc.update(news_list)
+    doc.write()
+
+    assert summarizer.cache_stats()['misses'] == rendered + 2
+    assert 0 < doc.bytes_written < size / 2
+    for fmt, suffix in (('markdown', '.md'), ('html', '.html')):
+        content = (tmp_path / f'digest{suffix}').read_text(encoding='utf-8')
+        assert content == expected_digest(doc, news_list, fmt)
+
+
+def test_digest_rewrites_tail_after_change_and_truncates(tmp_path):
+    doc = DigestDocument(tmp_path / 'digest.md', AINewsSummarizer())
+    news_list = [news(i, score=20 - i) for i in range(6)]
+    doc.update(news_list)
+    doc.write()
+
+    # 第 3 条换了来源，最后一条被删除
+    news_list[3] = news(3, score=17, source='A much longer source name')
+    del news_list[-1]
+    doc.update(news_list)
+    doc.write()
+
+    content = (tmp_path / 'digest.md').read_text(encoding='utf-8')
+    assert content == expected_digest(doc, news_list)
+    assert 'A much longer source name' in content
+    assert 'Story 5' not in content
+
+
+def test_digest_unchanged_is_not_written(tmp_path):
+    doc = DigestDocument(tmp_path / 'digest.md', AINewsSummarizer())
+    news_list = [news(i) for i in range(3)]
+    doc.update(news_list)
+    assert doc.write()
+
+    doc.update([dict(n) for n in news_list])
+    assert not doc.write()
@@ -0,0 +1,162 @@
+# -*- coding: utf-8 -*-
+
+"""
+增量采集高水位：只有窗口内的条目全部被接收后才推进到最新，否则停在实际取到的位置
+"""
+
+import time
+from datetime import datetime, timezone
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+
+from samples import arxiv_atom, blog_rss
+
+NOW = int(time.time()) - 60
+SPACING = 10
+
+
+def paper_time(index):
+    """第 index 新的论文的提交时间（与 arxiv_atom 的生成规则一致）"""
+    return datetime.fromtimestamp(NOW - index * SPACING, timezone.utc).isoformat()
+
+
+def route_arxiv(stub, total):
+    """按请求中的 start / max_results 分页返回 total 篇论文（按提交时间降序）"""
+    def handler(request):
+        query = parse_qs(urlsplit(request.path).query)
+        start = int(query['start'][0])
+        count = max(0, min(int(query['max_results'][0]), total - start))
+        return 200, arxiv_atom(count, now=NOW, total=total, start=start,
+                               spacing=SPACING), {}, 0
+    stub.route_handler('/arxiv', handler)
+
+
+def arxiv_mark(collector):
+    return collector.watermarks.get('arxiv:cs.AI')
+
+
+def test_arxiv_exhausted_window_advances_to_newest(stub, make_collector):
+    route_arxiv(stub, total=150)
+    collector = make_collector()
+
+    collector.collect_arxiv()
+
+    assert len(collector.collected_news) == 150
+    assert arxiv_mark(collector) == paper_time(0)
+
+
+def test_arxiv_max_results_cap_keeps_older_papers_in_window(stub, make_collector):
+    route_arxiv(stub, total=250)
+    collector = make_collector(arxiv={'max_results': 150})
+
+    collector.collect_arxiv()
+
+    # 只取到最新的 150 篇，水位停在其中最早的一篇
+    assert len(collector.collected_news) == 150
+    assert arxiv_mark(collector) == paper_time(149)
+
+
+def test_arxiv_stop_accepting_keeps_rest_for_next_round(stub, make_collector):
+    route_arxiv(stub, total=150)
+    collector = make_collector()
+    stop_after(collector, 30)
+
+    collector.collect_arxiv()
+
+    assert len(collector.collected_news) == 30
+    assert arxiv_mark(collector) == paper_time(29)
+
+
+def stop_after(collector, count):
+    """让采集器在接收 count 条新闻后停止接收（模拟超出时间预算）"""
+    add_news = collector.add_news
+
+    def add_then_stop(news_item):
+        added = add_news(news_item)
+        if len(collector.collected_news) >= count:
+            collector._accepting = False
+        return added
+    collector.add_news = add_then_stop
+
+
+def resume(collector):
+    """恢复接收，进入下一轮"""
+    del collector.add_news
+    collector._accepting = True
+
+
+def test_blog_partial_feed_keeps_etag_and_watermark(stub, make_collector):
+    stub.route('/blog.xml', blog_rss(10, now=NOW, base_url='https://blog.example.com',
+                                     spacing=60),
+               headers={'Content-Type': 'application/rss+xml', 'ETag': '"v1"'})
+    url = f'{stub.base_url}/blog.xml'
+    collector = make_collector(blogs=[{'name': 'Example Blog', 'url': url}])
+    blog = collector.config['blogs'][0]
+    stop_after(collector, 4)
+
+    collector.collect_blog(blog)
+
+    # 最新的 4 篇已接收，更早的 6 篇未接收：水位不越过最早的未接收文章，ETag 不提交
+    assert len(collector.collected_news) == 4
+    mark = datetime.fromisoformat(collector.watermarks.get(f'blog:{url}'))
+    assert mark.timestamp() < NOW - 9 * 60
+    assert not collector.feed_cache.entries[url].get('etag')
+
+    resume(collector)
+    collector.collect_blog(blog)
+
+    assert len(collector.collected_news) == 10
+    assert collector.watermarks.get(f'blog:{url}') == paper_time(0)
+    assert collector.feed_cache.entries[url]['etag'] == '"v1"'
+
+
+def hn_story(item_id):
+    return {'id': item_id, 'type': 'story', 'time': NOW,
+            'title': f'New model release {item_id}',
+            'url': f'https://example.com/story/{item_id}',
+            'score': 10, 'descendants': 2}
+
+
+def route_hn(stub, ids):
+    stub.route('/hn/v0/newstories.json', ids)
+    stub.route('/hn/v0/maxitem.json', max(ids))
+    for item_id in ids:
+        stub.route(f'/hn/v0/item/{item_id}.json', hn_story(item_id))
+
+
+def test_hn_max_stories_leaves_older_ids_for_next_round(stub, make_collector):
+    ids = list(range(130, 100, -1))
+    route_hn(stub, ids)
+    collector = make_collector(hackernews={'max_stories': 10})
+
+    marks = []
+    for _ in range(3):
+        collector.collect_hackernews()
+        marks.append(collector.watermarks.get('hackernews'))
+
+    # 每轮取最新的 10 条未处理 story，水位停在更早的未处理 id 之前，直到全部取完
+    assert marks == [100, 100, 130]
+    assert sorted(news['url'] for news in collector.collected_news) == sorted(
+        f'https://example.com/story/{i}' for i in ids)
+
+
+@pytest.mark.parametrize('mode', ['newstories', 'maxitem'])
+def test_hn_stop_accepting_keeps_rest_for_next_round(stub, make_collector, mode):
+    ids = list(range(110, 100, -1))
+    route_hn(stub, ids)
+    collector = make_collector(hackernews={'mode': mode})
+    collector.watermarks.set('hackernews', 100)
+    stop_after(collector, 3)
+
+    collector.collect_hackernews()
+
+    assert len(collector.collected_news) == 3
+    assert collector.watermarks.get('hackernews') == 100
+    assert not collector.is_seen(collector.hn_item_url(107))
+
+    resume(collector)
+    collector.collect_hackernews()
+
+    assert len(collector.collected_news) == 10
+    assert collector.watermarks.get('hackernews') == 110